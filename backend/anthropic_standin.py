@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[노벨 팩토리] 로컬 Anthropic API 대역 서버 (stand-in)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+novel_writer.py 파이프라인을 실제 API 비용 없이 끝까지 돌려 보기 위한 가짜 서버입니다.
+POST /v1/messages 하나만 흉내 냅니다 (일반 응답 + stream=true SSE).
+표준 라이브러리만 사용합니다.
+
+흉내 내는 것:
+  - 응답 형식: message / content[text] / stop_reason / usage
+  - 스트리밍 이벤트: message_start → content_block_start → content_block_delta...
+                     → content_block_stop → message_delta → message_stop
+  - usage: input_tokens / output_tokens / cache_creation_input_tokens / cache_read_input_tokens
+    (한국어 대략 3자 = 1토큰, cache_control 지점 기준 접두어 캐시를 5분 동안 기억)
+  - 지연: 첫 토큰까지 STANDIN_LATENCY 초, 이후 STANDIN_TPS 토큰/초로 출력
+  - 오류 주입: STANDIN_429_RATE / STANDIN_529_RATE 확률로 rate_limit / overloaded 오류 (retry-after 포함)
+  - <섹션요약> 형식을 요구하는 요청에는 요약 블록도 붙여 줌 (step_write rolling 모드 확인용)
+
+사용법:
+  python backend/anthropic_standin.py              # 포트 8787
+  python backend/anthropic_standin.py 9000         # 포트 지정
+  STANDIN_LATENCY=0.5 STANDIN_TPS=80 STANDIN_429_RATE=0.2 python backend/anthropic_standin.py
+
+  # 다른 터미널에서
+  ANTHROPIC_BASE_URL=http://127.0.0.1:8787 python backend/novel_writer.py
+
+설정 (환경 변수):
+  STANDIN_LATENCY        첫 토큰까지 지연 (초, 기본 0.3)
+  STANDIN_TPS            출력 속도 (토큰/초, 기본 200, 0 = 지연 없음)
+  STANDIN_OUTPUT_TOKENS  응답 길이 (토큰, 기본 300, 요청 max_tokens 를 넘지 않음)
+  STANDIN_429_RATE       429 rate_limit_error 확률 (0~1, 기본 0)
+  STANDIN_529_RATE       529 overloaded_error 확률 (0~1, 기본 0)
+  STANDIN_CACHE          0 이면 프롬프트 캐시 흉내 끔 (기본 1)
+  STANDIN_SEED           오류 주입 난수 시드 (재현용)
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ── 설정 ──
+PORT = 8787
+LATENCY = float(os.environ.get("STANDIN_LATENCY", 0.3))
+TPS = float(os.environ.get("STANDIN_TPS", 200))
+OUTPUT_TOKENS = int(os.environ.get("STANDIN_OUTPUT_TOKENS", 300))
+RATE_429 = float(os.environ.get("STANDIN_429_RATE", 0))
+RATE_529 = float(os.environ.get("STANDIN_529_RATE", 0))
+CACHE_ENABLED = os.environ.get("STANDIN_CACHE", "1") != "0"
+CACHE_TTL = 300.0        # ephemeral 캐시 수명 (초)
+CHARS_PER_TOKEN = 3      # novel_writer.py 와 같은 추정 (한국어 대략 3자 = 1토큰)
+DELTA_TOKENS = 5         # 스트리밍 조각 하나의 토큰 수
+
+_rng = random.Random(os.environ.get("STANDIN_SEED"))
+_cache = {}              # 접두어 해시 → 만료 시각
+_cache_lock = threading.Lock()
+
+FILLER = [
+    "바람이 객잔 처마 끝을 흔들었다.",
+    "위소운은 찻잔을 내려놓고 창밖을 보았다.",
+    "(이건 시험용 문장입니다.) 이준혁의 목소리가 머릿속에서 울렸다.",
+    "천마가 코웃음을 쳤다. 쓸데없는 짓이다.",
+    "장터의 소음이 멀어지고, 발소리만 또렷하게 남았다.",
+]
+
+
+def _tokens(text):
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def _blocks(value):
+    """system / content 값 → [(텍스트, cache_control 여부)]"""
+    if isinstance(value, str):
+        return [(value, False)]
+    return [(block.get("text", ""), "cache_control" in block) for block in value or []]
+
+
+def _usage(body):
+    """
+    요청 본문 → 입력 usage.
+    cache_control 지점까지의 접두어가 캐시에 있으면 읽기, 없으면 생성으로 셉니다 (실제 API 와 같은 접두어 방식).
+    """
+    segments = _blocks(body.get("system", []))
+    for message in body.get("messages", []):
+        segments += _blocks(message.get("content", ""))
+
+    total = 0
+    points = []          # (지점까지 토큰 수, 접두어 키)
+    prefix = []
+    for text, breakpoint in segments:
+        total += _tokens(text)
+        prefix.append(text)
+        if breakpoint:
+            points.append((total, hash((body.get("model"), "\0".join(prefix)))))
+
+    read = 0
+    cached_upto = 0
+    if CACHE_ENABLED and points:
+        now = time.monotonic()
+        with _cache_lock:
+            for upto, key in points:
+                if _cache.get(key, 0) > now:
+                    read = upto
+            for upto, key in points:
+                _cache[key] = now + CACHE_TTL
+        cached_upto = points[-1][0]
+    write = cached_upto - read
+    return {
+        "input_tokens": total - cached_upto,
+        "cache_creation_input_tokens": write,
+        "cache_read_input_tokens": read,
+    }
+
+
+SUMMARY_BLOCK = "\n<섹션요약>\n- (대역 서버) 위소운이 객잔에서 다음 행선지를 정했다.\n</섹션요약>"
+
+
+def _reply_text(body, max_tokens):
+    """
+    가짜 응답 본문 (요청 텍스트에 <섹션요약> 지시가 있으면 요약 블록도).
+    본문을 먼저 max_tokens 에 맞춰 자르고 요약 블록은 그 뒤에 붙이므로, 응답이 길어도 요약은 남습니다.
+    """
+    request_text = json.dumps(body.get("messages", []), ensure_ascii=False)
+    summary = SUMMARY_BLOCK if "<섹션요약>" in request_text else ""
+    want = min(OUTPUT_TOKENS, max(1, max_tokens - _tokens(summary)))
+
+    lines = []
+    while _tokens("\n".join(lines)) < want:
+        lines.append(FILLER[len(lines) % len(FILLER)])
+    return "\n".join(lines)[:want * CHARS_PER_TOKEN] + summary
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        print(f"  📨 {self.address_string()} {fmt % args}")
+
+    def _json(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.send_header("request-id", f"req_standin_{uuid.uuid4().hex[:16]}")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, error_type, message):
+        self._json(status, {"type": "error", "error": {"type": error_type, "message": message}},
+                   headers={"retry-after": "1"} if status in (429, 529) else None)
+
+    def do_POST(self):
+        if self.path.split("?")[0].rstrip("/") != "/v1/messages":
+            self._error(404, "not_found_error", f"대역 서버는 /v1/messages 만 지원합니다: {self.path}")
+            return
+        try:
+            length = int(self.headers.get("content-length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._error(400, "invalid_request_error", f"JSON 파싱 실패: {e}")
+            return
+
+        # ── 오류 주입 ──
+        roll = _rng.random()
+        if roll < RATE_429:
+            self._error(429, "rate_limit_error", "대역 서버: 주입된 rate limit 오류")
+            return
+        if roll < RATE_429 + RATE_529:
+            self._error(529, "overloaded_error", "대역 서버: 주입된 overloaded 오류")
+            return
+
+        max_tokens = int(body.get("max_tokens", 1024))
+        usage = _usage(body)
+        text = _reply_text(body, max_tokens)
+        output_tokens = _tokens(text)
+        stop_reason = "max_tokens" if output_tokens >= max_tokens else "end_turn"
+        message = {
+            "id": f"msg_standin_{uuid.uuid4().hex[:20]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "standin"),
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {**usage, "output_tokens": 1},
+        }
+
+        time.sleep(LATENCY)
+        if not body.get("stream"):
+            if TPS > 0:
+                time.sleep(output_tokens / TPS)
+            message.update(content=[{"type": "text", "text": text}], stop_reason=stop_reason,
+                           usage={**usage, "output_tokens": output_tokens})
+            self._json(200, message)
+            return
+
+        self._stream(message, text, output_tokens, stop_reason)
+
+    def _stream(self, message, text, output_tokens, stop_reason):
+        """SSE 스트리밍 (연결을 닫아 끝을 알림)"""
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("cache-control", "no-cache")
+        self.send_header("connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(name, payload):
+            self.wfile.write(f"event: {name}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+                             .encode("utf-8"))
+            self.wfile.flush()
+
+        event("message_start", {"type": "message_start", "message": message})
+        event("content_block_start", {"type": "content_block_start", "index": 0,
+                                      "content_block": {"type": "text", "text": ""}})
+        event("ping", {"type": "ping"})
+
+        step = DELTA_TOKENS * CHARS_PER_TOKEN
+        for start in range(0, len(text), step):
+            event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                          "delta": {"type": "text_delta", "text": text[start:start + step]}})
+            if TPS > 0:
+                time.sleep(DELTA_TOKENS / TPS)
+
+        event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        event("message_delta", {"type": "message_delta",
+                                "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                                "usage": {"output_tokens": output_tokens}})
+        event("message_stop", {"type": "message_stop"})
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandinHandler)
+    print(f"🧪 Anthropic 대역 서버: http://127.0.0.1:{port}")
+    print(f"   지연 {LATENCY}초 · {TPS:g} 토큰/초 · 응답 {OUTPUT_TOKENS} 토큰"
+          f" · 429 {RATE_429:.0%} · 529 {RATE_529:.0%} · 캐시 {'켬' if CACHE_ENABLED else '끔'}")
+    print(f"   사용: ANTHROPIC_BASE_URL=http://127.0.0.1:{port} python backend/novel_writer.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n  종료합니다.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -13,31 +13,78 @@
 또는:
   uvicorn main:app --reload --port 8000
 
+운영 모드 (RAG_WORKERS=N 또는 RAG_SERVE_MODE=production):
+  RAG_WORKERS=4 python main.py
+  - 자동 재시작(reload) 없이 uvicorn 워커 프로세스 N개로 실행합니다.
+  - 시작 전에 모든 소설의 색인 스냅샷을 한 번 만들어 두고, 워커들은 그 파일을 mmap 으로 열어
+    색인 배열(.ragidx, 벡터 .npy)은 OS 페이지 캐시 한 벌을 공유합니다.
+    (문서 본문/청크 객체, fuzzy·자동완성 사전은 워커마다 따로 가짐)
+  - 검색(search / batch / tag-search)은 워커 안의 검색 풀(RAG_SEARCH_THREADS, 기본 4)에서 돌고,
+    대기 작업이 RAG_SEARCH_MAX_PENDING(기본 64)개를 넘으면 503 + Retry-After 로 바로 거절합니다.
+  - 스냅샷/벡터 .npy 는 감독 프로세스만 씁니다. 감독 프로세스가 world_db 를 감시하다가
+    원본과 안 맞게 된 소설의 스냅샷을 임시 엔진으로 다시 만들어 (임시 파일 → 교체) 저장합니다.
+  - 워커는 RAG_SNAPSHOT_READONLY=1 로 떠서 파일을 읽기만 합니다. 워커의 감시/reload 는
+    새 스냅샷이 원본과 맞으면 그것을 mmap 으로 다시 붙이고, 아직 안 만들어졌으면
+    바뀐 문서만 자기 메모리에서 재색인해 두었다가 다음 주기에 새 스냅샷으로 바꿉니다.
+
+  워커 수별 처리량 (python rag_bench.py, murim_mna 433청크, keyword, 결과 캐시 끔, HTTP 계층 제외):
+      워커   검색/초   RSS 합   PSS 합
+        1     1,163    61 MB    55 MB
+        2     1,236   123 MB   104 MB
+        4     1,099   245 MB   201 MB
+        8     1,031   491 MB   392 MB
+  측정 장비가 CPU 1개라 처리량이 워커 수와 함께 늘지 않습니다 (코어 수만큼 늘리는 것이 상한).
+  워커당 PSS 는 약 49MB 이고, 약 12MB 는 워커끼리 공유합니다.
+  배포 장비에서 같은 명령으로 다시 재서 RAG_WORKERS 를 고르세요.
+
+색인 스냅샷 미리 만들기 (첫 부팅도 즉시 시작):
+  python rag_snapshot.py
+
+소설별 샤드:
+  novels/*/world_db 마다 샤드 하나 (처음 쓰일 때 로드, 오래 안 쓰면 해제).
+  조회/검색 API 는 novel (쿼리 파라미터 또는 요청 필드) 로 소설을 고르고,
+  생략하면 RAG_DEFAULT_NOVEL (기본 murim_mna), 검색에서 "*" 이면 모든 소설을 합쳐서 검색합니다.
+
 엔드포인트:
   GET  /                     → 서버 상태
-  GET  /api/stats             → 엔진 통계
+  GET  /api/stats             → 엔진 통계 (샤드 목록 / ?novel= 소설별)
+  GET  /api/novels            → 소설(샤드) 목록
   GET  /api/categories        → 카테고리 목록
   GET  /api/documents         → 전체 문서 목록
-  GET  /api/document/{name}   → 특정 문서 조회
-  POST /api/search            → 키워드 검색
-  POST /api/tag-search        → @태그 검색
+  GET  /api/document/{name}   → 특정 문서 조회 (ETag / gzip)
+  GET  /api/document/{name}/range?start=&end=   → 문서 본문 문자 구간
+  GET  /api/document/{name}/chunks?start=&end=  → 문서의 청크 구간
+  GET  /api/chunk/{chunk_id}  → 청크 하나 (검색 결과의 chunk_id)
+  POST /api/search            → 검색 (mode: keyword / bm25 / vector / hybrid / fuzzy)
+  POST /api/search/batch      → 여러 검색어 일괄 검색 (dedupe 선택)
+  POST /api/tag-search        → @태그 검색 (tag_map.json 태그는 미리 계산된 결과)
+  GET  /api/tags              → 설정된 @태그 목록
+  GET  /api/suggest?q=        → 입력 중 자동완성 (헤딩/문서명/@태그/용어)
+  POST /api/reload            → world_db 변경분 재색인
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
 
 # ── FastAPI 설치 확인 ──
 try:
-    from fastapi import FastAPI, HTTPException
+    from fastapi import FastAPI, HTTPException, Request
     from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.middleware.gzip import GZipMiddleware
+    from fastapi.responses import JSONResponse, Response
     from pydantic import BaseModel
 except ImportError:
     print("❌ FastAPI가 설치되지 않았습니다.")
     print("   설치 명령어: pip install fastapi uvicorn")
     sys.exit(1)
 
-from rag_engine import RAGEngine
+from rag_engine import FUSION_METHODS, SEARCH_MODES, RAGEngine
+from rag_serving import PoolBusy, SearchPool
+from rag_shards import ShardedRAGEngine, UnknownShard
+from rag_snapshot import default_snapshot_path
+from rag_watcher import WorldDbWatcher
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # FastAPI 앱 설정
@@ -60,12 +107,66 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# ── gzip 압축 (이 크기 이상 응답만, 브라우저가 Accept-Encoding: gzip 을 보낼 때) ──
+app.add_middleware(GZipMiddleware, minimum_size=int(os.environ.get("RAG_GZIP_MIN_SIZE", 1024)))
+
 # ── RAG 엔진 초기화 ──
-# novels/murim_mna/world_db 경로 (공장-제품 분리 구조)
-DOCS_PATH = Path(__file__).parent.parent / "novels" / "murim_mna" / "world_db"
-engine = RAGEngine(str(DOCS_PATH))
+# novels/*/world_db 마다 샤드 하나 (공장-제품 분리 구조), novel 생략 시 기본 소설
+NOVELS_PATH = Path(__file__).parent.parent / "novels"
+DEFAULT_NOVEL = os.environ.get("RAG_DEFAULT_NOVEL", "murim_mna")
+# 색인 스냅샷 (원본 변경 없으면 재색인 없이 mmap 로드, RAG_SNAPSHOT=0 이면 끔)
+USE_SNAPSHOT = os.environ.get("RAG_SNAPSHOT", "1") != "0"
+# 검색 결과 캐시 크기/유효시간 (RAG_CACHE_SIZE=0 이면 끔)
+CACHE_SIZE = int(os.environ.get("RAG_CACHE_SIZE", 256))
+CACHE_TTL = float(os.environ.get("RAG_CACHE_TTL", 300))
+# 스냅샷/벡터 .npy 를 읽기만 함 (운영 모드 워커 — 감독 프로세스가 워커를 띄우기 전에 1 로 설정)
+SNAPSHOT_READONLY = os.environ.get("RAG_SNAPSHOT_READONLY", "0") == "1"
+# 로드 워커 수 (비우면 CPU 수, 최대 8 / 1 = 순차) / 풀 종류 (thread, process)
+LOAD_WORKERS = int(os.environ["RAG_LOAD_WORKERS"]) if os.environ.get("RAG_LOAD_WORKERS") else None
+LOAD_EXECUTOR = os.environ.get("RAG_LOAD_EXECUTOR", "thread")
+# 샤드 메모리 예산 (MB, 0 = 무제한) / 유휴 해제 시간 (초, 0 = 안 함) / _archive 포함 여부
+SHARD_BUDGET_MB = float(os.environ.get("RAG_SHARD_BUDGET_MB", 0))
+SHARD_IDLE_TTL = float(os.environ.get("RAG_SHARD_IDLE_TTL", 1800))
+INCLUDE_ARCHIVE = os.environ.get("RAG_INCLUDE_ARCHIVE", "0") == "1"
+
+
+def _make_engine(docs_path: Path) -> RAGEngine:
+    """샤드 하나의 엔진 (스냅샷/캐시 설정 공통)"""
+    return RAGEngine(
+        str(docs_path),
+        snapshot_path=default_snapshot_path(docs_path) if USE_SNAPSHOT else None,
+        cache_size=CACHE_SIZE,
+        cache_ttl=CACHE_TTL,
+        load_workers=LOAD_WORKERS,
+        load_executor=LOAD_EXECUTOR,
+        snapshot_readonly=SNAPSHOT_READONLY,
+    )
+
+
+engine = ShardedRAGEngine(
+    str(NOVELS_PATH),
+    default=DEFAULT_NOVEL,
+    include_archive=INCLUDE_ARCHIVE,
+    memory_budget=int(SHARD_BUDGET_MB * 1024 * 1024),
+    idle_ttl=SHARD_IDLE_TTL,
+    engine_factory=_make_engine,
+)
+
+# ── 검색 풀 (이벤트 루프 밖에서 검색, 대기 작업 상한 초과 시 503) ──
+SEARCH_THREADS = int(os.environ.get("RAG_SEARCH_THREADS", 4))
+SEARCH_MAX_PENDING = int(os.environ.get("RAG_SEARCH_MAX_PENDING", 64))
+search_pool = SearchPool(threads=SEARCH_THREADS, max_pending=SEARCH_MAX_PENDING)
+
+# ── 서버 프로세스 (운영 모드: 워커 N개, reload 없음) ──
+WORKERS = int(os.environ.get("RAG_WORKERS", 1))
+PRODUCTION = os.environ.get("RAG_SERVE_MODE", "dev") == "production" or WORKERS > 1
+
+# ── world_db 변경 감시 (초 단위, RAG_WATCH_INTERVAL=0 이면 끔) ──
+WATCH_INTERVAL = float(os.environ.get("RAG_WATCH_INTERVAL", 2))
+watcher = WorldDbWatcher(engine, interval=WATCH_INTERVAL)
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -78,11 +179,33 @@ class SearchRequest(BaseModel):
     top_k: int = 5                      # 최대 결과 수 (기본 5개)
     category: str | None = None         # 카테고리 필터 (선택)
     doc_name: str | None = None         # 문서명 필터 (선택)
+    mode: str = "keyword"               # 랭킹 방식: "keyword"(기본) / "bm25" / "vector" / "hybrid" / "fuzzy"
+    fusion: str = "rrf"                 # hybrid 융합 방식: "rrf" / "weighted"
+    keyword_weight: float = 1.0         # hybrid 키워드(BM25) 가중치
+    vector_weight: float = 1.0          # hybrid 벡터 가중치
+    offset: int = 0                     # 건너뛸 상위 결과 수 (다음 페이지 = offset + top_k)
+    novel: str | None = None            # 소설 (생략 = 기본 소설, "*" = 모든 소설 합쳐서)
+
+
+class BatchSearchRequest(BaseModel):
+    """일괄 검색 요청 (검색어 외 옵션은 모든 검색어에 공통)"""
+    queries: list[str]                  # 검색어 리스트
+    top_k: int = 5                      # 검색어별 최대 결과 수
+    category: str | None = None
+    doc_name: str | None = None
+    mode: str = "keyword"
+    fusion: str = "rrf"
+    keyword_weight: float = 1.0
+    vector_weight: float = 1.0
+    dedupe: bool = False                # True 면 앞 검색어에 나온 청크는 뒤에서 제외
+    novel: str | None = None            # 소설 (생략 = 기본 소설, "*" = 모든 소설 합쳐서)
 
 
 class TagSearchRequest(BaseModel):
     """@태그 검색 요청"""
     tag: str                            # 태그 (예: "요리", "무공", "객잔")
+    fuzzy: bool = True                  # 오타 허용 (@무굥 → @무공, 매핑 없는 태그는 fuzzy 검색)
+    novel: str | None = None            # 소설 (생략 = 기본 소설, "*" = 모든 소설 합쳐서)
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -95,6 +218,40 @@ async def startup():
     print("🚀 Novel Alchemist RAG Server 시작")
     chunk_count = engine.load()
     print(f"✅ 준비 완료! ({chunk_count}개 청크 인덱싱)")
+    if WATCH_INTERVAL > 0:
+        watcher.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """서버 종료 시 감시 스레드 / 검색 풀 정리"""
+    watcher.stop()
+    search_pool.shutdown()
+
+
+async def _offload(fn, *args, **kwargs):
+    """CPU 작업을 검색 풀에서 실행 (대기열이 가득 차면 503 + Retry-After)"""
+    try:
+        return await search_pool.run(fn, *args, **kwargs)
+    except PoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+def _shard(novel: str | None) -> RAGEngine:
+    """소설 이름 → 샤드 엔진 (없는 소설이면 404)"""
+    try:
+        return engine.shard(novel)
+    except UnknownShard as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+async def _query(novel: str | None, method: str, *args):
+    """
+    샤드 엔진의 조회 메서드를 검색 풀에서 실행합니다.
+    (처음 쓰는 샤드의 로드, 청크 조립 같은 CPU 작업이 이벤트 루프를 막지 않도록
+     샤드 찾기까지 풀 안에서 함)
+    """
+    return await _offload(lambda: getattr(_shard(novel), method)(*args))
 
 
 @app.get("/")
@@ -110,30 +267,105 @@ async def root():
 
 
 @app.get("/api/stats")
-async def get_stats():
-    """엔진 통계"""
-    return engine.get_stats()
+async def get_stats(novel: str | None = None):
+    """엔진 통계 (novel 생략 = 샤드 목록/메모리 + 검색 풀, 지정 = 그 소설의 엔진 통계)"""
+    if novel:
+        return await _query(novel, "get_stats")
+    return {**engine.get_stats(), "search_pool": search_pool.stats(), "pid": os.getpid()}
+
+
+@app.get("/api/novels")
+async def get_novels():
+    """검색 가능한 소설(샤드) 목록"""
+    return engine.get_stats()["novels"]
 
 
 @app.get("/api/categories")
-async def get_categories():
+async def get_categories(novel: str | None = None):
     """사용 가능한 카테고리 목록"""
-    return engine.get_categories()
+    return await _query(novel, "get_categories")
 
 
 @app.get("/api/documents")
-async def get_documents():
+async def get_documents(novel: str | None = None):
     """전체 문서 목록 (내용 미포함)"""
-    return engine.get_all_documents()
+    return await _query(novel, "get_all_documents")
+
+
+def _etag_response(request: Request, payload: dict) -> Response:
+    """
+    payload["etag"] 를 ETag 헤더로 붙여 응답합니다.
+    클라이언트가 같은 값을 If-None-Match 로 보내면 본문 없이 304 를 돌려줍니다.
+
+    본문은 이 뒤에서 GZipMiddleware 가 (Accept-Encoding 과 크기에 따라) 압축할 수 있으므로,
+    gzip 본문과 원본 본문이 같은 강한 ETag 를 갖지 않도록 약한 ETag(W/)로 보내고
+    Vary: Accept-Encoding 으로 캐시가 인코딩별로 따로 저장하게 합니다.
+    """
+    etag = payload["etag"]
+    headers = {
+        "ETag": f"W/{etag}",
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-cache",   # 매번 재검증 (reload 로 바뀔 수 있음)
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
 
 
 @app.get("/api/document/{name}")
-async def get_document(name: str):
-    """특정 문서 전체 조회"""
-    doc = engine.get_document(name)
+async def get_document(name: str, request: Request, novel: str | None = None):
+    """특정 문서 전체 조회 (ETag 지원)"""
+    doc = await _query(novel, "get_document", name)
+    if not doc:
+        raise HTTPException(status_code=404, detail=f"문서 '{name}'을 찾을 수 없습니다.")
+    return _etag_response(request, doc)
+
+
+@app.get("/api/document/{name}/range")
+async def get_document_range(name: str, request: Request, start: int = 0, end: int | None = None,
+                             novel: str | None = None):
+    """
+    문서 본문 일부 조회 (문자 위치 [start, end))
+
+    사용 예시:
+      /api/document/의복_복식_DB/range?start=1192&end=1631   → 검색 결과 청크 위치 그대로
+    """
+    try:
+        doc = await _query(novel, "get_document_range", name, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not doc:
         raise HTTPException(status_code=404, detail=f"문서 '{name}'을 찾을 수 없습니다.")
-    return doc
+    return _etag_response(request, doc)
+
+
+@app.get("/api/document/{name}/chunks")
+async def get_document_chunks(name: str, request: Request, start: int = 0, end: int | None = None,
+                              novel: str | None = None):
+    """
+    문서의 청크 목록 일부 조회 (청크 순서 [start, end))
+
+    사용 예시:
+      /api/document/지리_이동_DB/chunks?start=0&end=5
+    """
+    try:
+        chunks = await _query(novel, "get_chunks", name, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not chunks:
+        raise HTTPException(status_code=404, detail=f"문서 '{name}'을 찾을 수 없습니다.")
+    return _etag_response(request, chunks)
+
+
+@app.get("/api/chunk/{chunk_id}")
+async def get_chunk(chunk_id: int, request: Request, novel: str | None = None):
+    """청크 하나 전체 조회 (검색 결과의 chunk_id + novel)"""
+    chunk = await _query(novel, "get_chunk", chunk_id)
+    if not chunk:
+        raise HTTPException(status_code=404, detail=f"청크 {chunk_id}를 찾을 수 없습니다.")
+    return _etag_response(request, chunk)
 
 
 @app.post("/api/search")
@@ -144,22 +376,115 @@ async def search(req: SearchRequest):
     사용 예시:
       {"query": "화산파 위치", "top_k": 5}
       {"query": "낙양 객잔", "category": "지리/객잔"}
+      {"query": "화산파 검법", "mode": "bm25"}
+      {"query": "매화 검술을 쓰는 문파", "mode": "vector"}
+      {"query": "남궁현 검법", "mode": "hybrid", "keyword_weight": 2, "vector_weight": 1}
+      {"query": "소연하", "mode": "fuzzy"}           → "소연화" 로 교정해서 검색 (corrections 에 표시)
+      {"query": "객잔", "top_k": 10, "offset": 10}   → 11~20위
+      {"query": "화산파", "novel": "*"}              → 모든 소설 검색 후 점수순 병합
+
+    결과의 text 는 검색어가 가장 촘촘한 800자 구간이고,
+    text_start(청크 내 시작 위치)와 highlights([시작, 끝) 목록, text 기준)가 함께 옵니다.
     """
     if not req.query.strip():
         raise HTTPException(status_code=400, detail="검색어가 비어있습니다.")
+    if req.offset < 0:
+        raise HTTPException(status_code=400, detail="offset 은 0 이상이어야 합니다.")
+    if req.mode not in SEARCH_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"지원하지 않는 검색 모드입니다: {req.mode} (가능: {', '.join(SEARCH_MODES)})",
+        )
+    if req.fusion not in FUSION_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"지원하지 않는 융합 방식입니다: {req.fusion} (가능: {', '.join(FUSION_METHODS)})",
+        )
 
-    results = engine.search(
-        query=req.query,
-        top_k=req.top_k,
-        category=req.category,
-        doc_name=req.doc_name,
-    )
-
-    return {
+    try:
+        results = await _offload(
+            engine.search,
+            query=req.query,
+            top_k=req.top_k,
+            category=req.category,
+            doc_name=req.doc_name,
+            mode=req.mode,
+            fusion=req.fusion,
+            keyword_weight=req.keyword_weight,
+            vector_weight=req.vector_weight,
+            offset=req.offset,
+            novel=req.novel,
+        )
+    except UnknownShard as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        # vector 모드인데 numpy 미설치 등
+        raise HTTPException(status_code=503, detail=str(e))
+
+    response = {
         "query": req.query,
+        "novel": req.novel or engine.default,
+        "mode": req.mode,
+        "offset": req.offset,
         "count": len(results),
         "results": results,
     }
+    if req.mode == "fuzzy" and req.novel != "*":
+        response["corrections"] = await _query(req.novel, "correct", req.query)
+    return response
+
+
+@app.post("/api/search/batch")
+async def search_batch(req: BatchSearchRequest):
+    """
+    일괄 검색 (에피소드 준비 때 필요한 검색어를 한 번에)
+
+    사용 예시:
+      {"queries": ["화산파 위치", "낙양 객잔", "매화검법"], "top_k": 3}
+      {"queries": ["화산파", "화산파 검법"], "dedupe": true}
+    """
+    queries = [query for query in req.queries if query.strip()]
+    if not queries:
+        raise HTTPException(status_code=400, detail="검색어가 비어있습니다.")
+    if req.mode not in SEARCH_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"지원하지 않는 검색 모드입니다: {req.mode} (가능: {', '.join(SEARCH_MODES)})",
+        )
+    if req.fusion not in FUSION_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"지원하지 않는 융합 방식입니다: {req.fusion} (가능: {', '.join(FUSION_METHODS)})",
+        )
+
+    try:
+        batch = await _offload(
+            engine.search_many,
+            queries,
+            top_k=req.top_k,
+            category=req.category,
+            doc_name=req.doc_name,
+            mode=req.mode,
+            fusion=req.fusion,
+            keyword_weight=req.keyword_weight,
+            vector_weight=req.vector_weight,
+            dedupe=req.dedupe,
+            novel=req.novel,
+        )
+    except UnknownShard as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {
+        "mode": req.mode,
+        "novel": req.novel or engine.default,
+        "count": len(batch),
+        "results": [
+            {"query": query, "count": len(results), "results": results}
+            for query, results in zip(queries, batch)
+        ],
+    }
 
 
 @app.post("/api/tag-search")
@@ -171,19 +496,67 @@ async def tag_search(req: TagSearchRequest):
       {"tag": "요리"}  → 음식 관련 데이터
       {"tag": "무공"}  → 무공 시스템 데이터
       {"tag": "객잔"}  → 객잔/주막 데이터
+      {"tag": "무굥"}  → @무공 결과 (corrections: {"무굥": "무공"})
+      {"tag": "무림"}  → 본문에 있는 단어라 그대로 검색 (비슷한 태그로 바꾸지 않음)
     """
     if not req.tag.strip():
         raise HTTPException(status_code=400, detail="태그가 비어있습니다.")
 
-    results = engine.search_by_tag(req.tag)
+    try:
+        results = await _offload(engine.search_by_tag, req.tag, novel=req.novel, fuzzy=req.fuzzy)
+        corrections = await _offload(engine.tag_corrections, req.tag, novel=req.novel, fuzzy=req.fuzzy)
+    except UnknownShard as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
     return {
         "tag": req.tag,
+        "novel": req.novel or engine.default,
         "count": len(results),
         "results": results,
+        "corrections": corrections,
     }
 
 
+@app.get("/api/tags")
+async def get_tags(novel: str | None = None):
+    """설정된 @태그 목록 (backend/tag_map.json)"""
+    tags = await _query(novel, "get_tags")
+    return {"count": len(tags), "tags": tags}
+
+
+@app.get("/api/suggest")
+async def suggest(q: str, limit: int = 10, novel: str | None = None):
+    """
+    입력 중 자동완성 (글자마다 호출해도 검색 채점 없이 접두어 색인만 조회)
+
+    사용 예시:
+      /api/suggest?q=서구   → 서구진, 서구진 → 개봉 ... (용어/헤딩)
+      /api/suggest?q=@무    → @태그만 (무공, 무기)
+
+    응답 예시:
+      {"query": "화산", "count": 2, "suggestions": [{"text": "화산파", "kind": "term", "score": 42.0}, ...]}
+    """
+    if limit <= 0:
+        raise HTTPException(status_code=400, detail="limit 은 1 이상이어야 합니다.")
+    suggestions = await _query(novel, "suggest", q, limit)
+    return {"query": q, "count": len(suggestions), "suggestions": suggestions}
+
+
+@app.post("/api/reload")
+async def reload_world_db():
+    """
+    world_db 변경분 재색인 (로드된 소설만, 바뀐 .md 파일만 다시 분할·색인)
+    + 새 소설 폴더 발견, 오래 안 쓴 소설 샤드 해제
+
+    응답 예시:
+      {"shards": {"murim_mna": {"generation": 3, "reindexed": ["세력도"], "added": [], "removed": [],
+                                "failed": [], "chunks": 434, "elapsed_ms": 82.4}},
+       "evicted": []}
+    """
+    # 재색인은 검색 풀 대기열과 별개로 (거절하지 않고) 기본 스레드에서
+    return await asyncio.to_thread(engine.reload)
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 메인 실행
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -197,10 +570,33 @@ if __name__ == "__main__":
         sys.exit(1)
 
     port = int(os.environ.get("RAG_PORT", 8000))
-    print(f"🌐 RAG 서버를 포트 {port}에서 시작합니다...")
+    if not PRODUCTION:
+        print(f"🌐 RAG 서버를 포트 {port}에서 시작합니다...")
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=port,
+            reload=True,
+        )
+        sys.exit(0)
+
+    # ── 운영 모드: 스냅샷을 먼저 만들어 두고 워커들이 같은 파일을 mmap 으로 공유 ──
+    # (감독 프로세스는 색인을 들고 있지 않음 — 임시 엔진으로 저장만 하고 버림)
+    if USE_SNAPSHOT:
+        prebuilt = engine.prebuild()
+        print(f"💾 {prebuilt}개 소설 스냅샷 준비 완료 (샤드: {', '.join(engine.novels)})")
+        # 스냅샷을 쓰는 프로세스는 여기 하나 — 워커는 환경 변수를 물려받아 읽기만 함
+        os.environ["RAG_SNAPSHOT_READONLY"] = "1"
+        if WATCH_INTERVAL > 0:
+            WorldDbWatcher(engine, interval=WATCH_INTERVAL,
+                           refresh=lambda: engine.prebuild(stale_only=True)).start()
+    else:
+        print("⚠️ RAG_SNAPSHOT=0 이면 워커마다 색인을 따로 만듭니다 (메모리 N배)")
+    print(f"🌐 RAG 서버를 포트 {port}에서 시작합니다... (운영 모드, 워커 {WORKERS}개)")
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=port,
-        reload=True,
+        workers=WORKERS,
+        reload=False,
     )
@@ -10,6 +10,12 @@ Anthropic API 프롬프트 캐싱으로 비용을 절감하면서
 사용법:
   pip install anthropic python-dotenv
   python backend/novel_writer.py
+  NOVEL_STREAM=0 python backend/novel_writer.py   # 스트리밍 끄기 (다 받은 뒤 한 번에 출력)
+  NOVEL_CONTEXT=full python backend/novel_writer.py  # 섹션마다 앞 본문 전체 전달 (이전 방식)
+  NOVEL_RESPONSE_CACHE=on python backend/novel_writer.py      # 같은 요청은 저장된 응답 재사용
+  NOVEL_RESPONSE_CACHE=replay python backend/novel_writer.py  # 저장된 응답만 사용 (없으면 실패)
+  ANTHROPIC_BASE_URL=http://127.0.0.1:8787 python backend/novel_writer.py
+      → 로컬 대역 서버로 실행 (먼저 python backend/anthropic_standin.py, 비용 $0)
 
 [자동화되는 것]
   ✅ 참조 자료 로딩 + 캐싱  (비용 90% 절감)
@@ -24,7 +30,9 @@ Anthropic API 프롬프트 캐싱으로 비용을 절감하면서
 
 비용 절감 원리:
   변하지 않는 자료 (무공DB, 캐릭터, 규칙) → 캐시에 고정 (90% 할인)
-  매 화마다 바뀌는 자료 (이전 화, 진행 마스터) → 캐시 밖 (전액)
+  매 화마다 바뀌는 자료 (이전 화, 진행 마스터) → 화 안에서는 고정 → user 블록 캐시 지점
+  설계안 / 캐릭터 시트 → 승인 뒤 네 섹션에서 재사용 → 블록마다 캐시 지점 (최대 4개)
+  지금까지 쓴 본문 + 지시문만 매번 전액
   직접 API 호출 → Cursor 마크업 없음
 """
 
@@ -32,7 +40,9 @@ import os
 import io
 import re
 import sys
+import json
 import time
+import hashlib
 from pathlib import Path
 from datetime import datetime
 
@@ -71,6 +81,31 @@ SYSTEM_DIR = ROOT / "system"
 MODEL = "claude-sonnet-4-20250514"
 MAX_TOKENS = 16000  # 섹션당 최대 출력 토큰
 
+MAX_RETRIES = int(os.environ.get("NOVEL_API_MAX_RETRIES", 2))   # 429/529 등 자동 재시도 횟수 (SDK)
+
+# 아래 세 모드는 setup() 에서 .env.local 을 읽은 뒤 환경 변수로 다시 정합니다 (여기 값은 기본값)
+
+# 스트리밍 — 생성되는 글자를 바로 화면에 출력 (NOVEL_STREAM=0 이면 다 받은 뒤 한 번에)
+STREAM = True
+
+# 본문 집필 때 앞 섹션을 넘기는 방식
+#   "rolling" = 앞 섹션들의 요약 + 직전 섹션 마지막 N줄 (기본, 입력 토큰 절감)
+#   "full"    = 지금까지 쓴 본문 전체 (이전 방식)
+CONTEXT_MODE = "rolling"
+CONTEXT_MODES = ("rolling", "full")
+ROLLING_TAIL_LINES = 40   # 직전 섹션에서 그대로 넘길 마지막 줄 수
+SUMMARY_TAG = "<섹션요약>"
+SUMMARY_RE = re.compile(r"<섹션요약>(.*?)</섹션요약>", re.DOTALL)
+
+# 응답 캐시 — 같은 요청(모델, 시스템, 본문, max_tokens)의 응답을 디스크에 저장
+#   "off"    = 사용 안 함 (기본)
+#   "on"     = 있으면 재사용, 없으면 API 호출 후 저장 (프롬프트 실험/반복 실행용)
+#   "replay" = 캐시에서만 응답, 없으면 즉시 실패 (API 키 불필요, 비용 $0)
+RESPONSE_CACHE_MODE = "off"
+RESPONSE_CACHE_MODES = ("off", "on", "replay")
+RESPONSE_CACHE_DIR = Path(__file__).parent / ".response_cache"
+RESPONSE_CACHE_MB = float(os.environ.get("NOVEL_RESPONSE_CACHE_MB", 200))  # 넘으면 오래 안 쓴 것부터 삭제
+
 # 비용 단가 (USD per token) — Claude Sonnet 기준
 PRICE = {
     "input":       3.00 / 1_000_000,   # $3/MTok
@@ -84,21 +119,52 @@ PRICE = {
 # 1. 환경 설정
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
+def _env_choice(name: str, default: str, choices: tuple) -> str:
+    """환경 변수 값이 허용된 값 중 하나인지 확인합니다 (아니면 안내 후 종료)."""
+    value = os.environ.get(name, default).strip()
+    if value not in choices:
+        print(f"❌ {name}={value!r} 는 지원하지 않는 값입니다. (가능: {', '.join(choices)})")
+        sys.exit(1)
+    return value
+
+
 def setup():
-    """API 키를 .env.local에서 불러와 클라이언트를 만듭니다."""
+    """API 키와 실행 모드를 .env.local(과 환경 변수)에서 불러와 클라이언트를 만듭니다."""
+    global STREAM, CONTEXT_MODE, RESPONSE_CACHE_MODE
+
     env_path = ROOT / ".env.local"
     if env_path.exists():
         load_dotenv(env_path)
 
+    # 모드 설정은 .env.local 을 읽은 뒤에 정해야 거기 적은 값도 반영됨
+    STREAM = _env_choice("NOVEL_STREAM", "1", ("1", "0")) == "1"
+    CONTEXT_MODE = _env_choice("NOVEL_CONTEXT", "rolling", CONTEXT_MODES)
+    RESPONSE_CACHE_MODE = _env_choice("NOVEL_RESPONSE_CACHE", "off", RESPONSE_CACHE_MODES)
+
+    if RESPONSE_CACHE_MODE == "replay":
+        print(f"  ✅ 재생 모드 — API 호출 없이 응답 캐시만 사용 ({RESPONSE_CACHE_DIR})")
+        return None
+
+    # API 주소: ANTHROPIC_BASE_URL (또는 NOVEL_API_BASE_URL, .env.local 도 가능) — 비우면 Anthropic 기본 주소,
+    # 로컬 대역 서버(anthropic_standin.py)로 돌릴 때 지정
+    base_url = os.environ.get("ANTHROPIC_BASE_URL") or os.environ.get("NOVEL_API_BASE_URL")
+
     # CLAUDE_API_KEY 또는 ANTHROPIC_API_KEY 둘 다 지원
     api_key = os.environ.get("CLAUDE_API_KEY") or os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key and base_url:
+        # 대역 서버는 키를 확인하지 않음
+        api_key = "sk-ant-standin"
     if not api_key:
         print("❌ API 키를 찾을 수 없습니다.")
         print("   .env.local 파일에 CLAUDE_API_KEY=sk-ant-... 가 있어야 합니다.")
         sys.exit(1)
 
-    client = Anthropic(api_key=api_key)
-    print(f"  ✅ API 연결 완료 (모델: {MODEL})")
+    if base_url:
+        client = Anthropic(api_key=api_key, base_url=base_url, max_retries=MAX_RETRIES)
+        print(f"  ✅ API 연결 완료 (모델: {MODEL}, 주소: {base_url})")
+    else:
+        client = Anthropic(api_key=api_key, max_retries=MAX_RETRIES)
+        print(f"  ✅ API 연결 완료 (모델: {MODEL})")
     return client
 
 
@@ -256,14 +322,80 @@ class CostTracker:
         self.total_cache_write = 0
         self.total_cache_read = 0
         self.calls = 0
-
-    def add(self, usage):
-        """API 응답의 usage 정보를 누적합니다."""
+        # 스트리밍 호출 속도 (첫 토큰까지 시간, 출력 토큰/초)
+        self.ttfts = []
+        self.tokens_per_sec = []
+        # 본문 집필 컨텍스트 (추정 토큰): 이전 방식(전체 본문)이었다면 vs 실제로 보낸 양
+        self.context_full = 0
+        self.context_sent = 0
+        # 캐시 블록별 적중 기록: 이름 → {"calls", "hits", "writes"}
+        self.blocks = {}
+        # 응답 캐시(디스크)에서 바로 돌려준 횟수 — API 호출/비용 없음
+        self.cached_responses = 0
+
+    def add(self, usage, layout=None):
+        """
+        API 응답의 usage 정보를 누적합니다.
+        layout 을 주면 캐시 블록별 적중/생성도 기록합니다 (add_blocks).
+        """
         self.calls += 1
-        self.total_input += getattr(usage, 'input_tokens', 0)
-        self.total_output += getattr(usage, 'output_tokens', 0)
-        self.total_cache_write += getattr(usage, 'cache_creation_input_tokens', 0)
-        self.total_cache_read += getattr(usage, 'cache_read_input_tokens', 0)
+        self.total_input += getattr(usage, 'input_tokens', 0) or 0
+        self.total_output += getattr(usage, 'output_tokens', 0) or 0
+        self.total_cache_write += getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        self.total_cache_read += getattr(usage, 'cache_read_input_tokens', 0) or 0
+        if layout:
+            self.add_blocks(usage, layout)
+
+    def add_blocks(self, usage, layout):
+        """
+        캐시 블록별 적중 추정.
+
+        layout = [(블록 이름, 글자 수, 캐시 지점 여부), ...] (요청에 들어간 순서)
+        API 는 캐시 읽기/생성 토큰 합계만 알려주고, 캐시는 앞에서부터(접두어) 맞으므로
+        블록 글자 수를 실제 입력 토큰 합계에 맞춰 환산한 뒤
+        읽은 토큰 수에 가장 가까운 캐시 지점까지를 적중, 그 뒤 생성 토큰까지를 새로 캐시로 봅니다.
+        """
+        read = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        write = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        total = (getattr(usage, 'input_tokens', 0) or 0) + read + write
+        chars = sum(size for _, size, _ in layout)
+        scale = total / chars if chars else 0
+
+        # 캐시 지점 = (이름, 그 블록 끝까지의 환산 토큰 수)
+        points = []
+        cumulative = 0
+        for name, size, breakpoint in layout:
+            cumulative += size
+            if breakpoint:
+                points.append((name, cumulative * scale))
+
+        def reached(tokens):
+            """tokens 에 가장 가까운 캐시 지점 번호 (0 이면 없음)"""
+            if tokens <= 0:
+                return 0
+            best = min(range(len(points)), key=lambda i: abs(points[i][1] - tokens))
+            return best + 1
+
+        hit_upto = reached(read)
+        write_upto = reached(read + write) if write > 0 else hit_upto
+        for i, (name, _) in enumerate(points):
+            stats = self.blocks.setdefault(name, {"calls": 0, "hits": 0, "writes": 0})
+            stats["calls"] += 1
+            if i < hit_upto:
+                stats["hits"] += 1
+            elif i < write_upto:
+                stats["writes"] += 1
+
+    def add_timing(self, ttft, output_tokens, gen_seconds):
+        """스트리밍 호출 1회의 속도를 기록합니다 (gen_seconds = 첫 토큰 ~ 마지막 토큰)."""
+        self.ttfts.append(ttft)
+        if gen_seconds > 0:
+            self.tokens_per_sec.append(output_tokens / gen_seconds)
+
+    def add_context(self, full_chars, sent_chars):
+        """step_write 한 섹션의 앞 본문 컨텍스트 크기 (한국어 대략 3자 = 1토큰)"""
+        self.context_full += full_chars // 3
+        self.context_sent += sent_chars // 3
 
     def cost(self):
         """현재까지 총 비용 (USD)"""
@@ -289,10 +421,29 @@ class CostTracker:
         print(f"  💰 비용 요약")
         print(f"  {'─'*50}")
         print(f"  API 호출 횟수     : {self.calls}회")
+        if self.cached_responses:
+            print(f"  응답 캐시 사용    : {self.cached_responses}회 (API 호출 없음)")
         print(f"  입력 토큰 (일반)  : {self.total_input:,}")
         print(f"  입력 토큰 (캐시↑) : {self.total_cache_write:,}")
         print(f"  입력 토큰 (캐시↓) : {self.total_cache_read:,}  ← 90% 할인 적용!")
         print(f"  출력 토큰         : {self.total_output:,}")
+        if self.ttfts:
+            avg_ttft = sum(self.ttfts) / len(self.ttfts)
+            print(f"  첫 토큰 (평균)    : {avg_ttft:.2f}초 (최대 {max(self.ttfts):.2f}초)")
+        if self.tokens_per_sec:
+            avg_tps = sum(self.tokens_per_sec) / len(self.tokens_per_sec)
+            print(f"  출력 속도 (평균)  : {avg_tps:.1f} 토큰/초")
+        if self.context_full != self.context_sent:
+            saved = self.context_full - self.context_sent
+            print(f"  앞 본문 컨텍스트  : ~{self.context_sent:,} 토큰 (전체 본문이면 ~{self.context_full:,})")
+            print(f"  컨텍스트 절감     : ~{saved:,} 토큰 (${saved * PRICE['input']:.4f})")
+        if self.blocks:
+            print(f"  {'─'*50}")
+            print(f"  캐시 블록별 적중 (추정)")
+            for name, stats in self.blocks.items():
+                rate = stats["hits"] / stats["calls"] * 100 if stats["calls"] else 0
+                print(f"    {name:<12}: {stats['hits']}/{stats['calls']}회 적중 ({rate:.0f}%),"
+                      f" 생성 {stats['writes']}회")
         print(f"  {'─'*50}")
         print(f"  이번 화 비용      : ${c:.4f}")
         if s > 0:
@@ -302,38 +453,158 @@ class CostTracker:
         print(f"  {'━'*50}\n")
 
 
-def call_api(client, cached_system, user_content, tracker, max_tokens=MAX_TOKENS):
+class ResponseCache:
+    """
+    내용 주소 방식 응답 캐시 (디스크).
+
+    키 = sha256(모델, 시스템 프롬프트, user 본문 블록들, max_tokens)
+    → <키 앞 2글자>/<키>.json 에 응답 텍스트와 usage 를 저장합니다.
+    전체 크기가 max_bytes 를 넘으면 마지막 사용(mtime)이 오래된 파일부터 지웁니다.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(request):
+        """요청 dict → 캐시 키 (cache_control 등 응답에 영향 없는 필드는 제외)"""
+        content = request["messages"][0]["content"]
+        if isinstance(content, list):
+            content = [block["text"] for block in content]
+        payload = json.dumps({
+            "model": request["model"],
+            "system": [block["text"] for block in request["system"]],
+            "content": content,
+            "max_tokens": request["max_tokens"],
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """저장된 응답 dict (없거나 깨졌으면 None), 읽으면 mtime 을 갱신 (LRU)"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, text, usage):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "model": MODEL,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "text": text,
+            "usage": {
+                name: getattr(usage, name, 0) or 0
+                for name in ("input_tokens", "output_tokens",
+                             "cache_creation_input_tokens", "cache_read_input_tokens")
+            },
+        }
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 오래 안 쓴 응답부터 삭제"""
+        files = []
+        total = 0
+        for path in self.root.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        files.sort()
+        while files and total > self.max_bytes:
+            _, size, path = files.pop(0)
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_DIR, int(RESPONSE_CACHE_MB * 1024 * 1024))
+
+
+def call_api(client, cached_system, user_content, tracker, max_tokens=MAX_TOKENS, stream=None,
+             cached_parts=None, refresh=False):
     """
     Anthropic API 호출 (프롬프트 캐싱 적용).
 
     cached_system  : 정적 참조 → cache_control: ephemeral 로 캐시
     user_content   : 동적 지시 → 캐시 없음 (매번 전송)
     tracker        : 비용 추적기
+    stream         : True = 생성되는 대로 화면에 출력 + 첫 토큰 시간/토큰 속도 기록
+                     (None 이면 STREAM 설정값)
+    cached_parts   : [(이름, 텍스트), ...] — user_content 앞에 순서대로 붙는 블록,
+                     블록마다 캐시 지점(cache_control)을 둠 (아래 build_cached_content)
+    refresh        : True = 응답 캐시를 읽지 않고 새로 생성 (재생성 요청, 결과는 저장)
     """
-    try:
-        response = client.messages.create(
-            model=MODEL,
-            max_tokens=max_tokens,
-            system=[
-                {
-                    "type": "text",
-                    "text": cached_system,
-                    # ↓ 이 한 줄이 비용 90% 절감의 핵심!
-                    "cache_control": {"type": "ephemeral"}
-                }
-            ],
-            messages=[
-                {"role": "user", "content": user_content}
-            ]
-        )
+    if stream is None:
+        stream = STREAM
+
+    content, layout = build_cached_content(cached_system, cached_parts, user_content)
+    request = dict(
+        model=MODEL,
+        max_tokens=max_tokens,
+        system=[
+            {
+                "type": "text",
+                "text": cached_system,
+                # ↓ 이 한 줄이 비용 90% 절감의 핵심!
+                "cache_control": {"type": "ephemeral"}
+            }
+        ],
+        messages=[
+            {"role": "user", "content": content}
+        ]
+    )
 
-        tracker.add(response.usage)
+    # ── 응답 캐시 (같은 요청이면 API 호출 없이 저장된 응답) ──
+    cache_key = None
+    if RESPONSE_CACHE_MODE in ("on", "replay"):
+        cache_key = ResponseCache.key(request)
+        cached = None if refresh and RESPONSE_CACHE_MODE == "on" else response_cache.get(cache_key)
+        if cached is not None:
+            tracker.cached_responses += 1
+            if stream:
+                # 스트리밍 화면과 같게 본문을 바로 출력
+                print(f"\n  💾 응답 캐시 사용 ({cache_key[:12]})")
+                print(SUMMARY_RE.sub("", cached["text"]).rstrip())
+            return cached["text"]
+        if RESPONSE_CACHE_MODE == "replay":
+            print(f"\n  ❌ 재생 모드: 캐시에 없는 요청입니다 ({cache_key[:12]})")
+            print(f"     NOVEL_RESPONSE_CACHE=on 으로 한 번 실행해 응답을 저장하세요.")
+            sys.exit(1)
 
-        # 응답 텍스트 추출
-        text = ""
-        for block in response.content:
-            if hasattr(block, 'text'):
-                text += block.text
+    try:
+        if stream:
+            text, usage = _call_stream(client, request, tracker, layout)
+        else:
+            response = client.messages.create(**request)
+            tracker.add(response.usage, layout)
+            usage = response.usage
+
+            # 응답 텍스트 추출
+            text = ""
+            for block in response.content:
+                if hasattr(block, 'text'):
+                    text += block.text
+
+        if cache_key:
+            response_cache.put(cache_key, text, usage)
         return text
 
     except Exception as e:
@@ -345,6 +616,84 @@ def call_api(client, cached_system, user_content, tracker, max_tokens=MAX_TOKENS
         return None
 
 
+def build_cached_content(cached_system, cached_parts, user_content):
+    """
+    user 메시지 본문을 "잘 안 바뀌는 것 → 자주 바뀌는 것" 순서의 블록들로 만듭니다.
+
+    캐시는 요청 앞에서부터 맞춰 보므로, 화 전체에서 같은 dynamic_ctx →
+    설계안 승인 뒤 고정되는 plan → char_sheets 순으로 두고 블록마다 캐시 지점을 찍으면
+    뒤 블록이 바뀌어도 앞 블록까지는 캐시 읽기(90% 할인)로 처리됩니다.
+    캐시 지점은 요청당 최대 4개 (system 1 + 여기 3), 짧은 블록(Sonnet 기준 약 1,024토큰 미만)은
+    API 가 캐시하지 않습니다. 빈 블록은 건너뜁니다.
+
+    Returns:
+        (messages content, 블록 배치 [(이름, 글자 수, 캐시 지점 여부)] — CostTracker.add_blocks 용)
+    """
+    layout = [("system", len(cached_system), True)]
+    if not cached_parts:
+        layout.append(("지시", len(user_content), False))
+        return user_content, layout
+
+    content = []
+    for name, text in cached_parts:
+        if not text:
+            continue
+        content.append({"type": "text", "text": text, "cache_control": {"type": "ephemeral"}})
+        layout.append((name, len(text), True))
+    content.append({"type": "text", "text": user_content})
+    layout.append(("지시", len(user_content), False))
+    return content, layout
+
+
+def _call_stream(client, request, tracker, layout=None):
+    """
+    스트리밍 호출 — 텍스트 조각을 받는 즉시 출력하고,
+    끝나면 최종 usage(캐시 토큰 포함)를 비용 추적기에 넘깁니다.
+    본문 끝의 <섹션요약> 블록은 다음 섹션에 넘길 용도라 화면에는 찍지 않습니다.
+    """
+    t0 = time.time()
+    t_first = None
+    parts = []
+    pending = ""        # 태그 앞부분일 수 있어 아직 안 찍은 끝 글자들
+    hidden = False      # <섹션요약> 이 나온 뒤 (나머지는 출력 안 함)
+
+    print()
+    with client.messages.stream(**request) as stream:
+        for text in stream.text_stream:
+            if t_first is None:
+                t_first = time.time()
+            parts.append(text)
+            if hidden:
+                continue
+            pending += text
+            cut = pending.find(SUMMARY_TAG)
+            if cut >= 0:
+                print(pending[:cut].rstrip(), end="", flush=True)
+                hidden = True
+                continue
+            # 조각 경계에서 태그가 잘렸을 수 있으므로 태그 앞부분과 겹치는 끝(과 그 앞 빈 줄)은 다음 조각까지 보류
+            keep = next((k for k in range(min(len(SUMMARY_TAG) - 1, len(pending)), 0, -1)
+                         if pending.endswith(SUMMARY_TAG[:k])), 0)
+            shown = pending[:len(pending) - keep].rstrip()
+            print(shown, end="", flush=True)
+            pending = pending[len(shown):]
+        final = stream.get_final_message()
+    t_end = time.time()
+    if not hidden:
+        print(pending, end="")
+    print()
+
+    tracker.add(final.usage, layout)
+    ttft = (t_first or t_end) - t0
+    output_tokens = getattr(final.usage, 'output_tokens', 0)
+    gen_seconds = t_end - (t_first or t_end)
+    tracker.add_timing(ttft, output_tokens, gen_seconds)
+    tps = output_tokens / gen_seconds if gen_seconds > 0 else 0
+    print(f"  ⏱️ 첫 토큰 {ttft:.2f}초 · {output_tokens:,} 토큰 · {tps:.1f} 토큰/초")
+
+    return "".join(parts), final.usage
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 4. 파이프라인 단계들
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -361,9 +710,7 @@ def step_plan(client, cached_sys, dynamic_ctx, ep_num, tracker):
     print(f"  📋 STEP 1/5 — 제{ep_num}화 설계안 생성")
     print(f"{'━'*60}")
 
-    prompt = f"""{dynamic_ctx}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    prompt = f"""━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 [지시] 제{ep_num}화 설계안을 작성하세요.
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
@@ -415,15 +762,20 @@ def step_plan(client, cached_sys, dynamic_ctx, ep_num, tracker):
 - 이전 화 마지막 장면과 자연스럽게 연결
 """
 
-    plan = call_api(client, cached_sys, prompt, tracker, max_tokens=4096)
+    def generate(request_text, refresh=False):
+        """설계안 생성 + 표시 (스트리밍이면 생성되는 동안 이미 출력됨)"""
+        print(f"\n{'─'*60}")
+        result = call_api(client, cached_sys, request_text, tracker, max_tokens=4096,
+                          cached_parts=[("dynamic_ctx", dynamic_ctx)], refresh=refresh)
+        if result and not STREAM:
+            print(result)
+        print(f"{'─'*60}")
+        return result
+
+    plan = generate(prompt)
     if not plan:
         return None
 
-    # 설계안 표시
-    print(f"\n{'─'*60}")
-    print(plan)
-    print(f"{'─'*60}")
-
     # 사용자 승인 루프
     while True:
         print("\n  선택지:")
@@ -439,11 +791,7 @@ def step_plan(client, cached_sys, dynamic_ctx, ep_num, tracker):
 
         elif choice == 'r':
             print("  🔄 재생성 중...")
-            plan = call_api(client, cached_sys, prompt, tracker, max_tokens=4096)
-            if plan:
-                print(f"\n{'─'*60}")
-                print(plan)
-                print(f"{'─'*60}")
+            plan = generate(prompt, refresh=True) or plan
 
         elif choice == 'e':
             print("  ✏️ 수정할 내용을 입력하세요 (빈 줄로 완료):")
@@ -461,11 +809,7 @@ def step_plan(client, cached_sys, dynamic_ctx, ep_num, tracker):
                     f"위 수정 사항을 반영하여 설계안 전체를 다시 작성하세요. "
                     f"형식은 동일하게 유지하세요."
                 )
-                plan = call_api(client, cached_sys, revised_prompt, tracker, max_tokens=4096)
-                if plan:
-                    print(f"\n{'─'*60}")
-                    print(plan)
-                    print(f"{'─'*60}")
+                plan = generate(revised_prompt) or plan
 
         elif choice == 'q':
             return None
@@ -477,6 +821,7 @@ def step_write(client, cached_sys, dynamic_ctx, plan, char_sheets, ep_num, track
     │ STEP 2: 본문 집필  (자동)           │
     │ 기→승→전→결 순서로 작성             │
     │ 이전 섹션 내용을 다음 섹션에 전달    │
+    │ (rolling: 요약 + 직전 섹션 끝부분)  │
     └─────────────────────────────────────┘
     """
     print(f"\n{'━'*60}")
@@ -491,22 +836,39 @@ def step_write(client, cached_sys, dynamic_ctx, plan, char_sheets, ep_num, track
     ]
 
     full_text = f"# 제{ep_num}화\n\n"
+    rolling = CONTEXT_MODE == "rolling"
+    # 네 섹션 모두 같은 블록 → 첫 섹션에서 캐시 생성, 나머지 섹션은 캐시 읽기
+    cached_parts = [
+        ("dynamic_ctx", dynamic_ctx),
+        ("plan", f"[승인된 설계안]\n{plan}"),
+        ("char_sheets", char_sheets),
+    ]
+    summaries = []      # [(섹션 라벨, 요약)] — rolling 모드용
+    last_section = ""   # 직전 섹션 본문
 
     for idx, (sec_name, sec_label) in enumerate(sections):
         print(f"  [{idx+1}/4] {sec_name} 작성 중...", end="", flush=True)
         t0 = time.time()
 
         # 이전 섹션들을 컨텍스트로 (연속성)
-        prev_content = full_text if idx > 0 else "(첫 섹션입니다.)"
-
-        prompt = f"""{dynamic_ctx}
-
-{char_sheets}
-
-[승인된 설계안]
-{plan}
+        full_prev = full_text if idx > 0 else "(첫 섹션입니다.)"
+        if rolling and idx > 0:
+            prev_content = build_rolling_context(summaries, last_section)
+        else:
+            prev_content = full_prev
+        tracker.add_context(len(full_prev), len(prev_content))
+
+        # rolling 모드: 다음 섹션에 넘길 요약을 본문 끝에 같이 받음 (별도 호출 없음)
+        summary_rule = ""
+        if rolling and idx < len(sections) - 1:
+            summary_rule = """
+본문을 다 쓴 뒤 맨 끝에 이 섹션의 요약을 아래 형식으로 덧붙이세요 (본문에는 포함되지 않음):
+<섹션요약>
+- 일어난 사건, 인물의 위치/상태 변화, 새로 깔린 떡밥 (3~5줄)
+</섹션요약>
+"""
 
-[지금까지 작성된 본문]
+        prompt = f"""[지금까지 작성된 본문]
 {prev_content}
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -530,21 +892,50 @@ def step_write(client, cached_sys, dynamic_ctx, plan, char_sheets, ep_num, track
 분량: 150~200줄.
 앞 섹션과 자연스럽게 이어지도록 작성하세요.
 설계안의 '{sec_label}' 파트에 충실하되, 소설적 상상력을 발휘하세요.
-"""
+{summary_rule}"""
 
-        section_text = call_api(client, cached_sys, prompt, tracker)
+        section_text = call_api(client, cached_sys, prompt, tracker, cached_parts=cached_parts)
         elapsed = time.time() - t0
 
         if not section_text:
             print(f" ❌")
             return None
 
+        section_text, summary = split_summary(section_text)
+        summaries.append((sec_label, summary))
+        last_section = section_text
+
         full_text += f"\n---\n\n{section_text}\n"
         print(f" ✅ ({len(section_text):,}자, {elapsed:.0f}초)")
 
     return full_text
 
 
+def split_summary(section_text):
+    """
+    섹션 응답에서 <섹션요약> 블록을 떼어냅니다 → (본문, 요약).
+    요약이 없으면 본문 마지막 3줄을 대신 씁니다 (섹션이 끝난 상태가 다음 섹션과 이어지므로).
+    """
+    match = SUMMARY_RE.search(section_text)
+    if match:
+        body = (section_text[:match.start()] + section_text[match.end():]).strip()
+        return body, match.group(1).strip()
+
+    body = section_text.strip()
+    lines = [line for line in body.split("\n") if line.strip()]
+    return body, "\n".join(lines[-3:])
+
+
+def build_rolling_context(summaries, last_section):
+    """앞 섹션 요약 전체 + 직전 섹션 마지막 ROLLING_TAIL_LINES 줄"""
+    summary_text = "\n\n".join(f"[{label}] {summary}" for label, summary in summaries)
+    tail = "\n".join(last_section.split("\n")[-ROLLING_TAIL_LINES:])
+    return (
+        f"(앞 섹션 요약)\n{summary_text}\n\n"
+        f"(직전 섹션 마지막 {ROLLING_TAIL_LINES}줄 — 여기서 바로 이어 쓰세요)\n{tail}"
+    )
+
+
 def step_video_memo(client, cached_sys, episode_text, ep_num, tracker):
     """
     ┌─────────────────────────────────────┐
@@ -0,0 +1,126 @@
+"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[RAG Bench] 워커 수별 검색 처리량 / 메모리 측정
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+운영 모드(uvicorn 워커 N개)와 같은 조건을 HTTP 계층 없이 재현합니다:
+  - 워커 프로세스 N개가 같은 스냅샷(.ragidx)을 mmap 으로 열고 (결과 캐시 끔)
+  - 정해진 시간 동안 검색어 목록을 돌려 가며 검색
+  - 전체 처리량(검색/초)과 워커별 RSS / PSS(공유 페이지를 나눠 센 실제 점유) 를 출력
+
+PSS 가 RSS 보다 확실히 작으면 mmap 페이지를 워커끼리 공유하고 있다는 뜻입니다.
+(PSS 는 Linux /proc/self/smaps_rollup 이 있을 때만 표시)
+
+사용법:
+  cd backend
+  python rag_bench.py                                   # 워커 1, 2, 4, 8 / 기본 world_db / 5초씩
+  python rag_bench.py --workers 1 4 --seconds 10
+  python rag_bench.py ../novels/murim_mna/world_db --mode bm25
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+from rag_engine import SEARCH_MODES, RAGEngine
+from rag_snapshot import DEFAULT_DOCS_PATH, default_snapshot_path
+
+# 작가가 실제로 자주 보내는 형태의 검색어 (단어 1~3개, @태그 검색어 포함)
+BENCH_QUERIES = [
+    "화산파", "화산파 검법", "낙양 객잔", "매화검법", "무공", "객잔 음식", "남궁세가",
+    "서구진", "표국 운송", "은자 환율", "마교", "소림사 위치", "경공", "약초", "주막",
+    "무림맹 회의", "황궁", "개봉 상권", "검법 초식", "내공 심법",
+]
+
+
+def _memory() -> dict:
+    """현재 프로세스의 RSS / PSS (KB, 측정 불가면 0)"""
+    found = {"rss_kb": 0, "pss_kb": 0}
+    try:
+        with open("/proc/self/smaps_rollup", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    found[key.lower() + "_kb"] = int(value.split()[0])
+    except OSError:
+        pass
+    return found
+
+
+def _worker(docs_path: str, snapshot_path: str, mode: str, seconds: float, start_at: float, queue) -> None:
+    """워커 1개: 스냅샷 로드 → start_at 까지 대기 → seconds 동안 검색"""
+    engine = RAGEngine(docs_path, snapshot_path=snapshot_path, cache_size=0)
+    engine.load()
+    time.sleep(max(0.0, start_at - time.time()))
+
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        engine.search(BENCH_QUERIES[done % len(BENCH_QUERIES)], mode=mode)
+        done += 1
+    queue.put({"searches": done, **_memory()})
+
+
+def run(docs_path: Path, workers: int, mode: str = "keyword", seconds: float = 5.0) -> dict:
+    """워커 workers 개로 seconds 초 동안 검색한 결과 요약"""
+    snapshot_path = default_snapshot_path(docs_path)
+    context = multiprocessing.get_context("spawn")   # uvicorn 워커와 같은 방식 (fork 로 페이지 공유 안 함)
+    queue = context.Queue()
+    start_at = time.time() + 3.0 + workers * 1.5      # 모든 워커가 로드를 마친 뒤 동시에 시작
+    processes = [
+        context.Process(target=_worker, args=(str(docs_path), str(snapshot_path), mode, seconds,
+                                              start_at, queue))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    searches = sum(report["searches"] for report in reports)
+    return {
+        "workers": workers,
+        "searches": searches,
+        "qps": round(searches / seconds, 1),
+        "rss_mb": round(sum(report["rss_kb"] for report in reports) / 1024, 1),
+        "pss_mb": round(sum(report["pss_kb"] for report in reports) / 1024, 1),
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    options = {"--workers": ["1", "2", "4", "8"], "--seconds": ["5"], "--mode": ["keyword"]}
+    positional = []
+    current = None
+    for arg in args:
+        if arg in options:
+            current = arg
+            options[arg] = []
+        elif current:
+            options[current].append(arg)
+        else:
+            positional.append(arg)
+
+    docs_path = Path(positional[0]) if positional else DEFAULT_DOCS_PATH
+    mode = options["--mode"][0]
+    if mode not in SEARCH_MODES:
+        print(f"❌ 지원하지 않는 검색 모드: {mode} (가능: {', '.join(SEARCH_MODES)})")
+        sys.exit(1)
+    seconds = float(options["--seconds"][0])
+
+    # 스냅샷을 먼저 만들어 두어야 워커들이 같은 파일을 mmap 으로 공유
+    RAGEngine(str(docs_path), snapshot_path=default_snapshot_path(docs_path)).load()
+
+    print(f"🏁 {docs_path} / mode={mode} / {seconds:g}초씩 / CPU {os.cpu_count()}개")
+    print(f"{'워커':>4} {'검색/초':>10} {'워커당':>8} {'RSS 합(MB)':>11} {'PSS 합(MB)':>11}")
+    for workers in (int(value) for value in options["--workers"]):
+        result = run(docs_path, workers, mode, seconds)
+        print(f"{workers:>4} {result['qps']:>10,.1f} {result['qps'] / workers:>8,.1f}"
+              f" {result['rss_mb']:>11,.1f} {result['pss_mb']:>11,.1f}")
+
+
+if __name__ == "__main__":
+    main()
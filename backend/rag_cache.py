@@ -0,0 +1,121 @@
+"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[RAG Cache] 검색 결과 캐시 (LRU + TTL)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+작가/Next.js rag-search 라우트가 같은 검색(@무공, @객잔 등)을 반복해서 보내므로
+(정규화된 검색어, top_k, category, doc_name, mode) 단위로 결과를 저장해 둡니다.
+
+같은 클래스를 copy=False 로 만들어 페이지네이션용 "채점된 후보 집합"(청크 id → 점수)도
+저장합니다. 이 값은 읽기 전용으로만 쓰므로 복사하지 않습니다.
+
+무효화 규칙:
+  - 색인 세대(RAGEngine.generation)가 바뀌면 전체 비움 (reload/load 후 자동)
+  - TTL 이 지난 항목은 꺼낼 때 버림
+  - 최대 개수를 넘으면 가장 오래 안 쓴 항목부터 버림 (LRU)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+def copy_results(results) -> list[dict]:
+    """
+    검색 결과 사본 — 결과 dict 와 그 안의 리스트까지 복사합니다.
+    (highlights 의 [시작, 끝] 쌍을 호출하는 쪽이 고쳐도 원본이 바뀌지 않도록, dict(result) 만으로는 공유됨)
+    """
+    copied = []
+    for result in results:
+        result = dict(result)
+        for key, value in result.items():
+            if isinstance(value, list):
+                result[key] = [list(item) if isinstance(item, list) else item for item in value]
+        copied.append(result)
+    return copied
+
+
+class QueryCache:
+    """색인 세대에 묶인 LRU/TTL 검색 결과 캐시"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0, copy: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl                      # 초 단위 (0 이하면 만료 없음)
+        self.copy = copy                    # False 면 값을 그대로 보관/반환 (읽기 전용 값)
+        self._entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+
+        # ── 크기 조정용 카운터 ──
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _sync_generation(self, generation: int) -> None:
+        """세대가 바뀌었으면 전체 비움 (락 안에서 호출)"""
+        if generation != self._generation:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._generation = generation
+
+    def get(self, generation: int, key: tuple):
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._sync_generation(generation)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, results = entry
+            if self.ttl > 0 and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+        if not self.copy:
+            return results
+        # 호출하는 쪽이 결과를 고쳐도 캐시가 오염되지 않도록 복사본 반환
+        return copy_results(results)
+
+    def put(self, generation: int, key: tuple, results) -> None:
+        if not self.enabled:
+            return
+        stored = copy_results(results) if self.copy else results
+        with self._lock:
+            self._sync_generation(generation)
+            self._entries[key] = (time.monotonic(), stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
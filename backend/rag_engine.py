@@ -7,40 +7,241 @@ novels/murim_mna/world_db/*.md 파일들을 로드하고 검색 기능을 제공
 
 검색 모드:
 1. 키워드 검색 (기본) - 항상 동작, 외부 API 불필요
-2. 시맨틱 검색 (선택) - OpenAI Embeddings API 필요
+2. BM25 검색 (mode="bm25") - 길이 정규화 + IDF, 긴 섹션/흔한 단어 편향 보정
+3. 벡터 검색 (mode="vector") - NumPy 로컬 해싱 TF-IDF 임베딩, 외부 API 불필요 (rag_vector)
+4. 하이브리드 (mode="hybrid") - BM25 후보 + 벡터 후보를 RRF/가중합으로 융합
+5. 오타 허용 (mode="fuzzy") - 색인에 없는 단어를 용어 사전의 가장 가까운 단어로 교정 후 키워드 검색 (rag_fuzzy)
+
+검색 구조:
+  load() 시점에 역색인(rag_index.InvertedIndex)을 만들고,
+  search()는 검색어가 들어 있는 청크만 점수를 계산합니다.
+  category/doc_name 필터는 세대마다 미리 나눠 둔 청크 id 구간(FilterIndex)으로 바꿔
+  그 구간 안의 포스팅만 읽습니다.
 
 사용 예시:
   engine = RAGEngine("../novels/murim_mna/world_db")
   results = engine.search("화산파 위치", top_k=5)
 """
 
+import hashlib
+import heapq
+import json
 import os
 import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
+from rag_cache import QueryCache, copy_results
+from rag_fuzzy import FuzzyIndex, edit_distance, max_edits
+from rag_index import WORD_RE, InvertedIndex
+from rag_suggest import SUGGEST_LIMIT, SuggestIndex
+from rag_vector import VectorIndex, numpy_available
+
 
 class Document:
     """세계관 문서 하나를 나타내는 클래스"""
 
+    __slots__ = ("name", "category", "content", "path", "chunks", "_etag")
+
     def __init__(self, name: str, category: str, content: str, path: str):
-        self.name = name           # 파일명 (확장자 제외)
-        self.category = category   # 카테고리 (파일명에서 추론)
-        self.content = content     # 전체 텍스트
+        self.name = sys.intern(name)          # 파일명 (확장자 제외)
+        self.category = sys.intern(category)  # 카테고리 (파일명에서 추론, 문서끼리 공유)
+        self.content = content     # 전체 텍스트 (청크 본문은 이 문자열의 구간)
         self.path = path           # 파일 경로
-        self.chunks: list[dict] = []  # 분할된 청크들
+        self.chunks: list[Chunk] = []  # 분할된 청크들
+        self._etag: Optional[str] = None
+
+    @property
+    def etag(self) -> str:
+        """본문 해시 (HTTP ETag 용, 처음 쓸 때 한 번만 계산)"""
+        if self._etag is None:
+            self._etag = hashlib.blake2b(self.content.encode("utf-8"), digest_size=8).hexdigest()
+        return self._etag
 
 
 class Chunk:
-    """문서의 분할된 조각"""
+    """
+    문서의 분할된 조각.
+    본문을 따로 복사하지 않고 Document.content 의 [start, end) 구간만 가리킵니다.
+    """
+
+    __slots__ = ("document", "start", "end", "heading", "index", "id")
 
-    def __init__(self, doc_name: str, category: str, heading: str, text: str, index: int):
-        self.doc_name = doc_name
-        self.category = category
-        self.heading = heading     # 해당 청크의 제목/헤딩
-        self.text = text           # 청크 본문
+    def __init__(self, document: Document, start: int, end: int, heading: str, index: int):
+        self.document = document
+        self.start = start         # Document.content 내 시작 위치
+        self.end = end             # Document.content 내 끝 위치 (미포함)
+        self.heading = sys.intern(heading)  # 해당 청크의 제목/헤딩
         self.index = index         # 청크 순서
-        self.score: float = 0.0    # 검색 점수
+        self.id = -1               # 전체 청크 리스트 내 위치 (색인 키)
+
+    @property
+    def doc_name(self) -> str:
+        return self.document.name
+
+    @property
+    def category(self) -> str:
+        return self.document.category
+
+    @property
+    def text(self) -> str:
+        """청크 본문 (호출할 때마다 문서 본문에서 잘라냄)"""
+        return self.document.content[self.start:self.end]
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def snippet(self, limit: int, offset: int = 0) -> str:
+        """본문 [offset, offset + limit) 구간 (전체 본문을 만들지 않고 잘라냄)"""
+        start = self.start + offset
+        return self.document.content[start:min(self.end, start + limit)]
+
+
+class IndexGeneration:
+    """
+    한 시점의 문서/청크/색인 묶음 (한 "세대").
+    reload() 는 새 세대를 끝까지 만든 뒤 참조 하나만 바꿔 끼우므로,
+    검색 중인 요청은 항상 완성된 한 세대만 보게 됩니다.
+    """
+
+    def __init__(self, documents: list[Document], chunks: list[Chunk], index: InvertedIndex,
+                 file_stats: dict[str, tuple[int, int]], number: int):
+        self.documents = documents
+        self.chunks = chunks
+        self.index = index
+        self.file_stats = file_stats   # 파일명 → (크기, mtime_ns) — 변경 감지용
+        self.number = number           # 세대 번호 (load/reload 마다 증가)
+        self.vectors: Optional[VectorIndex] = None   # 벡터 모드용 임베딩 행렬
+        self.filters = FilterIndex(documents)        # 카테고리/문서명 필터 → 청크 id 구간
+        self.tags: dict[str, list[dict]] = {}        # @태그 → 미리 계산한 결과 (발행 전에 채움)
+        self.by_name = {doc.name: doc for doc in documents}   # 문서명 → 문서 (O(1) 조회)
+        self.fuzzy: Optional[FuzzyIndex] = None      # fuzzy 모드용 용어 사전 (삭제 색인은 첫 교정 때 빌드)
+        self.suggest: Optional[SuggestIndex] = None  # 입력 중 자동완성 (첫 자동완성 요청 때 빌드)
+
+
+# 필터 구간 ((시작, 끝), ...) — 청크 id [시작, 끝)
+Ranges = tuple[tuple[int, int], ...]
+
+
+def _merge_ranges(ranges) -> Ranges:
+    """정렬 후 겹치거나 맞닿은 구간을 합칩니다"""
+    merged: list[list[int]] = []
+    for lo, hi in sorted(ranges):
+        if lo >= hi:
+            continue
+        if merged and lo <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return tuple((lo, hi) for lo, hi in merged)
+
+
+def _intersect_ranges(a: Ranges, b: Ranges) -> Ranges:
+    """정렬된 두 구간 목록의 교집합"""
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        lo = max(a[i][0], b[j][0])
+        hi = min(a[i][1], b[j][1])
+        if lo < hi:
+            result.append((lo, hi))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return tuple(result)
+
+
+class FilterIndex:
+    """
+    카테고리/문서명 필터 → 후보 청크 id 구간.
+
+    한 문서의 청크 id 는 연속이므로 문서 하나 = 구간 하나입니다.
+    필터 의미는 기존과 같은 부분 문자열 포함("지리" → "지리/지역", "지리/객잔", ...)이며,
+    카테고리 계층의 모든 접두사("지리", "지리/", "지리/객잔")는 세대를 만들 때 미리 풀어 두고
+    그 밖의 필터 문자열은 처음 쓰일 때 풀어서 저장합니다 (문서 수만큼만 비교).
+    """
+
+    MAX_RESOLVED = 1024   # 임의 필터 문자열 저장 상한 (넘으면 비움)
+
+    def __init__(self, documents: list[Document]):
+        self.doc_ranges: dict[str, Ranges] = {}       # 문서명 → 구간
+        self.category_ranges: dict[str, Ranges] = {}  # 카테고리 → 구간
+        start = 0
+        by_category: dict[str, list[tuple[int, int]]] = {}
+        for doc in documents:
+            end = start + len(doc.chunks)
+            self.doc_ranges[doc.name] = ((start, end),)
+            by_category.setdefault(doc.category, []).append((start, end))
+            start = end
+        self.category_ranges = {
+            category: _merge_ranges(ranges) for category, ranges in by_category.items()
+        }
+
+        # ── 카테고리 계층 접두사 미리 풀기 ("무공", "무공/", "무공/전투") ──
+        self.prefix_ranges: dict[str, Ranges] = {}
+        for category in self.category_ranges:
+            parts = category.split("/")
+            for depth in range(1, len(parts) + 1):
+                prefix = "/".join(parts[:depth])
+                for key in (prefix, prefix + "/") if depth < len(parts) else (prefix,):
+                    if key not in self.prefix_ranges:
+                        self.prefix_ranges[key] = self._union(self.category_ranges, key)
+
+        self._resolved: dict[tuple[str, str], Ranges] = {}   # 그 밖의 필터 문자열
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _union(table: dict[str, Ranges], needle: str) -> Ranges:
+        """needle 을 부분 문자열로 포함하는 모든 키의 구간 합집합"""
+        return _merge_ranges(
+            span for key, spans in table.items() if needle in key for span in spans
+        )
+
+    def _lookup(self, kind: str, needle: str) -> Ranges:
+        if kind == "category":
+            ranges = self.prefix_ranges.get(needle)
+            if ranges is not None:
+                return ranges
+        ranges = self._resolved.get((kind, needle))
+        if ranges is None:
+            table = self.category_ranges if kind == "category" else self.doc_ranges
+            ranges = self._union(table, needle)
+            with self._lock:
+                if len(self._resolved) >= self.MAX_RESOLVED:
+                    self._resolved.clear()
+                self._resolved[(kind, needle)] = ranges
+        return ranges
+
+    def ranges(self, category: Optional[str], doc_name: Optional[str]) -> Optional[Ranges]:
+        """필터에 해당하는 청크 id 구간 (필터가 없으면 None = 전체)"""
+        if not category and not doc_name:
+            return None
+        result: Optional[Ranges] = None
+        if category:
+            result = self._lookup("category", category)
+        if doc_name:
+            doc_ranges = self._lookup("doc", doc_name)
+            result = doc_ranges if result is None else _intersect_ranges(result, doc_ranges)
+        return result
+
+
+def _ms(since: float) -> float:
+    """since(perf_counter) 이후 경과 시간 (ms)"""
+    return round((time.perf_counter() - since) * 1000, 1)
+
+
+def _file_stats(md_files: list[Path]) -> dict[str, tuple[int, int]]:
+    """파일명 → (크기, mtime_ns)"""
+    stats = {}
+    for md_file in md_files:
+        stat = md_file.stat()
+        stats[md_file.name] = (stat.st_size, stat.st_mtime_ns)
+    return stats
 
 
 # ── 카테고리 매핑 (파일명 → 카테고리) ──
@@ -70,6 +271,166 @@ CATEGORY_MAP = {
 }
 
 
+# ── 검색 모드 ──
+SEARCH_MODES = ("keyword", "bm25", "vector", "hybrid", "fuzzy")
+
+# ── 하이브리드 융합 ──
+FUSION_METHODS = ("rrf", "weighted")
+RRF_K = 60                   # RRF 상수: 1 / (RRF_K + 순위)
+HYBRID_DEPTH_FACTOR = 4      # 각 검색기가 내는 후보 수 = max(top_k × 4, 최소값)
+HYBRID_MIN_DEPTH = 40
+
+
+# ── @태그 매핑 (태그 → 검색어 + 카테고리, 코드 수정 없이 태그 추가) ──
+TAG_MAP_PATH = Path(__file__).parent / "tag_map.json"
+TAG_TOP_K = 10
+
+
+def load_tag_map(path: Path) -> dict[str, dict]:
+    """
+    태그 설정 파일을 읽습니다.
+    형식: {"요리": {"query": "요리 음식 메뉴", "category": "생활/음식·건축"}, ...}
+    (category 는 생략 가능, 파일이 없거나 깨졌으면 빈 매핑 = 모든 태그를 일반 검색)
+    """
+    try:
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        print(f"  ⚠️ 태그 설정 파일 없음: {path}")
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"  ⚠️ 태그 설정 파일 읽기 실패: {path} ({e})")
+        return {}
+
+    tag_map = {}
+    for tag, entry in raw.items():
+        if not isinstance(entry, dict) or not str(entry.get("query", "")).strip():
+            print(f"  ⚠️ 태그 설정 무시 (query 없음): {tag}")
+            continue
+        tag_map[tag.lstrip("@").strip()] = {
+            "query": entry["query"],
+            "category": entry.get("category") or None,
+        }
+    return tag_map
+
+
+# ── 로드 워커 풀 ("thread" = 스레드, "process" = 프로세스 — 분할이 GIL 에 묶이지 않음) ──
+LOAD_EXECUTORS = ("thread", "process")
+
+
+# ── 검색 결과 스니펫 ──
+SNIPPET_CHARS = 800     # 결과 본문 길이
+SNIPPET_LEAD = 80       # 첫 매칭 앞에 남겨 둘 문맥 (최대)
+
+
+def _densest_window(hits: list[tuple[int, int, str]], length: int, width: int) -> int:
+    """
+    길이 width 구간 중 검색어가 가장 촘촘한 구간의 시작 위치.
+    (서로 다른 단어 수 → 전체 매칭 수 순으로 비교, 같으면 앞쪽 구간)
+    """
+    if length <= width or not hits:
+        return 0
+
+    best = (0, 0)
+    best_left = best_right = 0
+    words: dict[str, int] = {}
+    right = 0
+    for left in range(len(hits)):
+        limit = hits[left][0] + width
+        while right < len(hits) and hits[right][1] <= limit:
+            word = hits[right][2]
+            words[word] = words.get(word, 0) + 1
+            right += 1
+        score = (len(words), right - left)
+        if score > best:
+            best, best_left, best_right = score, left, right
+        word = hits[left][2]
+        words[word] -= 1
+        if not words[word]:
+            del words[word]
+
+    first = hits[best_left][0]
+    span = hits[best_right - 1][1] - first
+    lead = min(SNIPPET_LEAD, max(0, width - span))
+    return max(0, min(first - lead, length - width))
+
+
+# ── 청크 분할 패턴 ──
+SECTION_RE = re.compile(r'\n(?=##\s)')
+SUBSECTION_RE = re.compile(r'\n(?=###\s)')
+HEADING_RE = re.compile(r'(#{1,4})\s+(.+)')
+
+
+def _split_spans(content: str, pattern: re.Pattern, start: int, end: int) -> list[tuple[int, int]]:
+    """content[start:end] 을 pattern 으로 나눈 구간들 (re.split 과 같은 결과를 오프셋으로)"""
+    spans = []
+    for match in pattern.finditer(content, start, end):
+        spans.append((start, match.start()))
+        start = match.end()
+    spans.append((start, end))
+    return spans
+
+
+def _strip_span(content: str, start: int, end: int) -> tuple[int, int]:
+    """구간 양끝 공백 제거 (str.strip 과 같은 기준)"""
+    while start < end and content[start].isspace():
+        start += 1
+    while end > start and content[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def chunk_spans(content: str) -> list[tuple[int, int, str]]:
+    """
+    마크다운 문서를 헤딩(##, ###) 기준으로 청크 구간 [(시작, 끝, 헤딩), ...] 으로 나눕니다.
+    테이블, 코드블록도 포함하여 의미 단위로 분리합니다.
+    """
+    spans: list[tuple[int, int, str]] = []
+
+    # ── ## 또는 ### 기준으로 섹션 분리 ──
+    for idx, (start, end) in enumerate(_split_spans(content, SECTION_RE, 0, len(content))):
+        start, end = _strip_span(content, start, end)
+        if end - start < 10:
+            continue
+
+        # 헤딩 추출
+        heading_match = HEADING_RE.match(content, start, end)
+        heading = heading_match.group(2).strip() if heading_match else f"섹션 {idx + 1}"
+
+        # 청크가 너무 크면 더 분할 (1500자 초과 시)
+        if end - start > 1500:
+            for sub_start, sub_end in _split_spans(content, SUBSECTION_RE, start, end):
+                sub_start, sub_end = _strip_span(content, sub_start, sub_end)
+                if sub_end - sub_start < 10:
+                    continue
+                sub_heading_match = HEADING_RE.match(content, sub_start, sub_end)
+                sub_heading = sub_heading_match.group(2).strip() if sub_heading_match else heading
+                spans.append((sub_start, sub_end, sub_heading))
+        else:
+            spans.append((start, end, heading))
+
+    return spans
+
+
+def _read_and_split(path: str) -> tuple[Optional[str], list[tuple[int, int, str]], float, float, Optional[str]]:
+    """
+    파일 하나 읽기 + 청크 구간 계산 (로드 워커에서 실행, 프로세스 풀에서도 쓰도록 모듈 함수).
+
+    Returns:
+        (본문 또는 None, 청크 구간, 읽기 초, 분할 초, 오류 메시지)
+    """
+    t0 = time.perf_counter()
+    try:
+        content = Path(path).read_text(encoding="utf-8")
+    except Exception as e:
+        return None, [], time.perf_counter() - t0, 0.0, str(e)
+    t1 = time.perf_counter()
+    try:
+        spans = chunk_spans(content)
+    except Exception as e:
+        return None, [], t1 - t0, time.perf_counter() - t1, str(e)
+    return content, spans, t1 - t0, time.perf_counter() - t1, None
+
+
 def _guess_category(filename: str) -> str:
     """파일명에서 카테고리를 추론합니다"""
     for keyword, category in CATEGORY_MAP.items():
@@ -86,101 +447,443 @@ class RAGEngine:
         engine = RAGEngine("../novels/murim_mna/world_db")
         engine.load()
         results = engine.search("화산파", top_k=5)
+
+    같은 검색은 결과 캐시(rag_cache.QueryCache, cache_size=0 이면 끔)에서 바로 돌려주며,
+    load/reload 로 세대가 바뀌면 캐시는 자동으로 비워집니다.
+
+    snapshot_path 를 주면 색인을 디스크 스냅샷(rag_snapshot)으로 저장해 두고,
+    원본 .md 가 바뀌지 않은 다음 부팅부터는 mmap 으로 바로 불러옵니다.
+    snapshot_readonly=True 면 스냅샷을 쓰지 않고, reload 때도 다른 프로세스가 새로 쓴 스냅샷이
+    원본과 맞으면 그것을 mmap 으로 붙여 씁니다 (아직 없으면 바뀐 문서만 메모리에서 재색인).
     """
 
-    def __init__(self, docs_path: str):
+    def __init__(self, docs_path: str, snapshot_path: Optional[str] = None,
+                 cache_size: int = 256, cache_ttl: float = 300.0,
+                 vectors: Optional[bool] = None, tag_map_path: Optional[str] = None,
+                 load_workers: Optional[int] = None, load_executor: str = "thread",
+                 snapshot_readonly: bool = False):
         self.docs_path = Path(docs_path)
-        self.documents: list[Document] = []
-        self.chunks: list[Chunk] = []
+        # 파일 읽기/분할 워커 수 (None = CPU 수, 최대 8 / 1 이하 = 순차) 와 풀 종류
+        if load_executor not in LOAD_EXECUTORS:
+            raise ValueError(f"지원하지 않는 로드 방식: {load_executor} (가능: {', '.join(LOAD_EXECUTORS)})")
+        self.load_workers = min(8, os.cpu_count() or 1) if load_workers is None else load_workers
+        self.load_executor = load_executor
+        self.last_load: dict = {}   # 마지막 load() 단계별 소요 시간
+        # @태그 매핑 (엔진 생성 시 한 번만 읽음)
+        self.tag_map = load_tag_map(Path(tag_map_path) if tag_map_path else TAG_MAP_PATH)
+        # 벡터 임베딩을 load/reload 때 미리 계산할지 (기본: numpy 가 있으면 계산)
+        self.vectors_enabled = numpy_available() if vectors is None else vectors
+        self._vector_lock = threading.Lock()
+        self._suggest_lock = threading.Lock()
+        self._hybrid_pool: Optional[ThreadPoolExecutor] = None
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        # 스냅샷/벡터 .npy 를 읽기만 하고 쓰지 않음 (운영 모드 워커 — 쓰는 쪽은 감독 프로세스 하나)
+        self.snapshot_readonly = snapshot_readonly
+        self._behind_snapshot = False   # 읽기 전용인데 스냅샷보다 앞서 메모리에서 재색인한 상태
+        self.cache = QueryCache(max_entries=cache_size, ttl=cache_ttl)
+        # 페이지네이션용 채점된 후보 집합 (청크 id → 점수, 읽기 전용이라 복사 안 함)
+        self._candidates = QueryCache(max_entries=cache_size, ttl=cache_ttl, copy=False)
+        self._generation = IndexGeneration([], [], InvertedIndex(), {}, 0)
+        self._reload_lock = threading.Lock()
         self._loaded = False
 
+    # ── 현재 세대 접근 (세대 교체는 reload 참고) ──
+    @property
+    def documents(self) -> list[Document]:
+        return self._generation.documents
+
+    @property
+    def chunks(self) -> list[Chunk]:
+        return self._generation.chunks
+
+    @property
+    def index(self) -> InvertedIndex:
+        return self._generation.index
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def generation(self) -> int:
+        return self._generation.number
+
+    @property
+    def file_stats(self) -> dict[str, tuple[int, int]]:
+        """현재 세대를 읽기 전에 잰 파일명 → (크기, mtime_ns)"""
+        return self._generation.file_stats
+
     def load(self) -> int:
-        """world_db 폴더의 모든 .md 파일을 로드하고 청크로 분할합니다"""
-        self.documents = []
-        self.chunks = []
+        """
+        world_db 폴더의 모든 .md 파일을 로드하고 청크로 분할합니다.
+        단계별 소요 시간(읽기/분할/색인/...)은 self.last_load 와 get_stats()["load"] 에 남습니다.
 
+        기본 world_db(18개 문서, 433청크, 1코어)에서 스냅샷 없이 읽으면
+        읽기+분할 ~10ms, 색인 ~200ms, 발행 ~200ms (numpy 가 있으면 임베딩 계산이 대부분) 입니다.
+        색인은 문서별 조각이라 워커에서 만들 수도 있지만, 프로세스 풀에서는 조각을 돌려받는
+        pickle 비용(~370ms)이 만드는 비용보다 커서 메인 스레드에서 만듭니다.
+        """
+        with self._reload_lock:
+            return self._load()
+
+    def _load(self) -> int:
+        t_start = time.perf_counter()
         if not self.docs_path.exists():
             print(f"⚠️ 경로가 존재하지 않습니다: {self.docs_path}")
+            self._publish([], [], InvertedIndex(), {})
             return 0
 
         md_files = sorted(self.docs_path.glob("*.md"))
-        print(f"📂 {len(md_files)}개의 .md 파일 발견")
-
-        for md_file in md_files:
-            try:
-                content = md_file.read_text(encoding="utf-8")
-                name = md_file.stem  # 확장자 제외 파일명
-                category = _guess_category(name)
-
-                doc = Document(
-                    name=name,
-                    category=category,
-                    content=content,
-                    path=str(md_file),
-                )
+        # 읽기 전에 기록해야 읽는 도중 바뀐 파일을 다음 reload 에서 놓치지 않음
+        file_stats = _file_stats(md_files)
+        timings = {"files": len(md_files)}
 
-                # 청크 분할
-                doc_chunks = self._split_into_chunks(doc)
-                doc.chunks = doc_chunks
-                self.documents.append(doc)
-                self.chunks.extend(doc_chunks)
+        # ── 스냅샷이 유효하면 재분할/재색인 없이 바로 사용 ──
+        if self.snapshot_path:
+            t0 = time.perf_counter()
+            restored = self._load_snapshot(md_files, file_stats)
+            timings["snapshot_load_ms"] = _ms(t0)
+            if restored:
+                timings.update(source="snapshot", chunks=len(self.chunks), total_ms=_ms(t_start))
+                self.last_load = timings
+                return len(self.chunks)
 
-                print(f"  ✅ {name} ({category}) → {len(doc_chunks)}개 청크")
+        # ── 파일 읽기 + 청크 분할 (워커 풀) ──
+        t0 = time.perf_counter()
+        documents, read_s, split_s = self._read_documents(md_files)
+        timings["read_split_wall_ms"] = _ms(t0)
+        timings["io_ms"] = round(read_s * 1000, 1)          # 워커별 시간 합
+        timings["chunking_ms"] = round(split_s * 1000, 1)   # 워커별 시간 합
+        timings["workers"] = self.load_workers
+        timings["executor"] = self.load_executor
 
-            except Exception as e:
-                print(f"  ❌ {md_file.name} 로드 실패: {e}")
+        # ── 역색인 구축 ──
+        t0 = time.perf_counter()
+        chunks: list[Chunk] = []
+        for doc in documents:
+            chunks.extend(doc.chunks)
+        for chunk_id, chunk in enumerate(chunks):
+            chunk.id = chunk_id
+        index = InvertedIndex()
+        index.build([doc.chunks for doc in documents])
+        timings["indexing_ms"] = _ms(t0)
 
+        # ── 세대 교체 (벡터 임베딩 + @태그 결과 포함) ──
+        t0 = time.perf_counter()
+        self._publish(documents, chunks, index, file_stats)
+        timings["publish_ms"] = _ms(t0)
+
+        if self.snapshot_path and self.snapshot_readonly:
+            self._behind_snapshot = True
+        elif self.snapshot_path:
+            t0 = time.perf_counter()
+            self._save_snapshot(file_stats)
+            timings["snapshot_save_ms"] = _ms(t0)
+
+        timings.update(source="files", documents=len(documents), chunks=len(chunks),
+                       terms=index.vocabulary_size, total_ms=_ms(t_start))
+        self.last_load = timings
+        print(f"📊 {len(documents)}개 문서, {len(chunks)}개 청크 로드 ({timings['total_ms']}ms —"
+              f" 읽기 {timings['io_ms']} / 분할 {timings['chunking_ms']} / 색인 {timings['indexing_ms']}ms,"
+              f" {self.load_executor} × {self.load_workers})")
+        return len(chunks)
+
+    def _read_documents(self, md_files: list[Path]) -> tuple[list[Document], float, float]:
+        """
+        파일들을 워커 풀에서 읽고 분할합니다.
+        결과는 파일 순서(이름순)대로 합치므로 워커 수와 상관없이 청크 id 가 같습니다.
+
+        Returns:
+            (문서 리스트, 워커별 읽기 시간 합, 분할 시간 합) — 시간은 초
+        """
+        paths = [str(md_file) for md_file in md_files]
+        workers = min(self.load_workers, len(paths))
+        if workers <= 1:
+            outputs = [_read_and_split(path) for path in paths]
+        else:
+            pool_class = ProcessPoolExecutor if self.load_executor == "process" else ThreadPoolExecutor
+            with pool_class(max_workers=workers) as pool:
+                outputs = list(pool.map(_read_and_split, paths))
+
+        documents: list[Document] = []
+        read_total = split_total = 0.0
+        for md_file, (content, spans, read_s, split_s, error) in zip(md_files, outputs):
+            read_total += read_s
+            split_total += split_s
+            doc = self._build_document(md_file, content, spans, error)
+            if doc:
+                documents.append(doc)
+        return documents, read_total, split_total
+
+    @staticmethod
+    def _build_document(md_file: Path, content: Optional[str], spans: list[tuple[int, int, str]],
+                        error: Optional[str]) -> Optional[Document]:
+        """워커 결과 → Document + Chunk (실패면 None)"""
+        if content is None:
+            print(f"  ❌ {md_file.name} 로드 실패: {error}")
+            return None
+        doc = Document(
+            name=md_file.stem,  # 확장자 제외 파일명
+            category=_guess_category(md_file.stem),
+            content=content,
+            path=str(md_file),
+        )
+        doc.chunks = [
+            Chunk(doc, start, end, heading, index=index)
+            for index, (start, end, heading) in enumerate(spans)
+        ]
+        return doc
+
+    def _publish(self, documents: list[Document], chunks: list[Chunk], index: InvertedIndex,
+                 file_stats: dict[str, tuple[int, int]]) -> None:
+        """
+        새 세대를 (벡터 임베딩까지 다 만든 뒤) 한 번에 교체합니다.
+
+        오타 사전(rag_fuzzy)과 자동완성(rag_suggest)은 여기서 만들지 않고 세대가 처음 쓸 때 만듭니다.
+        둘 다 어휘 전체를 훑어 수백 ms 가 걸리는데, 발행은 스냅샷 부팅과 변경분 reload 마다 일어나고
+        그 뒤 한 번도 교정/자동완성을 안 쓰는 세대도 많기 때문입니다.
+        """
+        generation = IndexGeneration(
+            documents, chunks, index, file_stats, self._generation.number + 1
+        )
+        if self.vectors_enabled:
+            self._vector_index(generation)
+        generation.fuzzy = FuzzyIndex.from_index(index, previous=self._generation.fuzzy)
+        self._materialize_tags(generation)
+        self._generation = generation
         self._loaded = True
-        print(f"\n📊 총 {len(self.documents)}개 문서, {len(self.chunks)}개 청크 로드 완료")
-        return len(self.chunks)
 
-    def _split_into_chunks(self, doc: Document) -> list[Chunk]:
+    def _materialize_tags(self, generation: IndexGeneration) -> None:
+        """모든 @태그의 결과를 새 세대로 미리 계산합니다 (같은 검색어+카테고리 태그는 한 번만)"""
+        by_query: dict[tuple[str, Optional[str]], list[dict]] = {}
+        memo: dict = {}
+        for tag, mapped in self.tag_map.items():
+            key = (mapped["query"], mapped["category"])
+            if key not in by_query:
+                query_lower = mapped["query"].lower().strip()
+                by_query[key] = [result for _, result in self._rank(
+                    generation, query_lower, set(WORD_RE.findall(query_lower)), TAG_TOP_K,
+                    mapped["category"], None, "keyword", memo=memo,
+                )]
+            generation.tags[tag] = by_query[key]
+
+    def _vector_index(self, generation: IndexGeneration) -> VectorIndex:
+        """세대의 임베딩 행렬 (없으면 계산, 스냅샷 폴더가 있으면 .npy 로 저장/재사용)"""
+        if generation.vectors is None:
+            with self._vector_lock:
+                if generation.vectors is None:
+                    cache_dir = self.snapshot_path.parent if self.snapshot_path else None
+                    name = self.snapshot_path.stem if self.snapshot_path else self.docs_path.name
+                    generation.vectors = VectorIndex.load_or_build(
+                        generation.chunks, cache_dir=cache_dir, name=name,
+                        save=not self.snapshot_readonly,
+                    )
+        return generation.vectors
+
+    def _suggest_index(self, generation: IndexGeneration) -> SuggestIndex:
+        """세대의 자동완성 색인 (없으면 지금 빌드)"""
+        if generation.suggest is None:
+            with self._suggest_lock:
+                if generation.suggest is None:
+                    generation.suggest = SuggestIndex.build(
+                        generation.documents, generation.chunks, generation.index, self.tag_map
+                    )
+        return generation.suggest
+
+    def _read_document(self, md_file: Path) -> Optional[Document]:
+        """.md 파일 하나를 읽어 청크로 분할합니다 (실패하면 None)"""
+        content, spans, _, _, error = _read_and_split(str(md_file))
+        return self._build_document(md_file, content, spans, error)
+
+    def reload(self) -> dict:
         """
-        마크다운 문서를 헤딩(##, ###) 기준으로 청크 분할합니다.
-        테이블, 코드블록도 포함하여 의미 단위로 분리합니다.
+        world_db 에서 바뀐 .md 파일만 다시 읽어 색인을 갱신합니다.
+        바뀐 문서만 재분할·재토큰화해 그 문서의 색인 조각만 바꾸고 (InvertedIndex.replaced),
+        새 세대를 만든 뒤 교체합니다. 다른 문서의 포스팅 배열은 새 세대와 그대로 공유합니다.
+
+        Returns:
+            {"generation", "reindexed", "added", "removed", "failed", "chunks", "elapsed_ms"}
         """
+        with self._reload_lock:
+            if not self._loaded:
+                t0 = time.perf_counter()
+                self._load()
+                return {
+                    "generation": self.generation,
+                    "reindexed": [],
+                    "added": [doc.name for doc in self.documents],
+                    "removed": [],
+                    "failed": [],
+                    "chunks": len(self.chunks),
+                    "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+                }
+            return self._reload_changed()
+
+    def _reload_changed(self) -> dict:
+        t0 = time.perf_counter()
+        current = self._generation
+        md_files = sorted(self.docs_path.glob("*.md")) if self.docs_path.exists() else []
+        by_name = {md_file.name: md_file for md_file in md_files}
+        file_stats = _file_stats(md_files)
+
+        changed = sorted(
+            name for name in file_stats.keys() | current.file_stats.keys()
+            if file_stats.get(name) != current.file_stats.get(name)
+        )
+        report = {
+            "generation": current.number,
+            "reindexed": [],
+            "added": [],
+            "removed": [],
+            "failed": [],
+            "chunks": len(current.chunks),
+            "elapsed_ms": 0.0,
+        }
+
+        # ── 읽기 전용: 쓰는 쪽 프로세스가 이미 새 스냅샷을 만들었으면 그것으로 교체 ──
+        if (self.snapshot_path and self.snapshot_readonly and (changed or self._behind_snapshot)
+                and self._adopt_snapshot(md_files, file_stats)):
+            for file_name in changed:
+                kind = ("reindexed" if file_name in current.file_stats and file_name in file_stats
+                        else "added" if file_name in file_stats else "removed")
+                report[kind].append(Path(file_name).stem)
+            report["generation"] = self.generation
+            report["chunks"] = len(self.chunks)
+            report["elapsed_ms"] = _ms(t0)
+            return report
+        if not changed:
+            return report
+
+        documents = list(current.documents)
+        index = current.index
+
+        for file_name in changed:
+            pos = next(
+                (i for i, doc in enumerate(documents) if Path(doc.path).name == file_name),
+                None,
+            )
+            new_doc = self._read_document(by_name[file_name]) if file_name in by_name else None
+
+            existed = pos is not None
+            if not existed:
+                # 새 파일 (또는 이전에 읽기 실패한 파일) → 파일명 순서 위치에 끼움
+                pos = next(
+                    (i for i, doc in enumerate(documents) if Path(doc.path).name > file_name),
+                    len(documents),
+                )
+
+            start = sum(len(doc.chunks) for doc in documents[:pos])
+            new_chunks = new_doc.chunks if new_doc else []
+
+            for offset, chunk in enumerate(new_chunks):
+                chunk.id = start + offset
+            index = index.replaced(pos, int(existed), [new_chunks] if new_doc else [])
+
+            doc_name = Path(file_name).stem
+            if existed and new_doc:
+                documents[pos] = new_doc
+                report["reindexed"].append(doc_name)
+            elif new_doc:
+                documents.insert(pos, new_doc)
+                report["added"].append(doc_name)
+            elif existed:
+                del documents[pos]
+                report["removed"].append(doc_name)
+            if new_doc is None and file_name in by_name:
+                report["failed"].append(doc_name)
+
+        # 청크 수가 바뀐 문서 뒤쪽은 id 가 밀림 → 새 Document/Chunk 로 복사
+        # (기존 객체는 현재 세대가 아직 쓰고 있으므로 고치지 않음 — 발행 전에 실패해도 현재 세대는 그대로)
         chunks: list[Chunk] = []
-        content = doc.content
+        for pos, doc in enumerate(documents):
+            if doc.chunks and doc.chunks[0].id != len(chunks):
+                documents[pos] = doc = self._shifted(doc, len(chunks))
+            chunks.extend(doc.chunks)
 
-        # ── ## 또는 ### 기준으로 섹션 분리 ──
-        sections = re.split(r'\n(?=##\s)', content)
+        self._publish(documents, chunks, index, file_stats)
+        report["generation"] = self.generation
+        report["chunks"] = len(chunks)
+        report["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        print(f"🔁 world_db 갱신 (세대 {report['generation']}): "
+              f"재색인 {report['reindexed']} 추가 {report['added']} 삭제 {report['removed']}"
+              f" — {report['elapsed_ms']}ms")
 
-        for idx, section in enumerate(sections):
-            section = section.strip()
-            if not section or len(section) < 10:
-                continue
+        if self.snapshot_path and self.snapshot_readonly:
+            self._behind_snapshot = True
+        elif self.snapshot_path:
+            self._save_snapshot(file_stats)
+        return report
 
-            # 헤딩 추출
-            heading_match = re.match(r'^(#{1,4})\s+(.+)', section)
-            heading = heading_match.group(2).strip() if heading_match else f"섹션 {idx + 1}"
-
-            # 청크가 너무 크면 더 분할 (1500자 초과 시)
-            if len(section) > 1500:
-                sub_sections = re.split(r'\n(?=###\s)', section)
-                for sub_idx, sub in enumerate(sub_sections):
-                    sub = sub.strip()
-                    if len(sub) < 10:
-                        continue
-                    sub_heading_match = re.match(r'^(#{1,4})\s+(.+)', sub)
-                    sub_heading = sub_heading_match.group(2).strip() if sub_heading_match else heading
-
-                    chunks.append(Chunk(
-                        doc_name=doc.name,
-                        category=doc.category,
-                        heading=sub_heading,
-                        text=sub,
-                        index=len(chunks),
-                    ))
-            else:
-                chunks.append(Chunk(
-                    doc_name=doc.name,
-                    category=doc.category,
-                    heading=heading,
-                    text=section,
-                    index=len(chunks),
-                ))
+    @staticmethod
+    def _shifted(doc: Document, first_id: int) -> Document:
+        """doc 의 사본 (청크 id 를 first_id 부터 다시 매김, 본문 문자열은 공유)"""
+        copy = Document(doc.name, doc.category, doc.content, doc.path)
+        copy._etag = doc._etag
+        for offset, chunk in enumerate(doc.chunks):
+            shifted = Chunk(copy, chunk.start, chunk.end, chunk.heading, index=chunk.index)
+            shifted.id = first_id + offset
+            copy.chunks.append(shifted)
+        return copy
+
+    def _load_snapshot(self, md_files: list[Path], file_stats: dict[str, tuple[int, int]]) -> bool:
+        """스냅샷 복원 시도 (원본이 바뀌었거나 파일이 손상됐으면 False)"""
+        from rag_snapshot import load_snapshot
+
+        try:
+            restored = load_snapshot(self.snapshot_path, md_files)
+        except Exception as e:
+            print(f"  ⚠️ 스냅샷 읽기 실패 (재빌드): {e}")
+            return False
+        if restored is None:
+            print("  🔄 스냅샷 없음 또는 원본 변경 → 재빌드")
+            return False
+
+        documents, chunks, index = restored
+        self._publish(documents, chunks, index, file_stats)
+        self._behind_snapshot = False
+        print(f"⚡ 스냅샷에서 {len(self.documents)}개 문서, {len(self.chunks)}개 청크 로드 완료"
+              f" ({self.snapshot_path.name})")
+        return True
+
+    def snapshot_is_current(self) -> bool:
+        """스냅샷 파일이 지금 world_db 와 맞는지 (헤더만 확인, 색인은 읽지 않음)"""
+        from rag_snapshot import snapshot_is_current
+
+        if not self.snapshot_path or not self.docs_path.exists():
+            return False
+        return snapshot_is_current(self.snapshot_path, sorted(self.docs_path.glob("*.md")))
 
-        return chunks
+    def _adopt_snapshot(self, md_files: list[Path], file_stats: dict[str, tuple[int, int]]) -> bool:
+        """(읽기 전용) 원본과 맞는 스냅샷이 있으면 새 세대로 붙여 씁니다 — 없으면 조용히 False"""
+        from rag_snapshot import load_snapshot
+
+        try:
+            restored = load_snapshot(self.snapshot_path, md_files)
+        except Exception:
+            return False
+        if restored is None:
+            return False
+        self._publish(*restored, file_stats)
+        self._behind_snapshot = False
+        return True
+
+    def _save_snapshot(self, file_stats: dict[str, tuple[int, int]]) -> None:
+        """현재 색인을 스냅샷으로 저장 (실패해도 검색은 계속 동작, 매니페스트는 읽기 전에 잰 file_stats 로)"""
+        from rag_snapshot import save_snapshot
+
+        try:
+            size = save_snapshot(self, self.snapshot_path, file_stats)
+            print(f"💾 스냅샷 저장: {self.snapshot_path.name} ({size / 1024:,.0f}KB)")
+        except Exception as e:
+            print(f"  ⚠️ 스냅샷 저장 실패: {e}")
+
+    @staticmethod
+    def _split_into_chunks(doc: Document) -> list[Chunk]:
+        """마크다운 문서를 청크로 분할합니다 (구간 계산은 chunk_spans)"""
+        return [
+            Chunk(doc, start, end, heading, index=index)
+            for index, (start, end, heading) in enumerate(chunk_spans(doc.content))
+        ]
 
     def search(
         self,
@@ -188,6 +891,11 @@ class RAGEngine:
         top_k: int = 5,
         category: Optional[str] = None,
         doc_name: Optional[str] = None,
+        mode: str = "keyword",
+        fusion: str = "rrf",
+        keyword_weight: float = 1.0,
+        vector_weight: float = 1.0,
+        offset: int = 0,
     ) -> list[dict]:
         """
         키워드 기반 검색을 수행합니다.
@@ -197,99 +905,446 @@ class RAGEngine:
             top_k: 반환할 최대 결과 수
             category: 카테고리 필터 (예: "지리/지역")
             doc_name: 특정 문서명 필터 (예: "지리_상세")
+            mode: 랭킹 방식 ("keyword" = 기존 TF 점수, "bm25" = BM25F, "vector" = 로컬 임베딩 코사인,
+                  "hybrid" = BM25 + 벡터 융합, "fuzzy" = 오타 교정 후 keyword 점수)
+            fusion: 하이브리드 융합 방식 ("rrf" = 순위 역수 합, "weighted" = 정규화 점수 가중합)
+            keyword_weight / vector_weight: 하이브리드에서 각 검색기의 가중치
+            offset: 건너뛸 상위 결과 수 (페이지네이션, 같은 검색의 채점 결과를 재사용)
 
         Returns:
             검색 결과 리스트 (점수 내림차순)
         """
+        if offset < 0:
+            raise ValueError(f"offset 은 0 이상이어야 합니다: {offset}")
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"지원하지 않는 검색 모드: {mode} (가능: {', '.join(SEARCH_MODES)})")
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"지원하지 않는 융합 방식: {fusion} (가능: {', '.join(FUSION_METHODS)})")
+
         if not self._loaded:
             self.load()
 
+        # 검색 도중 reload 로 세대가 바뀌어도 같은 세대만 보도록 고정
+        generation = self._generation
+
         # 검색어 정규화
         query_lower = query.lower().strip()
-        query_words = set(re.findall(r'[\w가-힣]+', query_lower))
+        query_words = set(WORD_RE.findall(query_lower))
 
         if not query_words:
             return []
 
-        results: list[dict] = []
+        # ── 결과 캐시 (세대가 바뀌면 자동 무효화) ──
+        hybrid = (fusion, keyword_weight, vector_weight) if mode == "hybrid" else None
+        cache_key = (mode, query_lower, top_k, category, doc_name, hybrid, offset)
+        cached = self.cache.get(generation.number, cache_key)
+        if cached is not None:
+            return cached
+
+        results = [result for _, result in self._rank(generation, query_lower, query_words, top_k,
+                                                        category, doc_name, mode, hybrid,
+                                                        offset=offset)]
+        self.cache.put(generation.number, cache_key, results)
+        return results
+
+    def search_many(
+        self,
+        queries: list[str],
+        top_k: int = 5,
+        category: Optional[str] = None,
+        doc_name: Optional[str] = None,
+        mode: str = "keyword",
+        fusion: str = "rrf",
+        keyword_weight: float = 1.0,
+        vector_weight: float = 1.0,
+        dedupe: bool = False,
+    ) -> list[list[dict]]:
+        """
+        여러 검색어를 한 번에 검색합니다 (에피소드 준비 때 @태그 여러 개를 한꺼번에 보낼 때).
+
+        같은 세대를 고정하고, 단어별 포스팅 순회 결과를 검색어 사이에 공유하므로
+        겹치는 단어가 많을수록 개별 search() 호출보다 빠릅니다.
+
+        Args:
+            queries: 검색어 리스트
+            dedupe: True 면 앞선 검색어 결과에 이미 나온 청크는 뒤 검색어 결과에서 빼고
+                    다음 순위로 채웁니다 (결과 캐시는 사용하지 않음)
+            나머지 인자는 search() 와 같음
 
-        for chunk in self.chunks:
-            # ── 필터 적용 ──
-            if category and category not in chunk.category:
+        Returns:
+            검색어 순서대로의 결과 리스트
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"지원하지 않는 검색 모드: {mode} (가능: {', '.join(SEARCH_MODES)})")
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"지원하지 않는 융합 방식: {fusion} (가능: {', '.join(FUSION_METHODS)})")
+
+        if not self._loaded:
+            self.load()
+
+        generation = self._generation
+        hybrid = (fusion, keyword_weight, vector_weight) if mode == "hybrid" else None
+        memo: dict = {}          # 단어 → 매칭 결과 (검색어 사이 공유)
+        seen: set[int] = set()   # dedupe 용: 이미 반환한 청크 id
+        batch: list[list[dict]] = []
+
+        for query in queries:
+            query_lower = query.lower().strip()
+            query_words = set(WORD_RE.findall(query_lower))
+            if not query_words:
+                batch.append([])
                 continue
-            if doc_name and doc_name not in chunk.doc_name:
+
+            if not dedupe:
+                cache_key = (mode, query_lower, top_k, category, doc_name, hybrid, 0)
+                cached = self.cache.get(generation.number, cache_key)
+                if cached is None:
+                    cached = [result for _, result in self._rank(
+                        generation, query_lower, query_words, top_k, category, doc_name,
+                        mode, hybrid, memo,
+                    )]
+                    self.cache.put(generation.number, cache_key, cached)
+                batch.append(cached)
                 continue
 
-            # ── 점수 계산 (TF 기반 + 위치 가중치) ──
-            text_lower = chunk.text.lower()
-            heading_lower = chunk.heading.lower()
-            score = 0.0
+            # 이미 나온 청크만큼 더 뽑은 뒤 제외 → 항상 top_k 개까지 채움
+            ranked = self._rank(generation, query_lower, query_words, top_k + len(seen),
+                                category, doc_name, mode, hybrid, memo)
+            results = []
+            for cid, result in ranked:
+                if cid in seen:
+                    continue
+                seen.add(cid)
+                results.append(result)
+                if len(results) == top_k:
+                    break
+            batch.append(results)
 
-            for word in query_words:
-                # 본문 매칭 (기본 1점)
-                word_count = text_lower.count(word)
-                if word_count > 0:
-                    score += min(word_count, 5)  # 최대 5점 (반복 패널티)
+        return batch
 
-                # 헤딩 매칭 (가중치 3배)
-                if word in heading_lower:
-                    score += 3.0
+    def _rank(
+        self,
+        generation: IndexGeneration,
+        query_lower: str,
+        query_words: set[str],
+        top_k: int,
+        category: Optional[str],
+        doc_name: Optional[str],
+        mode: str,
+        hybrid: Optional[tuple[str, float, float]] = None,
+        memo: Optional[dict] = None,
+        offset: int = 0,
+    ) -> list[tuple[int, dict]]:
+        """
+        한 세대의 색인으로 점수를 계산하고 [offset, offset + top_k) 순위의 결과를 만듭니다.
+        (memo 는 배치 검색에서 공유하는 단어별 매칭 사전, 반환은 (청크 id, 결과) 쌍)
+
+        채점된 후보 집합은 후보 캐시에 두고 다음 페이지 요청에서 재사용하며,
+        상위 offset + top_k 개만 힙으로 고른 뒤 그 청크들만 응답 dict 로 만듭니다.
+        """
+        wanted = offset + top_k
+        if top_k <= 0:
+            return []
 
-                # 문서명 매칭 (가중치 2배)
-                if word in chunk.doc_name.lower():
-                    score += 2.0
+        # fuzzy = 오타 단어를 용어 사전의 가장 가까운 단어로 바꾼 뒤 keyword 점수
+        scoring_mode = mode
+        if mode == "fuzzy":
+            query_lower, query_words, _ = self._fuzzy_query(generation, query_lower, query_words)
+            scoring_mode = "keyword"
 
-            # ── 전체 구문 매칭 보너스 ──
-            if query_lower in text_lower:
+        # vector/hybrid 는 후보 수 자체가 요청 깊이에 따라 달라지므로 키에 포함
+        depth = wanted if mode in ("vector", "hybrid") else None
+        candidate_key = (mode, query_lower, category, doc_name, hybrid, depth)
+        scores = self._candidates.get(generation.number, candidate_key)
+        if scores is None:
+            scores = self._score_candidates(generation, query_lower, query_words, wanted,
+                                            category, doc_name, scoring_mode, hybrid, memo)
+            self._candidates.put(generation.number, candidate_key, scores)
+
+        # ── 점수 내림차순 상위 wanted 개 (동점은 청크 순서 유지) ──
+        winners = heapq.nsmallest(wanted, scores.items(), key=lambda x: (-x[1], x[0]))
+
+        digits = 2 if mode in ("keyword", "bm25", "fuzzy") else 4
+        return [
+            (cid, self._result(generation, cid, score, digits, query_words))
+            for cid, score in winners[offset:]
+        ]
+
+    @staticmethod
+    def _result(generation: IndexGeneration, cid: int, score: float, digits: int,
+                query_words: set[str]) -> dict:
+        """
+        응답 dict (상위 결과에만 만듦).
+        text 는 검색어가 가장 촘촘한 SNIPPET_CHARS 자 구간이며 (짧은 청크는 전체),
+        highlights 는 text 안의 검색어 위치 [시작, 끝) 목록입니다.
+        """
+        chunk = generation.chunks[cid]
+        length = len(chunk)
+        hits = generation.index.hits(cid, query_words)
+        start = _densest_window(hits, length, SNIPPET_CHARS)
+        end = min(length, start + SNIPPET_CHARS)
+
+        highlights: list[list[int]] = []
+        for hit_start, hit_end, _ in hits:
+            if hit_start < start or hit_end > end:
+                continue
+            hit_start -= start
+            hit_end -= start
+            if highlights and hit_start <= highlights[-1][1]:
+                highlights[-1][1] = max(highlights[-1][1], hit_end)   # 겹치는 단어 합치기
+            else:
+                highlights.append([hit_start, hit_end])
+
+        return {
+            "doc_name": chunk.doc_name,
+            "category": chunk.category,
+            "heading": chunk.heading,
+            "chunk_id": cid,                              # get_chunk() 로 전체 본문 조회
+            "chunk_index": chunk.index,                   # 문서 내 청크 순서 (get_chunks)
+            "text": chunk.snippet(SNIPPET_CHARS, start),  # 800자 제한
+            "text_start": start,                          # 청크 본문 내 text 시작 위치
+            "highlights": highlights,
+            "score": round(score, digits),
+            "full_length": length,
+        }
+
+    def _score_candidates(
+        self,
+        generation: IndexGeneration,
+        query_lower: str,
+        query_words: set[str],
+        depth: int,
+        category: Optional[str],
+        doc_name: Optional[str],
+        mode: str,
+        hybrid: Optional[tuple[str, float, float]] = None,
+        memo: Optional[dict] = None,
+    ) -> dict[int, float]:
+        """
+        필터를 통과한 후보 청크의 최종 점수 (구문 보너스 포함).
+        필터가 있으면 미리 나눠 둔 청크 id 구간 안에서만 포스팅을 읽고 점수를 계산합니다.
+        """
+        index = generation.index
+        ranges = generation.filters.ranges(category, doc_name)
+        if ranges == ():
+            return {}
+
+        # ── 색인 조회: 검색어가 들어 있는 (필터 구간 안의) 청크만 점수 계산 ──
+        word_hits: dict[int, int] = {}
+        if mode == "hybrid":
+            scores = self._hybrid_scores(generation, query_lower, query_words, depth,
+                                         ranges, *hybrid, memo=memo)
+        elif mode == "vector":
+            scores = self._vector_index(generation).top(query_lower, depth, ranges=ranges)
+        elif mode == "bm25":
+            scores = index.bm25_scores(query_words, memo, ranges)
+        else:
+            scores, word_hits = self._keyword_scores(index, query_words, memo, ranges)
+
+        # ── 전체 구문 후보: 모든 단어가 본문에 있고 구문의 n-gram도 모두 가진 청크만
+        #    (키워드 모드, None = 좁히지 않음) ──
+        full_hits = [cid for cid, count in word_hits.items() if count == len(query_words)]
+        phrase_ids = index.phrase_candidates(query_lower, full_hits) if full_hits else set()
+
+        candidates: dict[int, float] = {}
+        for cid, score in scores.items():
+            # ── 전체 구문 매칭 보너스 (n-gram 후보 + 모든 단어가 본문에 있는 청크만 확인) ──
+            if (
+                (phrase_ids is None or cid in phrase_ids)
+                and word_hits.get(cid, 0) == len(query_words)
+                and query_lower in generation.chunks[cid].text.lower()
+            ):
                 score += 5.0
 
-            if score > 0:
-                results.append({
-                    "doc_name": chunk.doc_name,
-                    "category": chunk.category,
-                    "heading": chunk.heading,
-                    "text": chunk.text[:800],  # 800자 제한
-                    "score": round(score, 2),
-                    "full_length": len(chunk.text),
-                })
+            candidates[cid] = score
 
-        # ── 점수 내림차순 정렬 ──
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:top_k]
+        return candidates
 
-    def search_by_tag(self, tag: str) -> list[dict]:
+    def _hybrid_scores(
+        self,
+        generation: IndexGeneration,
+        query_lower: str,
+        query_words: set[str],
+        top_k: int,
+        ranges: Optional[Ranges],
+        fusion: str,
+        keyword_weight: float,
+        vector_weight: float,
+        memo: Optional[dict] = None,
+    ) -> dict[int, float]:
+        """
+        하이브리드: BM25 후보와 벡터 후보를 각각 depth 개로 자른 뒤 융합합니다.
+        벡터 쪽(행렬 곱은 GIL 을 놓음)은 별도 스레드에서 BM25 와 동시에 돌립니다.
+        """
+        depth = max(top_k * HYBRID_DEPTH_FACTOR, HYBRID_MIN_DEPTH)
+        self._vector_index(generation)   # numpy 없으면 여기서 RuntimeError
+
+        if self._hybrid_pool is None:
+            self._hybrid_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rag-hybrid")
+        vector_future = self._hybrid_pool.submit(
+            self._vector_index(generation).top, query_lower, depth, ranges
+        )
+
+        lexical = generation.index.bm25_scores(query_words, memo, ranges)
+        lexical_ranked = heapq.nlargest(depth, lexical.items(), key=lambda x: (x[1], -x[0]))
+        vector_ranked = sorted(vector_future.result().items(), key=lambda x: (-x[1], x[0]))
+
+        fused: dict[int, float] = {}
+        for ranked, weight in ((lexical_ranked, keyword_weight), (vector_ranked, vector_weight)):
+            if not ranked or weight <= 0:
+                continue
+            if fusion == "rrf":
+                for rank, (cid, _) in enumerate(ranked, start=1):
+                    fused[cid] = fused.get(cid, 0.0) + weight / (RRF_K + rank)
+            else:
+                # 후보 안에서 최고점 = 1 로 정규화한 뒤 가중합
+                top_score = ranked[0][1]
+                for cid, score in ranked:
+                    fused[cid] = fused.get(cid, 0.0) + weight * (score / top_score if top_score else 0.0)
+        return fused
+
+    def _keyword_scores(self, index: InvertedIndex, query_words: set[str],
+                        memo: Optional[dict] = None,
+                        ranges: Optional[Ranges] = None) -> tuple[dict[int, float], dict[int, int]]:
+        """
+        기존 키워드 점수 (TF 기반 + 위치 가중치)를 색인으로 계산합니다.
+
+        Returns:
+            (청크 id → 점수, 청크 id → 본문에 등장한 검색어 단어 수)
+        """
+        scores: dict[int, float] = {}
+        word_hits: dict[int, int] = {}
+
+        for word in query_words:
+            tf, heading_hits, doc_hits = index.match(word, memo, ranges)
+
+            # 본문 매칭 (최대 5점, 반복 패널티)
+            for cid, word_count in tf.items():
+                scores[cid] = scores.get(cid, 0.0) + min(word_count, 5)
+            # 헤딩 매칭 (가중치 3배)
+            for cid in heading_hits:
+                scores[cid] = scores.get(cid, 0.0) + 3.0
+            # 문서명 매칭 (가중치 2배)
+            for cid in doc_hits:
+                scores[cid] = scores.get(cid, 0.0) + 2.0
+
+            for cid in tf:
+                word_hits[cid] = word_hits.get(cid, 0) + 1
+
+        return scores, word_hits
+
+    @staticmethod
+    def _fuzzy_query(generation: IndexGeneration, query_lower: str,
+                     query_words: set[str]) -> tuple[str, set[str], dict[str, str]]:
+        """
+        색인에 부분 문자열로도 없는 단어만 가장 가까운 사전 단어로 바꿉니다.
+        (이미 맞는 단어는 그대로 — 다른 인물명을 오타로 고치지 않도록)
+
+        Returns:
+            (교정된 검색어, 교정된 단어 집합, 원래 단어 → 교정 단어)
+        """
+        index = generation.index
+        corrections: dict[str, str] = {}
+        for word in query_words:
+            if index.expand(word):
+                continue
+            corrected = generation.fuzzy.correct(word)
+            if corrected is not None and corrected != word:
+                corrections[word] = corrected
+        if not corrections:
+            return query_lower, query_words, corrections
+
+        corrected_query = WORD_RE.sub(lambda m: corrections.get(m.group(0), m.group(0)), query_lower)
+        return corrected_query, {corrections.get(word, word) for word in query_words}, corrections
+
+    def correct(self, query: str) -> dict[str, str]:
+        """fuzzy 모드에서 바뀌는 단어 {원래 단어: 교정 단어} (응답에 "이렇게 검색했어요" 표시용)"""
+        if not self._loaded:
+            self.load()
+        query_lower = query.lower().strip()
+        _, _, corrections = self._fuzzy_query(self._generation, query_lower,
+                                              set(WORD_RE.findall(query_lower)))
+        return corrections
+
+    def search_by_tag(self, tag: str, fuzzy: bool = True) -> list[dict]:
         """
         @태그 검색 (예: @요리, @무공, @객잔)
         태그에 매핑된 카테고리에서 핵심 정보를 반환합니다.
+        (tag_map.json 의 태그는 load/reload 때 미리 계산해 둔 결과를 그대로 돌려줌)
+
+        fuzzy=True (기본) 면 색인에 없는 오타 태그(@무굥 → @무공)만 가장 가까운 태그로 바꾸고,
+        매핑에 없는 태그는 fuzzy 모드 일반 검색으로 찾습니다.
+        (@무림, @경공 처럼 본문에 있는 단어는 비슷한 태그가 있어도 그대로 검색 — 바뀐 내용은 tag_corrections)
         """
         tag = tag.lstrip("@").strip()
 
-        # 태그 → 검색 매핑
-        TAG_MAP = {
-            "요리": {"query": "요리 음식 메뉴", "category": "생활/음식·건축"},
-            "음식": {"query": "요리 음식 메뉴", "category": "생활/음식·건축"},
-            "건축": {"query": "건축 객잔 구조", "category": "생활/음식·건축"},
-            "객잔": {"query": "객잔 주막", "category": "지리/객잔"},
-            "무공": {"query": "무공 심법 초식", "category": "무공/전투"},
-            "무기": {"query": "무기 병기 검", "category": "무공/병기"},
-            "병기": {"query": "무기 병기 검", "category": "무공/병기"},
-            "의복": {"query": "의복 복식 의상", "category": "생활/의복"},
-            "지리": {"query": "지역 도시 산", "category": "지리/지역"},
-            "이동": {"query": "이동 경로 거리", "category": "지리/이동"},
-            "세력": {"query": "세력 문파 조직", "category": "세력/조직"},
-            "조직": {"query": "세력 문파 조직", "category": "세력/조직"},
-            "인물": {"query": "캐릭터 인물", "category": "인물"},
-            "캐릭터": {"query": "캐릭터 인물", "category": "인물"},
-            "경영": {"query": "경영 M&A 재무", "category": "경영/용어"},
-            "로드맵": {"query": "로드맵 300화", "category": "스토리/로드맵"},
-        }
+        if not self._loaded:
+            self.load()
 
-        if tag in TAG_MAP:
-            mapped = TAG_MAP[tag]
-            return self.search(mapped["query"], top_k=10, category=mapped["category"])
-        else:
-            # 매핑 없으면 일반 검색
-            return self.search(tag, top_k=10)
+        generation = self._generation
+        tag = self._resolve_tag(generation, tag, fuzzy)
+        results = generation.tags.get(tag)
+        if results is not None:
+            return copy_results(results)
+        # 매핑 없으면 일반 검색
+        return self.search(tag, top_k=TAG_TOP_K, mode="fuzzy" if fuzzy else "keyword")
+
+    def tag_corrections(self, tag: str, fuzzy: bool = True) -> dict[str, str]:
+        """
+        search_by_tag 가 바꿔서 찾는 내용 {원래: 바꾼 것} (응답에 "이렇게 검색했어요" 표시용).
+        가까운 태그로 바꾸면 {태그: 설정 태그}, 일반 검색으로 넘어가면 단어별 fuzzy 교정.
+        """
+        tag = tag.lstrip("@").strip()
+        if not fuzzy:
+            return {}
+        if not self._loaded:
+            self.load()
+
+        generation = self._generation
+        resolved = self._resolve_tag(generation, tag, fuzzy)
+        if resolved != tag:
+            return {tag: resolved}
+        if resolved in generation.tags:
+            return {}
+        return self.correct(tag)
+
+    def _resolve_tag(self, generation: IndexGeneration, tag: str, fuzzy: bool) -> str:
+        """
+        실제로 찾을 태그. 설정 태그가 아니고 색인에도 없는 단어일 때만 가장 가까운 설정 태그로
+        (_fuzzy_query 와 같은 기준 — 본문에 있는 단어를 다른 태그로 고치지 않도록)
+        """
+        if not fuzzy or tag in generation.tags:
+            return tag
+        if any(generation.index.expand(word) for word in WORD_RE.findall(tag.lower())):
+            return tag
+        return self._nearest_tag(tag, generation.tags)
+
+    @staticmethod
+    def _nearest_tag(tag: str, tags: dict[str, list[dict]]) -> str:
+        """허용 편집 거리 안에서 가장 가까운 설정 태그 (없으면 tag 그대로, 태그 수십 개라 전체 비교)"""
+        limit = max_edits(len(tag))
+        best = (limit + 1, tag)
+        for candidate in tags:
+            distance = edit_distance(tag, candidate, limit)
+            if distance < best[0]:
+                best = (distance, candidate)
+        return best[1]
+
+    def get_tags(self) -> list[dict]:
+        """설정된 @태그 목록"""
+        return [
+            {"tag": tag, "query": mapped["query"], "category": mapped["category"]}
+            for tag, mapped in self.tag_map.items()
+        ]
+
+    def suggest(self, query: str, limit: int = SUGGEST_LIMIT) -> list[dict]:
+        """
+        입력 중 자동완성 (헤딩, 문서명, @태그, 색인 용어 중 query 로 시작하는 것).
+        검색 채점 없이 미리 만든 접두어 색인만 보므로 글자마다 불러도 됩니다.
+        """
+        if not self._loaded:
+            self.load()
+        return self._suggest_index(self._generation).suggest(query, limit)
 
     def get_categories(self) -> list[dict]:
         """사용 가능한 카테고리 목록과 문서 수를 반환합니다"""
@@ -302,18 +1357,107 @@ class RAGEngine:
             for cat, count in sorted(cat_map.items())
         ]
 
+    def find_document(self, name: str) -> Optional[Document]:
+        """
+        문서명으로 문서를 찾습니다.
+        정확한 이름은 사전으로 바로 찾고, 없을 때만 부분 일치 (예: "지리" → "지리_이동_DB") 로 찾습니다.
+        """
+        generation = self._generation
+        doc = generation.by_name.get(name)
+        if doc is not None:
+            return doc
+        for doc in generation.documents:
+            if name in doc.name:
+                return doc
+        return None
+
     def get_document(self, name: str) -> Optional[dict]:
         """특정 문서의 전체 내용을 반환합니다"""
-        for doc in self.documents:
-            if doc.name == name or name in doc.name:
-                return {
-                    "name": doc.name,
-                    "category": doc.category,
-                    "content": doc.content,
-                    "chunk_count": len(doc.chunks),
-                    "char_count": len(doc.content),
-                }
-        return None
+        doc = self.find_document(name)
+        if doc is None:
+            return None
+        return {
+            "name": doc.name,
+            "category": doc.category,
+            "content": doc.content,
+            "chunk_count": len(doc.chunks),
+            "char_count": len(doc.content),
+            "etag": f'"{doc.etag}"',
+        }
+
+    def get_document_range(self, name: str, start: int = 0, end: Optional[int] = None) -> Optional[dict]:
+        """
+        문서 본문의 문자 구간 [start, end) 을 반환합니다 (end 생략 = 끝까지, 범위 밖은 잘라냄).
+        검색 결과의 청크 위치(get_chunk 의 start/end)와 같은 기준입니다.
+        """
+        if start < 0 or (end is not None and end < start):
+            raise ValueError(f"잘못된 문자 범위입니다: [{start}, {end})")
+        doc = self.find_document(name)
+        if doc is None:
+            return None
+        length = len(doc.content)
+        start = min(start, length)
+        end = length if end is None else min(end, length)
+        return {
+            "name": doc.name,
+            "category": doc.category,
+            "start": start,
+            "end": end,
+            "char_count": length,
+            "content": doc.content[start:end],
+            "etag": f'"{doc.etag}-{start}-{end}"',
+        }
+
+    @staticmethod
+    def _chunk_dict(chunk: Chunk) -> dict:
+        """청크 조회 응답 (start/end 는 문서 본문 내 문자 위치)"""
+        return {
+            "chunk_id": chunk.id,
+            "chunk_index": chunk.index,
+            "doc_name": chunk.doc_name,
+            "category": chunk.category,
+            "heading": chunk.heading,
+            "start": chunk.start,
+            "end": chunk.end,
+            "text": chunk.text,
+        }
+
+    def get_chunk(self, chunk_id: int) -> Optional[dict]:
+        """
+        청크 하나를 id 로 반환합니다.
+        (chunk_id 는 현재 세대 기준 — 검색 결과의 chunk_id 를 바로 쓰면 됨)
+        """
+        chunks = self._generation.chunks
+        if not 0 <= chunk_id < len(chunks):
+            return None
+        chunk = chunks[chunk_id]
+        result = self._chunk_dict(chunk)
+        result["etag"] = f'"{chunk.document.etag}-c{chunk.start}-{chunk.end}"'
+        return result
+
+    def get_chunks(self, name: str, start: int = 0, end: Optional[int] = None) -> Optional[dict]:
+        """
+        문서의 청크 순서 [start, end) 구간을 반환합니다 (end 생략 = 끝까지).
+        chunk_index 기준이라 다른 문서가 바뀌어도 주소가 달라지지 않습니다.
+        """
+        if start < 0 or (end is not None and end < start):
+            raise ValueError(f"잘못된 청크 범위입니다: [{start}, {end})")
+        doc = self.find_document(name)
+        if doc is None:
+            return None
+        count = len(doc.chunks)
+        start = min(start, count)
+        end = count if end is None else min(end, count)
+        return {
+            "name": doc.name,
+            "category": doc.category,
+            "chunk_count": count,
+            "start": start,
+            "end": end,
+            "chunks": [self._chunk_dict(chunk) for chunk in doc.chunks[start:end]],
+            # 앞 문서가 바뀌면 chunk_id 가 밀리므로 첫 청크 id 도 포함
+            "etag": f'"{doc.etag}-k{start}-{end}-{doc.chunks[0].id if doc.chunks else 0}"',
+        }
 
     def get_all_documents(self) -> list[dict]:
         """전체 문서 목록을 반환합니다 (내용 미포함)"""
@@ -335,5 +1479,46 @@ class RAGEngine:
             "chunks": len(self.chunks),
             "total_chars": total_chars,
             "categories": len(set(doc.category for doc in self.documents)),
+            "index_terms": self.index.vocabulary_size,
+            "generation": self.generation,
+            "cache": self.cache.stats(),
+            "candidate_cache": self._candidates.stats(),
+            "memory": self._memory_report(),
+            "tags": len(self._generation.tags),
+            "fuzzy_vocabulary": len(self._generation.fuzzy) if self._generation.fuzzy else 0,
+            "suggestions": len(self._generation.suggest) if self._generation.suggest else 0,
+            "vectors": self._generation.vectors is not None,
             "loaded": self._loaded,
+            "load": self.last_load,
+        }
+
+    def _memory_report(self) -> dict:
+        """
+        문서/청크 저장 공간 (bytes, sys.getsizeof 기준).
+        text_saved 는 청크마다 본문을 따로 복사했다면 추가로 들었을 크기입니다.
+        """
+        generation = self._generation
+        document_text = sum(sys.getsizeof(doc.content) for doc in generation.documents)
+        chunk_records = sum(sys.getsizeof(chunk) for chunk in generation.chunks)
+        # 한 청크씩 잘라 크기만 재고 바로 버림 (동시에 하나만 메모리에 존재)
+        text_saved = sum(sys.getsizeof(chunk.text) for chunk in generation.chunks)
+        headings = {id(chunk.heading): chunk.heading for chunk in generation.chunks}
+        return {
+            "document_text_bytes": document_text,
+            "chunk_records_bytes": chunk_records,
+            "heading_bytes": sum(sys.getsizeof(heading) for heading in headings.values()),
+            "unique_headings": len(headings),
+            "text_saved_bytes": text_saved,
+            "index_bytes": generation.index.nbytes(),
+            "total_bytes": self.memory_bytes(),
         }
+
+    def memory_bytes(self) -> int:
+        """현재 세대의 대략적인 메모리 크기 (본문 + 청크 레코드 + 색인 + 벡터 행렬)"""
+        generation = self._generation
+        total = sum(sys.getsizeof(doc.content) for doc in generation.documents)
+        total += sum(sys.getsizeof(chunk) for chunk in generation.chunks)
+        total += generation.index.nbytes()
+        if generation.vectors is not None:
+            total += generation.vectors.matrix.nbytes
+        return total
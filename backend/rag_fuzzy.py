@@ -0,0 +1,224 @@
+"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[RAG Fuzzy] 오타 허용 검색 (SymSpell 삭제 색인)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+작가가 인물명을 자주 틀리게 씁니다 (남궁헌 → 남궁현, 소연하 → 소연화).
+기존 검색은 부분 문자열이 하나도 안 맞으면 그냥 빈 결과를 돌려주므로,
+fuzzy 모드에서는 검색어 단어를 용어 사전에서 가장 가까운 단어로 바꾼 뒤 채점합니다.
+
+용어 사전:
+  - 색인 용어 전체 (헤딩/문서명 토큰 포함) + 각 용어의 앞부분(2글자 이상)
+    → "남궁헌의", "남궁헌은" 처럼 조사가 붙은 용어만 있어도 "남궁헌" 이 사전에 들어감
+  - 빈도 = 그 단어로 시작하는 용어들의 포스팅 길이 합 (동점일 때 흔한 단어 우선)
+
+SymSpell 삭제 색인:
+  사전 단어마다 글자를 최대 d개 지운 문자열 → 원래 단어 목록을 미리 만들어 두고,
+  검색어도 똑같이 지운 문자열로 조회해 후보를 모은 뒤 실제 편집 거리로 확인합니다.
+  허용 거리 d 는 단어 길이로 정합니다 (max_edits) — 한 글자 단어는 교정하지 않음.
+
+조회 비용은 검색어 길이에만 비례하고 (한글 3~4글자 → 지운 문자열 수십 개),
+단어별 결과는 세대마다 캐시하므로 @태그 자동완성에서도 1ms 미만입니다.
+
+만드는 시점:
+  처음 교정을 요청받을 때 만듭니다 (이유는 RAGEngine._publish 참고).
+  이전 세대의 사전이 이미 만들어져 있으면 새로 생기거나 사라진 단어의 삭제 키만 고칩니다.
+"""
+
+import threading
+from typing import Callable, Optional
+
+# ── 교정 파라미터 ──
+FUZZY_MIN_PREFIX = 2       # 사전에 넣을 용어 앞부분의 최소 길이
+FUZZY_MAX_CACHE = 4096     # 단어별 교정 결과 캐시 (세대마다 새로 시작)
+
+
+def max_edits(length: int) -> int:
+    """단어 길이별 허용 편집 거리 (1글자 0, 2~4글자 1, 5글자 이상 2)"""
+    if length < 2:
+        return 0
+    if length <= 4:
+        return 1
+    return 2
+
+
+def _deletes(word: str, depth: int) -> set[str]:
+    """word 에서 글자를 1~depth 개 지운 문자열 집합 (빈 문자열 제외)"""
+    found: set[str] = set()
+    frontier = {word}
+    for _ in range(depth):
+        next_frontier: set[str] = set()
+        for current in frontier:
+            if len(current) <= 1:
+                continue
+            for i in range(len(current)):
+                deleted = current[:i] + current[i + 1:]
+                if deleted not in found:
+                    found.add(deleted)
+                    next_frontier.add(deleted)
+        frontier = next_frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    제한 Damerau-Levenshtein 거리 (인접 글자 바꿈 = 1).
+    limit 을 넘으면 limit + 1 을 돌려주고 바로 멈춥니다.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    previous2: Optional[list[int]] = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+def word_frequencies(words) -> dict[str, int]:
+    """
+    (단어, 빈도) 목록 → 사전 단어 → 빈도.
+    단어의 앞부분(FUZZY_MIN_PREFIX 글자 이상)도 빈도를 더해 사전에 넣습니다.
+    """
+    frequencies: dict[str, int] = {}
+    for word, frequency in words:
+        for end in range(min(FUZZY_MIN_PREFIX, len(word)), len(word) + 1):
+            prefix = word[:end]
+            frequencies[prefix] = frequencies.get(prefix, 0) + frequency
+    return frequencies
+
+
+class FuzzyIndex:
+    """용어 사전 + SymSpell 삭제 색인 (세대마다 하나, 처음 조회할 때 만들고 그 뒤로는 읽기 전용)"""
+
+    def __init__(self, source: Callable[[], dict[str, int]], previous: Optional["FuzzyIndex"] = None):
+        """
+        Args:
+            source: 사전 단어 → 빈도를 돌려주는 함수 (처음 조회할 때 한 번 부름)
+            previous: 이전 세대의 사전 — 만들어져 있으면 바뀐 단어의 삭제 키만 고쳐서 재사용
+        """
+        # 이전 세대도 아직 안 만들어졌으면 그 이전(만들어진 쪽)을 기준으로 — 안 쓴 세대가 줄줄이 남지 않게
+        if previous is not None and not previous.built:
+            previous = previous._previous
+        self._source: Optional[Callable[[], dict[str, int]]] = source
+        self._previous = previous
+        self._lock = threading.Lock()
+        self.built = False
+        self.frequencies: dict[str, int] = {}          # 사전 단어 → 빈도
+        self.deletes: dict[str, list[str]] = {}        # 지운 문자열 → 사전 단어들
+        self._cache: dict[str, list[tuple[str, int]]] = {}
+
+    @classmethod
+    def build(cls, words) -> "FuzzyIndex":
+        """(단어, 빈도) 목록으로 사전을 바로 만듭니다"""
+        fuzzy = cls(lambda: word_frequencies(words))
+        fuzzy._ensure()
+        return fuzzy
+
+    @classmethod
+    def from_index(cls, index, previous: Optional["FuzzyIndex"] = None) -> "FuzzyIndex":
+        """역색인 용어 사전으로 만듭니다 (빈도 = 용어가 등장하는 청크 수, 실제 빌드는 첫 조회 때)"""
+        return cls(
+            lambda: word_frequencies(index.term_frequencies()),
+            previous,
+        )
+
+    def _ensure(self) -> None:
+        """삭제 색인을 (아직 없으면) 만듭니다 — 검색 스레드 여럿이 동시에 불러도 한 번만"""
+        if self.built:
+            return
+        with self._lock:
+            if self.built:
+                return
+            frequencies = self._source()
+            previous = self._previous
+            if previous is not None and previous.built:
+                deletes = self._patched(previous, frequencies)
+            else:
+                deletes = {}
+                for word in frequencies:
+                    for deleted in _deletes(word, max_edits(len(word))):
+                        deletes.setdefault(deleted, []).append(word)
+            self.frequencies = frequencies
+            self.deletes = deletes
+            self._source = None
+            self._previous = None
+            self.built = True
+
+    @staticmethod
+    def _patched(previous: "FuzzyIndex", frequencies: dict[str, int]) -> dict[str, list[str]]:
+        """
+        이전 세대의 삭제 색인에서 사라진 단어는 빼고 새 단어는 넣은 사본.
+        (이전 세대는 아직 검색 중일 수 있으므로 바뀌는 키의 목록만 새로 만들고 나머지는 공유)
+        """
+        old_words = previous.frequencies
+        removed = [word for word in old_words if word not in frequencies]
+        added = [word for word in frequencies if word not in old_words]
+        deletes = dict(previous.deletes)
+        for word in removed:
+            for deleted in _deletes(word, max_edits(len(word))):
+                remaining = [other for other in deletes.get(deleted, ()) if other != word]
+                if remaining:
+                    deletes[deleted] = remaining
+                else:
+                    deletes.pop(deleted, None)
+        for word in added:
+            for deleted in _deletes(word, max_edits(len(word))):
+                deletes[deleted] = deletes.get(deleted, []) + [word]
+        return deletes
+
+    def __len__(self) -> int:
+        """사전 단어 수 (아직 만들기 전이면 0)"""
+        return len(self.frequencies)
+
+    def lookup(self, word: str) -> list[tuple[str, int]]:
+        """
+        word 와 편집 거리가 가장 가까운 사전 단어들 [(단어, 거리), ...].
+        정렬: 거리 → 길이 차이 → 빈도(내림차순) → 단어. 허용 거리 안에 없으면 [].
+        """
+        self._ensure()
+        cached = self._cache.get(word)
+        if cached is not None:
+            return cached
+
+        limit = max_edits(len(word))
+        matches: list[tuple[str, int]] = []
+        if word in self.frequencies:
+            matches.append((word, 0))
+        elif limit > 0:
+            candidates: set[str] = set()
+            for key in _deletes(word, limit) | {word}:
+                candidates.update(self.deletes.get(key, ()))
+                if key in self.frequencies:
+                    candidates.add(key)
+            scored = []
+            for candidate in candidates:
+                distance = edit_distance(word, candidate, limit)
+                if distance <= limit:
+                    scored.append((distance, abs(len(candidate) - len(word)),
+                                   -self.frequencies[candidate], candidate))
+            scored.sort()
+            matches = [(candidate, distance) for distance, _, _, candidate in scored]
+
+        if len(self._cache) >= FUZZY_MAX_CACHE:
+            self._cache.clear()
+        self._cache[word] = matches
+        return matches
+
+    def correct(self, word: str) -> Optional[str]:
+        """가장 가까운 사전 단어 하나 (없으면 None)"""
+        matches = self.lookup(word)
+        return matches[0][0] if matches else None
@@ -0,0 +1,546 @@
+"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[RAG Index] 역색인 (term → posting list)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+RAGEngine.load() 시점에 청크를 한 번만 토큰화해서
+용어별 포스팅 리스트(청크 id, 등장 횟수, 헤딩/문서명 플래그)를 만듭니다.
+검색 시에는 검색어가 들어 있는 청크만 점수를 계산합니다.
+
+기존 점수 공식과 100% 동일한 결과를 내는 원리:
+  - 검색어 단어는 [\\w가-힣]+ 로만 이루어져 있으므로
+    본문 안의 등장 위치는 반드시 토큰 하나 안에 들어갑니다.
+  - 따라서 text.count(word) = Σ(토큰 t의 등장 횟수 × t.count(word))
+  - "화산" 검색 시 "화산파의" 같은 토큰도 그대로 잡힙니다 (부분 문자열 매칭 유지)
+
+문자 n-gram 색인 (조사 허용 부분 문자열 검색):
+  "화산파의", "화산파는" 처럼 조사가 붙은 토큰도 "화산파"로 찾아야 하므로
+  검색어 단어 → 용어 확장은 용어 사전의 문자 bigram 포스팅 교집합으로,
+  전체 구문 보너스는 모든 단어가 들어 있는 청크 중 구문의 bigram 을 모두 가진 청크로 후보를 좁힌 뒤
+  남은 후보만 실제 문자열로 확인합니다. (사전/본문 전체 스캔 없음)
+  본문 bigram 은 포스팅의 몇 배 크기라 load 때 만들지 않고,
+  청크가 처음 구문 보너스 후보가 될 때 그 청크의 bigram 집합만 만들어 조각에 보관합니다.
+
+문서별 조각 (Segment):
+  색인은 문서마다 하나씩 만든 조각의 목록입니다. 조각 안의 청크 id 는 문서 안에서 0부터 매긴 로컬 id 이고,
+  전역 청크 id = 조각 시작 id + 로컬 id 입니다.
+  reload 로 문서 하나가 바뀌면 그 문서의 조각만 새로 만들고, 나머지 조각의 배열은 그대로 공유합니다.
+  (앞쪽 문서의 청크 수가 바뀌어도 뒤쪽 조각은 시작 id 만 달라지므로 복사할 것이 없음)
+  용어 → 그 용어가 있는 조각 목록(blocks) 은 바뀐 문서의 용어만 새로 만듭니다.
+
+토큰 위치 (스니펫용):
+  청크별 본문 토큰 → 문자 오프셋 목록을 조각에 보관합니다 (검색 결과로 처음 나갈 때 한 번 훑어서 만듦).
+  검색 결과의 스니펫은 이 위치로 검색어가 가장 촘촘한 구간을 고르고 강조 위치를 계산합니다.
+
+BM25F 랭킹:
+  본문/헤딩/문서명 필드별 길이 정규화 값과 평균 길이를 build() 에서 미리 계산해 두고,
+  검색 시에는 포스팅 조회 결과에 곱하기만 합니다.
+"""
+
+import math
+import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Optional
+
+# 토큰 정규식 — 검색어 추출 규칙과 반드시 같아야 합니다
+WORD_RE = re.compile(r'[\w가-힣]+')
+
+# 포스팅 플래그
+FLAG_HEADING = 1    # 헤딩에 등장하는 토큰
+FLAG_DOC_NAME = 2   # 문서명에 등장하는 토큰
+
+# ── BM25F 파라미터 ──
+BM25_K1 = 1.2
+# 필드별 (가중치, 길이 정규화 강도 b) — 가중치는 키워드 모드의 헤딩 3배/문서명 2배와 맞춤
+BM25F_FIELDS = {
+    "body":     (1.0, 0.75),
+    "heading":  (3.0, 0.5),
+    "doc_name": (2.0, 0.0),
+}
+
+
+# 문자 n-gram 길이 (한글 음절 기준 bigram)
+NGRAM = 2
+
+
+def tokenize(text: str) -> list[str]:
+    """소문자화된 텍스트를 토큰 리스트로 분리합니다"""
+    return WORD_RE.findall(text)
+
+
+def char_ngrams(text: str, n: int = NGRAM) -> set[str]:
+    """문자 n-gram 집합 (텍스트가 n보다 짧으면 글자 단위)"""
+    if len(text) < n:
+        return set(text)
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _intersect(postings: list) -> set[int]:
+    """포스팅 리스트 교집합 (짧은 것부터)"""
+    if not postings:
+        return set()
+    postings = sorted(postings, key=len)
+    result = set(postings[0])
+    for ids in postings[1:]:
+        if not result:
+            break
+        result.intersection_update(ids)
+    return result
+
+
+def _analyze(chunk) -> tuple[dict[str, int], dict[str, int], tuple[int, int, int]]:
+    """
+    청크 하나를 색인용으로 분석합니다.
+
+    Returns:
+        (본문 토큰 → 등장 횟수, 헤딩/문서명 토큰 → 플래그, 필드별 길이 (본문, 헤딩, 문서명))
+    """
+    counts = Counter(tokenize(chunk.text.lower()))
+
+    flags: dict[str, int] = {}
+    heading_tokens = tokenize(chunk.heading.lower())
+    doc_tokens = tokenize(chunk.doc_name.lower())
+    for token in heading_tokens:
+        flags[token] = flags.get(token, 0) | FLAG_HEADING
+    for token in doc_tokens:
+        flags[token] = flags.get(token, 0) | FLAG_DOC_NAME
+
+    lengths = (sum(counts.values()), len(heading_tokens), len(doc_tokens))
+    return counts, flags, lengths
+
+
+def _appended(ids, value: int) -> array:
+    """기존 id 배열(공유 중일 수 있음)을 건드리지 않고 값 하나를 붙인 새 배열"""
+    result = array('i', ids or ())
+    result.append(value)
+    return result
+
+
+class Segment:
+    """
+    문서 하나의 색인 조각 (청크 id 는 문서 안의 로컬 id)
+
+    postings[term] = (로컬 청크 id, 등장 횟수, 플래그) 열 3개 — 튜플 (스냅샷에서 복원하면 memoryview)
+    lengths[field] = 로컬 청크별 필드 길이
+    청크별 본문 bigram 집합과 토큰 위치는 처음 물을 때 청크 본문으로 만들어 보관합니다.
+    (두 스레드가 같이 만들어도 결과가 같으므로 잠그지 않음)
+    """
+
+    __slots__ = ("postings", "lengths", "size", "chunks", "_grams", "_positions")
+
+    def __init__(self, postings, lengths: dict, chunks: list):
+        self.postings = postings
+        self.lengths = lengths
+        self.size = len(lengths["body"])
+        self.chunks = chunks       # 본문 조회용 (문서 안 순서)
+        self._grams: dict[int, frozenset[str]] = {}
+        self._positions: dict[int, dict[str, list[int]]] = {}
+
+    @classmethod
+    def build(cls, chunks: list) -> "Segment":
+        """문서 하나의 청크 리스트(문서 안 순서)로 조각을 만듭니다"""
+        rows: dict[str, list[tuple[int, int, int]]] = {}
+        lengths = {field: array('i') for field in BM25F_FIELDS}
+
+        for local_id, chunk in enumerate(chunks):
+            counts, flags, chunk_lengths = _analyze(chunk)
+
+            for field, length in zip(BM25F_FIELDS, chunk_lengths):
+                lengths[field].append(length)
+
+            for term, count in counts.items():
+                rows.setdefault(term, []).append((local_id, count, flags.get(term, 0)))
+            for term, flag in flags.items():
+                if term not in counts:
+                    rows.setdefault(term, []).append((local_id, 0, flag))
+
+        # 행 (id, 횟수, 플래그) 목록 → 열 튜플 3개
+        # (용어 대부분이 문서 안 한두 청크에만 나오므로 작은 array 수만 개보다 튜플이 빠르고 작음)
+        postings = {term: tuple(zip(*entries)) for term, entries in rows.items()}
+        return cls(postings, lengths, chunks)
+
+    def grams(self, local_id: int) -> frozenset[str]:
+        """청크 하나의 본문 문자 n-gram 집합"""
+        found = self._grams.get(local_id)
+        if found is None:
+            found = self._grams[local_id] = frozenset(char_ngrams(self.chunks[local_id].text.lower()))
+        return found
+
+    def positions(self, local_id: int) -> dict[str, list[int]]:
+        """청크 하나의 본문 토큰 → 등장 위치 (청크 본문 내 문자 오프셋) 리스트"""
+        found = self._positions.get(local_id)
+        if found is None:
+            found = {}
+            for match in WORD_RE.finditer(self.chunks[local_id].text.lower()):
+                found.setdefault(match.group(), []).append(match.start())
+            self._positions[local_id] = found
+        return found
+
+
+class InvertedIndex:
+    """
+    용어 → 포스팅 리스트 역색인 (문서별 Segment 의 목록)
+
+    blocks[term] = 그 용어가 있는 조각들 (문서 순서)
+    조각 i 의 전역 청크 id 는 starts[i] 부터이며, 조각 → 시작 id 는 offsets 로 찾습니다.
+    """
+
+    def __init__(self):
+        self.segments: list[Segment] = []
+        self.starts: array = array('i', [0])              # 조각별 시작 청크 id (+ 전체 청크 수)
+        self.offsets: dict[Segment, int] = {}             # 조각 → 시작 청크 id
+        self.blocks: dict[str, tuple[Segment, ...]] = {}  # 용어 → 조각들 (사라진 용어는 빈 튜플)
+        self._expand_cache: dict[str, list[tuple[str, int]]] = {}
+        self._df_cache: dict[str, int] = {}
+
+        # ── 문자 n-gram 색인 ──
+        self.terms: list[str] = []                    # 용어 id → 용어
+        self.term_grams: dict[str, array] = {}        # n-gram → 용어 id (용어 확장용)
+        self.term_chars: dict[str, array] = {}        # 글자 → 용어 id (한 글자 검색어용)
+
+        # ── BM25F 코퍼스 통계 (조각이 바뀔 때마다 계산) ──
+        self.chunk_count = 0
+        self.lengths: dict[str, array] = {}           # 필드별 청크 길이 (토큰 수)
+        self.avg_length: dict[str, float] = {}
+        # 필드별 청크 정규화 값: 1 - b + b * (길이 / 평균 길이)
+        self.norms: dict[str, array] = {}
+
+    def build(self, groups: list[list]) -> None:
+        """문서별 청크 리스트들(문서 순서, 청크 id 순서)로부터 색인을 만듭니다"""
+        self._set_segments([Segment.build(chunks) for chunks in groups])
+        blocks: dict[str, list[Segment]] = {}
+        for segment in self.segments:
+            for term in segment.postings:
+                blocks.setdefault(term, []).append(segment)
+        self.blocks = {term: tuple(segments) for term, segments in blocks.items()}
+        self._expand_cache = {}
+        self._df_cache = {}
+        self._build_term_grams()
+        self._build_stats()
+
+    def restore(self, segments: list[Segment], terms: list[str], term_grams, term_chars,
+                lengths: dict, avg_length: dict[str, float], norms: dict) -> None:
+        """
+        미리 만들어 둔 조각/테이블(rag_snapshot 의 mmap 테이블 등)로 색인을 복원합니다.
+        테이블은 build() 결과와 같은 모양의 매핑이면 됩니다. terms 는 용어 id 순서의 용어 사전입니다.
+        """
+        self._set_segments(segments)
+        blocks: dict[str, list[Segment]] = {term: [] for term in terms}
+        for segment in segments:
+            for term in segment.postings:
+                blocks[term].append(segment)
+        self.blocks = {term: tuple(segments) for term, segments in blocks.items()}
+        self.terms = terms
+        self.term_grams = term_grams
+        self.term_chars = term_chars
+        self.lengths = lengths
+        self.chunk_count = len(lengths["body"])
+        self.avg_length = dict(avg_length)
+        self.norms = norms
+        self._expand_cache = {}
+        self._df_cache = {}
+
+    def replaced(self, pos: int, count: int, groups: list[list]) -> "InvertedIndex":
+        """
+        조각 [pos, pos + count) 를 groups(문서별 청크 리스트들)로 만든 조각으로 바꾼 새 색인을 반환합니다.
+        (기존 색인은 그대로 — 문서 수정은 count=1 + 한 그룹, 추가는 count=0, 삭제는 빈 groups)
+
+        - 바뀐 문서의 청크만 다시 토큰화합니다.
+        - 다른 문서의 조각은 배열째 공유하고, 시작 id 만 다시 계산합니다.
+        - blocks 는 바뀐 문서에 있던/생긴 용어의 항목만 새로 만듭니다.
+        - BM25 정규화 값은 평균 길이가 바뀌므로 청크 수만큼 다시 계산합니다. (청크당 숫자 3개)
+        """
+        removed = self.segments[pos:pos + count]
+        added = [Segment.build(chunks) for chunks in groups]
+
+        updated = InvertedIndex()
+        updated._set_segments(self.segments[:pos] + added + self.segments[pos + count:])
+
+        gone = set(removed)
+        touched: set[str] = set()
+        for segment in removed + added:
+            touched.update(segment.postings)
+
+        blocks = dict(self.blocks)
+        for term in touched:
+            segments = [segment for segment in blocks.get(term, ()) if segment not in gone]
+            segments.extend(segment for segment in added if term in segment.postings)
+            segments.sort(key=updated.offsets.__getitem__)
+            blocks[term] = tuple(segments)
+        updated.blocks = blocks
+
+        # ── 용어 사전: 새 용어만 뒤에 추가 (빠진 용어는 빈 조각 목록으로 남김) ──
+        updated.terms = list(self.terms)
+        updated.term_grams = dict(self.term_grams)
+        updated.term_chars = dict(self.term_chars)
+        new_terms = [term for segment in added for term in segment.postings if term not in self.blocks]
+        for term in dict.fromkeys(new_terms):
+            term_id = len(updated.terms)
+            updated.terms.append(term)
+            for gram in char_ngrams(term):
+                if len(gram) == NGRAM:
+                    updated.term_grams[gram] = _appended(updated.term_grams.get(gram), term_id)
+            for char in set(term):
+                updated.term_chars[char] = _appended(updated.term_chars.get(char), term_id)
+
+        updated._build_stats()
+        return updated
+
+    def _set_segments(self, segments: list[Segment]) -> None:
+        """조각 목록과 조각별 시작 청크 id 를 정합니다"""
+        self.segments = segments
+        self.starts = array('i', [0])
+        self.offsets = {}
+        for segment in segments:
+            self.offsets[segment] = self.starts[-1]
+            self.starts.append(self.starts[-1] + segment.size)
+        self.chunk_count = self.starts[-1]
+
+    def _locate(self, chunk_id: int) -> tuple[Segment, int]:
+        """전역 청크 id → (조각, 로컬 id)"""
+        pos = bisect_right(self.starts, chunk_id) - 1
+        return self.segments[pos], chunk_id - self.starts[pos]
+
+    def _build_term_grams(self) -> None:
+        """용어 사전의 문자 n-gram / 글자 색인을 만듭니다"""
+        self.terms = list(self.blocks)
+        term_grams: dict[str, array] = {}
+        term_chars: dict[str, array] = {}
+
+        for term_id, term in enumerate(self.terms):
+            for gram in char_ngrams(term):
+                if len(gram) == NGRAM:
+                    term_grams.setdefault(gram, array('i')).append(term_id)
+            for char in set(term):
+                term_chars.setdefault(char, array('i')).append(term_id)
+
+        self.term_grams = term_grams
+        self.term_chars = term_chars
+
+    def _build_stats(self) -> None:
+        """조각별 길이를 이어 붙여 필드별 평균 길이와 청크별 BM25 정규화 값을 계산합니다"""
+        self.lengths = {}
+        self.avg_length = {}
+        self.norms = {}
+
+        for field, (_, b) in BM25F_FIELDS.items():
+            values = array('i')
+            for segment in self.segments:
+                values.extend(segment.lengths[field])
+            avg = (sum(values) / len(values)) if values else 0.0
+            self.lengths[field] = values
+            self.avg_length[field] = avg
+            self.norms[field] = array('d', (
+                1.0 - b + b * (length / avg) if avg > 0 else 1.0
+                for length in values
+            ))
+        self.chunk_count = len(self.lengths["body"])
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self.blocks)
+
+    def term_frequencies(self):
+        """(용어, 그 용어가 있는 청크 수) 를 용어마다 하나씩 (사라진 용어는 0)"""
+        for term, segments in self.blocks.items():
+            yield term, sum(len(segment.postings[term][0]) for segment in segments)
+
+    def nbytes(self) -> int:
+        """색인 배열이 차지하는 크기 (bytes, 스냅샷 mmap 테이블은 매핑된 크기)"""
+        def size(values) -> int:
+            if isinstance(values, memoryview):
+                return values.nbytes
+            if isinstance(values, array):
+                return len(values) * values.itemsize
+            return sys.getsizeof(values)
+
+        tables = [self.term_grams, self.term_chars]
+        for segment in self.segments:
+            tables.append(segment.postings)
+        total = 0
+        for table in tables:
+            for value in table.values():
+                total += sum(size(column) for column in value) if isinstance(value, tuple) else size(value)
+        for field in BM25F_FIELDS:
+            if field in self.lengths:
+                total += size(self.lengths[field]) + size(self.norms[field])
+        return total
+
+    def expand(self, word: str) -> list[tuple[str, int]]:
+        """
+        검색어 단어를 포함하는 색인 용어 목록을 반환합니다.
+        (용어, 용어 안에서 word가 겹치지 않게 등장하는 횟수)
+        """
+        cached = self._expand_cache.get(word)
+        if cached is not None:
+            return cached
+
+        # n-gram 포스팅 교집합으로 후보 용어를 고른 뒤 실제 포함 여부 확인
+        if len(word) < NGRAM:
+            candidates = _intersect([self.term_chars.get(char, ()) for char in set(word)])
+        else:
+            candidates = _intersect([self.term_grams.get(gram, ()) for gram in char_ngrams(word)])
+
+        terms = self.terms
+        matches = []
+        for term_id in sorted(candidates):
+            term = terms[term_id]
+            if word in term:
+                matches.append((term, term.count(word)))
+
+        self._expand_cache[word] = matches
+        return matches
+
+    def phrase_candidates(self, phrase: str, chunk_ids) -> Optional[set[int]]:
+        """
+        chunk_ids 중 구문의 모든 문자 n-gram을 포함하는 청크 id 집합.
+        (필요조건만 보장 — 최종 확인은 호출하는 쪽에서 문자열로)
+        청크의 n-gram 집합은 처음 후보가 될 때 만들어 조각에 보관합니다.
+        구문이 n-gram보다 짧으면 좁힐 수 없으므로 None.
+        """
+        if len(phrase) < NGRAM:
+            return None
+        grams = char_ngrams(phrase)
+        found: set[int] = set()
+        for cid in chunk_ids:
+            segment, local_id = self._locate(cid)
+            if grams <= segment.grams(local_id):
+                found.add(cid)
+        return found
+
+    def match(self, word: str, memo: Optional[dict] = None,
+              ranges: Optional[tuple[tuple[int, int], ...]] = None,
+              ) -> tuple[dict[int, int], set[int], set[int]]:
+        """
+        단어 하나에 대한 청크별 매칭 정보를 모읍니다.
+
+        Args:
+            memo: 단어 → 매칭 결과 공유 사전 (배치 검색에서 같은 단어의 포스팅을 한 번만 순회)
+            ranges: 청크 id 구간 [시작, 끝) 들 (필터 후보, None 이면 전체).
+                    구간과 겹치지 않는 조각은 건너뛰고, 포스팅은 id 오름차순이라
+                    이분 탐색으로 구간 안의 항목만 읽습니다.
+
+        Returns:
+            (청크 id → 본문 등장 횟수, 헤딩 매칭 청크 id, 문서명 매칭 청크 id)
+        """
+        if memo is not None:
+            key = (word, ranges)
+            cached = memo.get(key)
+            if cached is None:
+                cached = memo[key] = self.match(word, ranges=ranges)
+            return cached
+
+        tf: dict[int, int] = {}
+        heading_hits: set[int] = set()
+        doc_hits: set[int] = set()
+
+        offsets = self.offsets
+        for term, multiplicity in self.expand(word):
+            for segment in self.blocks[term]:
+                base = offsets[segment]
+                ids, counts, flags = segment.postings[term]
+                if ranges is None:
+                    spans = ((0, len(ids)),)
+                else:
+                    spans = [
+                        (bisect_left(ids, lo - base), bisect_left(ids, hi - base))
+                        for lo, hi in ranges
+                        if lo < base + segment.size and hi > base
+                    ]
+                for a, b in spans:
+                    for local_id, count, flag in zip(ids[a:b], counts[a:b], flags[a:b]):
+                        cid = base + local_id
+                        if count:
+                            tf[cid] = tf.get(cid, 0) + count * multiplicity
+                        if flag & FLAG_HEADING:
+                            heading_hits.add(cid)
+                        if flag & FLAG_DOC_NAME:
+                            doc_hits.add(cid)
+
+        return tf, heading_hits, doc_hits
+
+    def document_frequency(self, word: str) -> int:
+        """단어가 (본문/헤딩/문서명 중 어디든) 들어 있는 청크 수 — 필터와 무관한 전체 기준"""
+        cached = self._df_cache.get(word)
+        if cached is not None:
+            return cached
+        terms = self.expand(word)
+        if len(terms) == 1:
+            term = terms[0][0]
+            df = sum(len(segment.postings[term][0]) for segment in self.blocks[term])
+        else:
+            ids: set[int] = set()
+            for term, _ in terms:
+                for segment in self.blocks[term]:
+                    base = self.offsets[segment]
+                    ids.update(base + local_id for local_id in segment.postings[term][0])
+            df = len(ids)
+        self._df_cache[word] = df
+        return df
+
+    def hits(self, chunk_id: int, words) -> list[tuple[int, int, str]]:
+        """
+        청크 본문 안에서 검색어 단어가 등장하는 위치 [(시작, 끝, 단어), ...] (시작 순).
+        조각에 보관한 토큰 위치 + 토큰 안에서의 단어 위치로 계산합니다. (본문은 청크마다 처음 한 번만 훑음)
+        """
+        segment, local_id = self._locate(chunk_id)
+        positions = segment.positions(local_id)
+        found: list[tuple[int, int, str]] = []
+        for word in words:
+            size = len(word)
+            for term, offsets in positions.items():
+                if word not in term:
+                    continue
+                # 토큰 안에서 단어가 겹치지 않게 등장하는 위치 (text.count 와 같은 기준)
+                inner = []
+                at = term.find(word)
+                while at >= 0:
+                    inner.append(at)
+                    at = term.find(word, at + size)
+                for offset in offsets:
+                    found.extend((offset + at, offset + at + size, word) for at in inner)
+        found.sort()
+        return found
+
+    def idf(self, df: int) -> float:
+        """BM25 역문서빈도 (항상 양수)"""
+        n = self.chunk_count
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def bm25_scores(self, words, memo: Optional[dict] = None,
+                    ranges: Optional[tuple[tuple[int, int], ...]] = None) -> dict[int, float]:
+        """
+        BM25F 점수를 계산합니다.
+        단어별 필드 가중 TF를 정규화 값으로 나눈 뒤 포화(k1)시키고 IDF를 곱합니다.
+        (memo/ranges 는 match() 와 같음 — 구간을 좁혀도 IDF 는 전체 청크 기준)
+        """
+        w_body = BM25F_FIELDS["body"][0]
+        w_heading = BM25F_FIELDS["heading"][0]
+        w_doc = BM25F_FIELDS["doc_name"][0]
+        body_norm = self.norms["body"]
+        heading_norm = self.norms["heading"]
+        doc_norm = self.norms["doc_name"]
+
+        scores: dict[int, float] = {}
+
+        for word in words:
+            tf, heading_hits, doc_hits = self.match(word, memo, ranges)
+            matched = tf.keys() | heading_hits | doc_hits
+            if not matched:
+                continue
+            idf = self.idf(len(matched) if ranges is None else self.document_frequency(word))
+
+            for cid in matched:
+                weighted = 0.0
+                if cid in tf:
+                    weighted += w_body * tf[cid] / body_norm[cid]
+                if cid in heading_hits:
+                    weighted += w_heading / heading_norm[cid]
+                if cid in doc_hits:
+                    weighted += w_doc / doc_norm[cid]
+                scores[cid] = scores.get(cid, 0.0) + idf * weighted / (BM25_K1 + weighted)
+
+        return scores
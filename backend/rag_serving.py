@@ -0,0 +1,87 @@
+"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[RAG Serving] 검색 전용 작업 풀 (이벤트 루프 보호 + 백프레셔)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+FastAPI 엔드포인트는 async def 인데 RAGEngine.search 는 동기 CPU 작업이라,
+그대로 부르면 느린 검색 하나가 같은 워커의 다른 요청(문서 조회, 자동완성, 통계)을 모두 막습니다.
+
+SearchPool:
+  - 검색은 정해진 수의 스레드에서 실행하고, 이벤트 루프는 결과만 기다립니다.
+  - 실행 중 + 대기 중 작업 수에 상한(max_pending)을 두고, 넘치면 바로 PoolBusy 를 던집니다.
+    → 서버는 503 + Retry-After 로 응답하고, 대기열이 끝없이 쌓여 모든 요청이 느려지는 일을 막음
+  - 슬롯은 작업이 실제로 끝날 때 반납합니다 (클라이언트가 끊어도 스레드가 돌고 있으면 점유 유지).
+
+CPU 병렬성은 프로세스(uvicorn 워커)로 얻습니다 (검색은 순수 Python 이라 스레드는 GIL 을 나눠 씀).
+워커들은 같은 스냅샷 파일(.ragidx)과 벡터 행렬(.npy)을 mmap 으로 열기 때문에
+색인 배열은 OS 페이지 캐시 한 벌을 공유합니다 — main.py 의 "운영 모드" 참고.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class PoolBusy(Exception):
+    """대기열이 가득 차서 작업을 받지 않음 (HTTP 503 으로 변환)"""
+
+
+class SearchPool:
+    """검색 전용 스레드 풀 + 동시 작업 상한"""
+
+    def __init__(self, threads: int = 4, max_pending: int = 64):
+        if threads < 1 or max_pending < threads:
+            raise ValueError(f"threads 는 1 이상, max_pending 은 threads 이상이어야 합니다: "
+                             f"threads={threads}, max_pending={max_pending}")
+        self.threads = threads
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="rag-search")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        # ── 크기 조정용 카운터 ──
+        self.completed = 0
+        self.rejected = 0
+        self.peak = 0
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        fn(*args, **kwargs) 를 풀에서 실행하고 결과를 기다립니다.
+
+        Raises:
+            PoolBusy: 실행 중 + 대기 중 작업이 max_pending 개
+            fn 이 던진 예외는 그대로 전달
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolBusy(f"검색 대기열이 가득 찼습니다 ({self.max_pending}개)")
+            self._pending += 1
+            self.peak = max(self.peak, self._pending)
+
+        try:
+            future = self._executor.submit(partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "threads": self.threads,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "peak": self.peak,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
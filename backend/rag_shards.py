@@ -0,0 +1,349 @@
+"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[RAG Shards] 소설별 샤드 검색 엔진
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+novels/*/world_db 마다 독립된 RAGEngine(샤드)을 두고 서버 하나에서 여러 소설을 검색합니다.
+
+샤드:
+  - 이름 = 소설 폴더명 ("murim_mna"), 보관본은 "murim_mna/_archive" (include_archive=True)
+  - 샤드마다 색인/캐시/스냅샷이 따로라 한 소설의 reload 가 다른 소설에 영향을 주지 않습니다.
+
+지연 로드 / 해제:
+  - 샤드는 처음 쓰일 때 load() 합니다 (스냅샷이 있으면 mmap 으로 바로).
+  - 로드된 샤드 크기 합이 memory_budget 을 넘으면 가장 오래 안 쓴 샤드부터 내립니다.
+  - idle_ttl 초 동안 안 쓴 샤드는 sweep() 에서 내립니다 (reload() 마다 = 감시 주기마다).
+  - 내린 샤드는 다음 검색 때 다시 로드됩니다. 검색 중이던 요청은 자기 세대를 그대로 씁니다.
+
+팬아웃:
+  novel="*" 이면 모든 샤드를 동시에 검색하고 점수순으로 합칩니다. (결과마다 "novel" 표시)
+
+사용 예시:
+  shards = ShardedRAGEngine("../novels", default="murim_mna")
+  shards.search("화산파", novel="murim_mna")
+  shards.search("화산파", novel="*")
+"""
+
+import gc
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from rag_engine import TAG_TOP_K, RAGEngine
+
+FANOUT = "*"                  # 모든 샤드 검색
+ARCHIVE_SUFFIX = "/_archive"  # 보관본 샤드 이름 접미사
+
+
+class UnknownShard(Exception):
+    """없는 소설(샤드) 이름 (HTTP 404 로 변환)"""
+
+
+class Shard:
+    """샤드 하나 (엔진 + 사용 기록)"""
+
+    def __init__(self, name: str, docs_path: Path, engine: RAGEngine):
+        self.name = name
+        self.docs_path = docs_path
+        self.engine = engine
+        self.lock = threading.Lock()   # 같은 샤드를 두 요청이 동시에 로드하지 않도록
+        self.last_used = 0.0
+        self.bytes = 0                 # 로드 후 추정 크기 (RAGEngine.memory_bytes)
+        self.loads = 0
+        self.evictions = 0
+
+    def info(self, now: float) -> dict:
+        loaded = self.engine.loaded
+        return {
+            "novel": self.name,
+            "path": str(self.docs_path),
+            "loaded": loaded,
+            "chunks": len(self.engine.chunks) if loaded else 0,
+            "bytes": self.bytes if loaded else 0,
+            "idle_seconds": round(now - self.last_used, 1) if self.last_used else None,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+
+class ShardedRAGEngine:
+    """
+    여러 소설의 world_db 를 샤드로 묶은 검색 엔진.
+    novel 을 생략하면 기본 샤드(default)를 씁니다.
+    """
+
+    def __init__(self, novels_path: str, default: Optional[str] = None,
+                 include_archive: bool = False, memory_budget: int = 0, idle_ttl: float = 0.0,
+                 engine_factory: Optional[Callable[[Path], RAGEngine]] = None):
+        """
+        Args:
+            novels_path: novels 폴더 (하위 */world_db 가 샤드)
+            default: novel 생략 시 쓸 샤드 (없으면 첫 샤드)
+            include_archive: */_archive/world_db 도 샤드로 추가
+            memory_budget: 로드된 샤드 크기 합 상한 (bytes, 0 이면 무제한)
+            idle_ttl: 이 시간(초) 동안 안 쓴 샤드는 sweep() 에서 해제 (0 이면 안 함)
+            engine_factory: world_db 경로 → RAGEngine (스냅샷/캐시 옵션 지정용)
+        """
+        self.novels_path = Path(novels_path)
+        self.include_archive = include_archive
+        self.memory_budget = memory_budget
+        self.idle_ttl = idle_ttl
+        self._engine_factory = engine_factory or (lambda docs_path: RAGEngine(str(docs_path)))
+        self._shards: dict[str, Shard] = {}
+        self._lock = threading.Lock()
+        self._fanout_pool: Optional[ThreadPoolExecutor] = None
+
+        self.discover()
+        if default in self._shards:
+            self.default = default
+        else:
+            self.default = next(iter(self._shards), None)
+
+    # ── 샤드 관리 ──
+
+    def discover(self) -> list[str]:
+        """novels/*/world_db 를 찾아 샤드 목록을 갱신합니다 (사라진 소설은 제거)"""
+        found: dict[str, Path] = {}
+        for world_db in sorted(self.novels_path.glob("*/world_db")):
+            name = world_db.parent.name
+            found[name] = world_db
+            archive = world_db.parent / "_archive" / "world_db"
+            if self.include_archive and archive.is_dir():
+                found[name + ARCHIVE_SUFFIX] = archive
+
+        with self._lock:
+            for name in list(self._shards):
+                if name not in found:
+                    del self._shards[name]
+            for name, docs_path in found.items():
+                if name not in self._shards:
+                    self._shards[name] = Shard(name, docs_path, self._engine_factory(docs_path))
+        return list(found)
+
+    @property
+    def novels(self) -> list[str]:
+        return list(self._shards)
+
+    def shard(self, novel: Optional[str] = None) -> RAGEngine:
+        """
+        소설 이름 → 로드된 샤드 엔진 (처음이면 여기서 로드).
+
+        Raises:
+            UnknownShard: 없는 소설
+        """
+        name = novel or self.default
+        shard = self._shards.get(name) if name else None
+        if shard is None:
+            raise UnknownShard(f"알 수 없는 소설입니다: {novel} (가능: {', '.join(self._shards)})")
+
+        shard.last_used = time.monotonic()
+        engine = shard.engine
+        if not engine.loaded:
+            with shard.lock:
+                engine = shard.engine
+                if not engine.loaded:
+                    print(f"📦 샤드 로드: {name}")
+                    engine.load()
+                    shard.bytes = engine.memory_bytes()
+                    shard.loads += 1
+            self._enforce_budget(keep=shard)
+        return engine
+
+    def _evict(self, shard: Shard) -> None:
+        """샤드를 내립니다 (새 빈 엔진으로 교체 — 검색 중인 요청은 기존 엔진을 계속 씀)"""
+        shard.engine = self._engine_factory(shard.docs_path)
+        shard.bytes = 0
+        shard.evictions += 1
+        print(f"💤 샤드 해제: {shard.name}")
+
+    def _enforce_budget(self, keep: Shard) -> None:
+        """로드된 샤드 크기 합이 예산을 넘으면 오래 안 쓴 샤드부터 내림 (방금 쓴 샤드는 제외)"""
+        if self.memory_budget <= 0:
+            return
+        with self._lock:
+            loaded = [shard for shard in self._shards.values() if shard.engine.loaded]
+            total = sum(shard.bytes for shard in loaded)
+            for shard in sorted(loaded, key=lambda s: s.last_used):
+                if total <= self.memory_budget:
+                    break
+                if shard is keep:
+                    continue
+                total -= shard.bytes
+                self._evict(shard)
+
+    def sweep(self) -> list[str]:
+        """idle_ttl 동안 안 쓴 샤드를 내리고 이름 목록을 반환합니다"""
+        if self.idle_ttl <= 0:
+            return []
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            for shard in self._shards.values():
+                if shard.engine.loaded and now - shard.last_used > self.idle_ttl:
+                    self._evict(shard)
+                    evicted.append(shard.name)
+        return evicted
+
+    def prebuild(self, stale_only: bool = False) -> int:
+        """
+        모든 샤드의 스냅샷을 미리 만들어 둡니다 (운영 모드에서 워커를 띄우기 전).
+        샤드마다 임시 엔진으로 로드 → 스냅샷 저장 → 바로 버리므로, 이 프로세스에는 색인이 남지 않습니다.
+
+        운영 모드에서는 감독 프로세스가 이것을 stale_only=True 로 주기적으로 불러
+        스냅샷/벡터 .npy 를 쓰는 유일한 프로세스가 되고, 워커들은 읽기만 합니다.
+
+        Args:
+            stale_only: True 면 새 소설을 찾고, 원본과 안 맞는 스냅샷만 다시 만듦
+
+        Returns:
+            스냅샷을 (다시) 만든 샤드 수
+        """
+        if stale_only:
+            self.discover()
+        with self._lock:
+            targets = [shard.docs_path for shard in self._shards.values()]
+        built = 0
+        for docs_path in targets:
+            scratch = self._engine_factory(docs_path)
+            if stale_only and scratch.snapshot_is_current():
+                continue
+            scratch.load()
+            built += 1
+            del scratch
+            gc.collect()
+        return built
+
+    def load(self) -> int:
+        """기본 샤드만 미리 로드합니다 (나머지는 처음 검색될 때)"""
+        if self.default is None:
+            print(f"⚠️ 샤드가 없습니다: {self.novels_path}/*/world_db")
+            return 0
+        return len(self.shard(self.default).chunks)
+
+    def reload(self) -> dict:
+        """
+        새 소설을 찾고, 로드된 샤드만 변경분 재색인한 뒤, 오래 안 쓴 샤드를 내립니다.
+
+        Returns:
+            {"shards": {소설: RAGEngine.reload() 결과}, "evicted": [내린 소설]}
+        """
+        self.discover()
+        reports = {}
+        for shard in list(self._shards.values()):
+            engine = shard.engine
+            if not engine.loaded:
+                continue
+            report = engine.reload()
+            if report["reindexed"] or report["added"] or report["removed"]:
+                shard.bytes = engine.memory_bytes()
+            reports[shard.name] = report
+        return {"shards": reports, "evicted": self.sweep()}
+
+    # ── 검색 ──
+
+    def _fan_out(self, run: Callable[[RAGEngine], list]) -> dict[str, list]:
+        """모든 샤드에 run(엔진) 을 동시에 실행 → 소설 → 결과"""
+        if self._fanout_pool is None:
+            with self._lock:   # 첫 팬아웃 요청 둘이 동시에 와도 풀은 하나만
+                if self._fanout_pool is None:
+                    self._fanout_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-shard")
+        names = self.novels
+        futures = [self._fanout_pool.submit(lambda name=name: run(self.shard(name))) for name in names]
+        return {name: future.result() for name, future in zip(names, futures)}
+
+    @staticmethod
+    def _merge(per_shard: dict[str, list[dict]], top_k: int, offset: int = 0) -> list[dict]:
+        """샤드별 결과를 점수순으로 합칩니다 (동점은 샤드 순서, 샤드 내 순위 유지)"""
+        candidates = (
+            (-result["score"], order, rank, result)
+            for order, results in enumerate(per_shard.values())
+            for rank, result in enumerate(results)
+        )
+        winners = heapq.nsmallest(offset + top_k, candidates, key=lambda x: x[:3])
+        return [result for *_, result in winners[offset:]]
+
+    @staticmethod
+    def _tag(novel: str, results: list[dict]) -> list[dict]:
+        for result in results:
+            result["novel"] = novel
+        return results
+
+    def search(self, query: str, novel: Optional[str] = None, top_k: int = 5,
+               offset: int = 0, **options) -> list[dict]:
+        """
+        RAGEngine.search 와 같은 인자 + novel (생략 = 기본 샤드, "*" = 모든 샤드 합침).
+        결과마다 어느 소설의 청크인지 "novel" 이 붙습니다.
+        """
+        if novel != FANOUT:
+            name = novel or self.default
+            return self._tag(name, self.shard(novel).search(query, top_k=top_k, offset=offset, **options))
+
+        # 샤드마다 offset + top_k 개를 받아야 합친 순위의 [offset, offset + top_k) 가 정확함
+        per_shard = self._fan_out(lambda engine: engine.search(query, top_k=offset + top_k, **options))
+        for name, results in per_shard.items():
+            self._tag(name, results)
+        return self._merge(per_shard, top_k, offset)
+
+    def search_many(self, queries: list[str], novel: Optional[str] = None, top_k: int = 5,
+                    dedupe: bool = False, **options) -> list[list[dict]]:
+        """RAGEngine.search_many 와 같은 인자 + novel ("*" 이면 검색어마다 샤드 결과를 합침)"""
+        if novel != FANOUT:
+            name = novel or self.default
+            batch = self.shard(novel).search_many(queries, top_k=top_k, dedupe=dedupe, **options)
+            return [self._tag(name, results) for results in batch]
+
+        # 중복 제거는 합친 뒤에 (소설, chunk_id) 기준으로 → 샤드에서는 그만큼 더 받아 둠
+        depth = top_k * len(queries) if dedupe else top_k
+        per_shard = self._fan_out(
+            lambda engine: engine.search_many(queries, top_k=depth, **options)
+        )
+        for name, batch in per_shard.items():
+            for results in batch:
+                self._tag(name, results)
+
+        merged: list[list[dict]] = []
+        seen: set[tuple[str, int]] = set()
+        for position in range(len(queries)):
+            ranked = self._merge({name: batch[position] for name, batch in per_shard.items()},
+                                 depth)
+            if dedupe:
+                ranked = [result for result in ranked
+                          if (result["novel"], result["chunk_id"]) not in seen][:top_k]
+                seen.update((result["novel"], result["chunk_id"]) for result in ranked)
+            merged.append(ranked[:top_k])
+        return merged
+
+    def search_by_tag(self, tag: str, novel: Optional[str] = None, fuzzy: bool = True) -> list[dict]:
+        """@태그 검색 (novel="*" 이면 모든 샤드의 태그 결과를 합침)"""
+        if novel != FANOUT:
+            return self._tag(novel or self.default, self.shard(novel).search_by_tag(tag, fuzzy=fuzzy))
+        per_shard = self._fan_out(lambda engine: engine.search_by_tag(tag, fuzzy=fuzzy))
+        for name, results in per_shard.items():
+            self._tag(name, results)
+        return self._merge(per_shard, TAG_TOP_K)
+
+    def tag_corrections(self, tag: str, novel: Optional[str] = None, fuzzy: bool = True) -> dict[str, str]:
+        """search_by_tag 가 바꿔서 찾는 내용 (novel="*" 이면 샤드마다 다를 수 있어 {})"""
+        if novel == FANOUT:
+            return {}
+        return self.shard(novel).tag_corrections(tag, fuzzy=fuzzy)
+
+    # ── 통계 ──
+
+    def get_stats(self, novel: Optional[str] = None) -> dict:
+        """novel 을 주면 그 샤드의 통계, 아니면 샤드 목록과 메모리 사용량"""
+        if novel:
+            return self.shard(novel).get_stats()
+        now = time.monotonic()
+        shards = [shard.info(now) for shard in self._shards.values()]
+        return {
+            "default": self.default,
+            "novels": shards,
+            "loaded": sum(1 for info in shards if info["loaded"]),
+            "loaded_bytes": sum(info["bytes"] for info in shards),
+            "memory_budget": self.memory_budget,
+            "idle_ttl": self.idle_ttl,
+        }
@@ -0,0 +1,441 @@
+"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[RAG Snapshot] 색인 스냅샷 (디스크 저장 + 메모리 맵)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+RAGEngine.load() 가 매번 .md 파일을 다시 읽고 정규식으로 쪼개는 대신,
+문서/청크/포스팅/통계를 바이너리 파일 하나에 저장해 두고
+원본이 바뀌지 않았으면 mmap 으로 그대로 붙여 씁니다.
+
+파일 구조:
+  MAGIC(8) + 헤더 길이(u64) + 헤더 JSON + 8바이트 정렬된 바이너리 섹션들
+
+  헤더 JSON : 포맷 버전, 색인 파라미터, 매니페스트(파일명·크기·mtime·본문 sha256),
+              문서 메타데이터, 섹션 목차(오프셋, 바이트 수, 타입코드)
+  섹션      : array 타입코드 그대로의 원시 배열 → memoryview.cast 로 복사 없이 사용
+
+원본 변경 판단:
+  1. 파일 목록이 다르면 → 재빌드
+  2. 크기·mtime 이 같으면 → 그대로 사용
+  3. mtime 만 다르면 → sha256 비교 (git checkout 등으로 시간만 바뀐 경우 재빌드 안 함)
+  매니페스트의 크기·mtime 은 읽기 직전에 잰 값, sha256 은 실제로 색인한 본문의 해시입니다.
+  (저장할 때 다시 재면 읽은 뒤 바뀐 파일이 "최신" 으로 기록되어 낡은 스냅샷을 계속 쓰게 됨)
+
+사전 빌드 (CLI):
+  cd backend
+  python rag_snapshot.py                                  # 기본 world_db
+  python rag_snapshot.py ../novels/murim_mna/world_db     # 경로 지정
+  python rag_snapshot.py <경로> --out <스냅샷 파일>
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Optional
+
+from rag_engine import Chunk, Document, RAGEngine
+from rag_index import BM25_K1, BM25F_FIELDS, NGRAM, InvertedIndex, Segment
+
+# ── 포맷 ──
+MAGIC = b"RAGIDX01"
+FORMAT_VERSION = 6
+ALIGN = 8
+
+# 색인 파라미터가 바뀌면 스냅샷은 무효
+INDEX_PARAMS = {
+    "ngram": NGRAM,
+    "bm25_k1": BM25_K1,
+    "bm25f_fields": {field: list(values) for field, values in BM25F_FIELDS.items()},
+}
+
+# 기본 경로 (main.py 와 동일한 world_db)
+DEFAULT_DOCS_PATH = Path(__file__).parent.parent / "novels" / "murim_mna" / "world_db"
+SNAPSHOT_DIR = Path(__file__).parent / ".rag_cache"
+
+
+def default_snapshot_path(docs_path) -> Path:
+    """world_db 경로별 기본 스냅샷 파일 위치 (backend/.rag_cache/<소설>_<폴더>.ragidx)"""
+    docs_path = Path(docs_path).resolve()
+    return SNAPSHOT_DIR / f"{docs_path.parent.name}_{docs_path.name}.ragidx"
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 매니페스트
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _sha256(content: str) -> str:
+    """본문 해시 (RAGEngine 과 같은 방식으로 읽은 텍스트 기준)"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def build_manifest(documents: list[Document], file_stats: dict[str, tuple[int, int]]) -> list[dict]:
+    """
+    색인한 문서들의 매니페스트 (파일명, 크기, mtime, sha256).
+    크기·mtime 은 읽기 전에 잰 file_stats, sha256 은 읽은 본문 — 파일을 다시 열지 않습니다.
+    (읽기 실패한 파일은 sha256 이 None → mtime 이 바뀌면 재빌드)
+    """
+    hashes = {Path(doc.path).name: _sha256(doc.content) for doc in documents}
+    return [
+        {"path": name, "size": size, "mtime_ns": mtime_ns, "sha256": hashes.get(name)}
+        for name, (size, mtime_ns) in sorted(file_stats.items())
+    ]
+
+
+def manifest_matches(manifest: list[dict], md_files: list[Path]) -> bool:
+    """저장된 매니페스트가 현재 파일들과 같은지 확인합니다 (필요할 때만 해시 계산)"""
+    if [entry["path"] for entry in manifest] != [f.name for f in md_files]:
+        return False
+
+    for entry, md_file in zip(manifest, md_files):
+        stat = md_file.stat()
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns != entry["mtime_ns"]:
+            try:
+                current = _sha256(md_file.read_text(encoding="utf-8"))
+            except (OSError, UnicodeDecodeError):
+                return False
+            if current != entry["sha256"]:
+                return False
+    return True
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 문자열 / CSR 테이블 직렬화
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _pack_strings(strings) -> tuple[bytes, array]:
+    """문자열 리스트 → (UTF-8 블롭, 문자 단위 오프셋 n+1개)"""
+    offsets = array('q', [0])
+    total = 0
+    for s in strings:
+        total += len(s)
+        offsets.append(total)
+    return "".join(strings).encode("utf-8"), offsets
+
+
+def _unpack_strings(blob, offsets) -> list[str]:
+    text = str(blob, "utf-8")
+    return [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def _flatten_tables(tables: list[Mapping], typecodes: str) -> tuple[list[str], array, list[array], array]:
+    """
+    key → 배열(들) 매핑들을 CSR 형태 하나로 이어서 펼칩니다.
+
+    Returns:
+        (키, 행 오프셋, 열 배열들, 매핑별 시작 행 번호 n+1개)
+    """
+    keys: list[str] = []
+    offsets = array('q', [0])
+    columns = [array(code) for code in typecodes]
+    bounds = array('q', [0])
+    for table in tables:
+        for key, values in table.items():
+            if len(columns) == 1:
+                values = (values,)
+            for column, value in zip(columns, values):
+                column.extend(value)
+            keys.append(key)
+            offsets.append(len(columns[0]))
+        bounds.append(len(keys))
+    return keys, offsets, columns, bounds
+
+
+class CsrTable(Mapping):
+    """
+    스냅샷에서 복원한 key → 배열 매핑.
+    값은 mmap 위의 memoryview 슬라이스라 복사가 일어나지 않습니다.
+    """
+
+    def __init__(self, keys: list[str], offsets, columns: list):
+        self._keys = keys
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._offsets = offsets
+        self._columns = columns
+
+    def __getitem__(self, key):
+        row = self._rows[key]
+        start, end = self._offsets[row], self._offsets[row + 1]
+        if len(self._columns) == 1:
+            return self._columns[0][start:end]
+        return tuple(column[start:end] for column in self._columns)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+# 스냅샷에 저장하는 색인 테이블: (속성명, 열 타입코드)
+_INDEX_TABLES = (
+    ("term_grams", "i"),
+    ("term_chars", "i"),
+)
+# 문서별 조각(rag_index.Segment)마다 저장하는 테이블 — 조각 경계는 "<이름>.bounds"
+# (본문 bigram 표와 토큰 위치는 조각이 처음 쓸 때 만드므로 저장하지 않음)
+_SEGMENT_TABLES = (
+    ("postings", "iib"),
+)
+
+
+def _table_sections(name: str, tables: list[Mapping], typecodes: str) -> list[tuple[str, object]]:
+    keys, offsets, columns, bounds = _flatten_tables(tables, typecodes)
+    key_blob, key_offsets = _pack_strings(keys)
+    sections = [
+        (f"{name}.keys", key_blob), (f"{name}.key_offsets", key_offsets),
+        (f"{name}.offsets", offsets), (f"{name}.bounds", bounds),
+    ]
+    return sections + [(f"{name}.col{i}", column) for i, column in enumerate(columns)]
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 저장
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def save_snapshot(engine: RAGEngine, path, file_stats: dict[str, tuple[int, int]]) -> int:
+    """
+    엔진의 현재 문서/청크/색인을 스냅샷 파일로 저장합니다.
+    임시 파일에 쓴 뒤 교체하므로 다른 프로세스가 반쯤 쓴 파일을 읽는 일은 없습니다.
+    file_stats 는 이 세대를 읽기 전에 잰 파일명 → (크기, mtime_ns) 입니다.
+
+    Returns:
+        저장된 파일 크기 (bytes)
+    """
+    path = Path(path)
+    index = engine.index
+    sections: list[tuple[str, object]] = []
+
+    # ── 문서 본문 + 청크 (본문 내 문자 오프셋으로 저장) ──
+    doc_ids = {doc.name: i for i, doc in enumerate(engine.documents)}
+    content_blob, content_offsets = _pack_strings([doc.content for doc in engine.documents])
+    sections += [("doc_content", content_blob), ("doc_content_offsets", content_offsets)]
+
+    chunk_doc = array('i')
+    chunk_start = array('i')
+    chunk_end = array('i')
+    chunk_index = array('i')
+    for chunk in engine.chunks:
+        chunk_doc.append(doc_ids[chunk.doc_name])
+        chunk_start.append(chunk.start)
+        chunk_end.append(chunk.end)
+        chunk_index.append(chunk.index)
+
+    heading_blob, heading_offsets = _pack_strings([chunk.heading for chunk in engine.chunks])
+    sections += [
+        ("chunk_doc", chunk_doc), ("chunk_start", chunk_start),
+        ("chunk_end", chunk_end), ("chunk_index", chunk_index),
+        ("chunk_heading", heading_blob), ("chunk_heading_offsets", heading_offsets),
+    ]
+
+    # ── 색인 테이블 (용어 사전 + 문서별 조각) ──
+    term_blob, term_offsets = _pack_strings(index.terms)
+    sections += [("terms", term_blob), ("term_offsets", term_offsets)]
+    for name, typecodes in _INDEX_TABLES:
+        sections += _table_sections(name, [getattr(index, name)], typecodes)
+    for name, typecodes in _SEGMENT_TABLES:
+        sections += _table_sections(
+            name, [getattr(segment, name) for segment in index.segments], typecodes)
+    sections.append(("segment_starts", array('q', index.starts)))
+
+    # ── BM25 통계 ──
+    for field in BM25F_FIELDS:
+        sections.append((f"lengths.{field}", array('i', index.lengths[field])))
+        sections.append((f"norms.{field}", array('d', index.norms[field])))
+
+    # ── 헤더 + 섹션 배치 ──
+    toc: dict[str, list] = {}
+    offset = 0
+    payloads = []
+    for name, data in sections:
+        typecode = data.typecode if isinstance(data, array) else "B"
+        raw = data.tobytes() if isinstance(data, array) else bytes(data)
+        toc[name] = [offset, len(raw), typecode]
+        payloads.append(raw)
+        offset += len(raw) + (-len(raw) % ALIGN)
+
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "params": INDEX_PARAMS,
+        "manifest": build_manifest(engine.documents, file_stats),
+        "documents": [
+            {"name": doc.name, "category": doc.category, "path": doc.path}
+            for doc in engine.documents
+        ],
+        "avg_length": index.avg_length,
+        "sections": toc,
+    }, ensure_ascii=False).encode("utf-8")
+
+    prefix_len = len(MAGIC) + 8 + len(header)
+    header += b" " * (-prefix_len % ALIGN)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for raw in payloads:
+            f.write(raw)
+            f.write(b"\0" * (-len(raw) % ALIGN))
+    os.replace(tmp_path, path)
+    return path.stat().st_size
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 복원
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _valid_header(mm, md_files: list[Path]) -> Optional[tuple[dict, int]]:
+    """스냅샷 헤더가 이 버전/파라미터/원본과 맞으면 (헤더, 섹션 시작 위치), 아니면 None"""
+    if mm[:len(MAGIC)] != MAGIC:
+        return None
+    (header_len,) = struct.unpack_from("<Q", mm, len(MAGIC))
+    base = len(MAGIC) + 8 + header_len
+    header = json.loads(bytes(mm[len(MAGIC) + 8:base]))
+
+    if header.get("version") != FORMAT_VERSION or header.get("params") != INDEX_PARAMS:
+        return None
+    if not manifest_matches(header["manifest"], md_files):
+        return None
+    return header, base
+
+
+def snapshot_is_current(path, md_files: list[Path]) -> bool:
+    """스냅샷이 있고 현재 원본과 맞는지 (헤더만 읽음 — 색인은 복원하지 않음)"""
+    path = Path(path)
+    if not path.exists():
+        return False
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _valid_header(mm, md_files) is not None
+    except (OSError, ValueError):
+        return False
+
+
+def load_snapshot(path, md_files: list[Path]) -> Optional[tuple[list[Document], list[Chunk], InvertedIndex]]:
+    """
+    스냅샷이 유효하면 mmap 으로 열어 (문서, 청크, 색인) 을 복원합니다.
+    파일이 없거나, 포맷/파라미터가 다르거나, 원본이 바뀌었으면 None.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    valid = _valid_header(mm, md_files)
+    if valid is None:
+        return None
+    header, base = valid
+
+    view = memoryview(mm)
+    toc = header["sections"]
+
+    def section(name):
+        offset, size, typecode = toc[name]
+        raw = view[base + offset:base + offset + size]
+        return raw if typecode == "B" else raw.cast(typecode)
+
+    # ── 문서 ──
+    contents = _unpack_strings(section("doc_content"), section("doc_content_offsets"))
+    documents = [
+        Document(name=meta["name"], category=meta["category"], content=content, path=meta["path"])
+        for meta, content in zip(header["documents"], contents)
+    ]
+
+    # ── 청크 ──
+    headings = _unpack_strings(section("chunk_heading"), section("chunk_heading_offsets"))
+    chunk_doc = section("chunk_doc")
+    chunk_start = section("chunk_start")
+    chunk_end = section("chunk_end")
+    chunk_index = section("chunk_index")
+
+    chunks: list[Chunk] = []
+    for chunk_id, heading in enumerate(headings):
+        doc = documents[chunk_doc[chunk_id]]
+        chunk = Chunk(doc, chunk_start[chunk_id], chunk_end[chunk_id], heading,
+                      index=chunk_index[chunk_id])
+        chunk.id = chunk_id
+        doc.chunks.append(chunk)
+        chunks.append(chunk)
+
+    # ── 색인 ──
+    def tables(name: str, typecodes: str) -> list[CsrTable]:
+        """섹션 → 매핑별 CsrTable (열 배열은 모든 매핑이 같이 씀)"""
+        keys = _unpack_strings(section(f"{name}.keys"), section(f"{name}.key_offsets"))
+        offsets = section(f"{name}.offsets")
+        bounds = section(f"{name}.bounds")
+        columns = [section(f"{name}.col{i}") for i in range(len(typecodes))]
+        return [
+            CsrTable(keys[bounds[i]:bounds[i + 1]], offsets[bounds[i]:bounds[i + 1] + 1], columns)
+            for i in range(len(bounds) - 1)
+        ]
+
+    lengths = {field: section(f"lengths.{field}") for field in BM25F_FIELDS}
+    starts = section("segment_starts")
+    by_segment = {name: tables(name, typecodes) for name, typecodes in _SEGMENT_TABLES}
+    segments = [
+        Segment(
+            by_segment["postings"][i],
+            {field: values[starts[i]:starts[i + 1]] for field, values in lengths.items()},
+            documents[i].chunks,
+        )
+        for i in range(len(starts) - 1)
+    ]
+
+    index = InvertedIndex()
+    index.restore(
+        segments,
+        terms=_unpack_strings(section("terms"), section("term_offsets")),
+        term_grams=tables("term_grams", "i")[0],
+        term_chars=tables("term_chars", "i")[0],
+        lengths=lengths,
+        avg_length=header["avg_length"],
+        norms={field: section(f"norms.{field}") for field in BM25F_FIELDS},
+    )
+    return documents, chunks, index
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# CLI — 스냅샷 사전 빌드
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main():
+    args = sys.argv[1:]
+    out_path = None
+    if "--out" in args:
+        pos = args.index("--out")
+        if pos + 1 >= len(args):
+            print("❌ --out 뒤에 스냅샷 파일 경로가 필요합니다.")
+            sys.exit(1)
+        out_path = Path(args[pos + 1])
+        del args[pos:pos + 2]
+
+    docs_path = Path(args[0]) if args else DEFAULT_DOCS_PATH
+    out_path = out_path or default_snapshot_path(docs_path)
+
+    if not docs_path.exists():
+        print(f"❌ 경로가 존재하지 않습니다: {docs_path}")
+        sys.exit(1)
+
+    # 스냅샷 없이 처음부터 빌드한 뒤 저장
+    engine = RAGEngine(str(docs_path))
+    engine.load()
+    size = save_snapshot(engine, out_path, engine.file_stats)
+    print(f"💾 스냅샷 저장: {out_path} ({size / 1024:,.0f}KB)")
+
+
+if __name__ == "__main__":
+    main()
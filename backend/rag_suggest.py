@@ -0,0 +1,131 @@
+"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[RAG Suggest] 입력 중 자동완성 (정렬 배열 접두어 색인)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+프론트엔드가 글자를 칠 때마다 /api/search 를 부르면 매번 전체 채점을 하게 되므로,
+헤딩 / 문서명 / @태그 / 색인 용어(인물명 포함)를 한 번에 모은 자동완성 색인을 따로 둡니다.
+
+구조:
+  - 항목 = (키, 표시 문자열, 종류, 점수) — 키는 소문자화 + 앞쪽 기호/목록 번호 제거
+    ("⭐ 서구진 → 개봉" → "서구진 → 개봉", "3. 검법 (劍法)" → "검법 (劍法)", "7화" 는 그대로)
+  - 키 기준으로 정렬한 배열 하나 → 접두어 구간은 bisect 두 번으로 찾음
+  - 점수 = 빈도(청크 수) × 종류 가중치 (태그 > 문서명 > 헤딩 > 용어)
+  - 구간이 큰 짧은 접두어(1글자)는 상위 결과를 미리 계산해 둠
+    → 어떤 입력이든 비교 대상이 수백 개 이하라 수 ms 안에 응답
+
+색인 세대마다 처음 자동완성을 요청받을 때 만들고 (RAGEngine._suggest_index, 이유는 _publish 참고),
+만든 뒤에는 읽기 전용입니다.
+"""
+
+import heapq
+import re
+from bisect import bisect_left, bisect_right
+from typing import Optional
+
+# ── 자동완성 파라미터 ──
+SUGGEST_LIMIT = 10          # 기본 반환 개수
+SUGGEST_MAX_LIMIT = 50      # 요청 가능한 최대 개수 (미리 계산 범위)
+PRECOMPUTE_PREFIX = 1       # 이 길이 이하 접두어는 상위 결과를 미리 계산
+
+# 종류별 가중치 (같은 빈도면 태그 → 문서명 → 헤딩 → 용어 순)
+KIND_WEIGHTS = {
+    "tag": 8.0,
+    "document": 4.0,
+    "heading": 2.0,
+    "term": 1.0,
+}
+
+# 키 앞쪽의 이모지/기호/목록 번호 ("⭐ ", "3. ", "0-5. ", "2) ") 제거 — "7화" 같은 숫자는 남김
+_LEADING_RE = re.compile(r'^[^\w가-힣]*(?:\d+(?:[-.]\d+)*[.)]\s+)?[^\w가-힣]*')
+_CHAR_BOUND = "\U0010ffff"
+
+
+def suggest_key(text: str) -> str:
+    """자동완성 비교용 키 (소문자, 앞쪽 기호/번호 제거)"""
+    return _LEADING_RE.sub("", text.strip().lower(), count=1)
+
+
+class SuggestIndex:
+    """키 정렬 배열 + 짧은 접두어 상위 결과"""
+
+    def __init__(self, entries: dict[tuple[str, str], list]):
+        # (키, 종류) → [표시 문자열, 빈도]
+        rows = sorted(
+            (key, display, kind, frequency * KIND_WEIGHTS[kind])
+            for (key, kind), (display, frequency) in entries.items()
+            if key
+        )
+        self.keys = [row[0] for row in rows]
+        self.rows = [(display, kind, score) for _, display, kind, score in rows]
+        self._top: dict[str, list[int]] = {}
+        for prefix in {key[:length] for key in self.keys for length in range(1, PRECOMPUTE_PREFIX + 1)}:
+            self._top[prefix] = self._rank(prefix, SUGGEST_MAX_LIMIT)
+
+    @classmethod
+    def build(cls, documents, chunks, index, tags) -> "SuggestIndex":
+        """
+        문서/청크/역색인/태그로 자동완성 색인을 만듭니다.
+        (빈도: 문서명 = 청크 수, 헤딩 = 같은 헤딩 청크 수, 용어 = 등장 청크 수, 태그 = 1)
+        """
+        entries: dict[tuple[str, str], list] = {}
+
+        def add(display: str, kind: str, frequency: int) -> None:
+            key = suggest_key(display)
+            entry = entries.get((key, kind))
+            if entry is None:
+                entries[(key, kind)] = [display, frequency]
+            else:
+                entry[1] += frequency
+
+        for tag in tags:
+            add(tag, "tag", 1)
+        for doc in documents:
+            add(doc.name, "document", max(len(doc.chunks), 1))
+        for chunk in chunks:
+            add(chunk.heading, "heading", 1)
+        for term, frequency in index.term_frequencies():
+            if len(term) > 1:
+                add(term, "term", frequency)
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _rank(self, prefix: str, limit: int, kind: Optional[str] = None) -> list[int]:
+        """접두어 구간에서 점수 상위 limit 개의 행 번호 (동점은 키 순, kind 를 주면 그 종류만)"""
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_right(self.keys, prefix + _CHAR_BOUND, lo)
+        rows = self.rows
+        candidates = range(lo, hi) if kind is None else (row for row in range(lo, hi) if rows[row][1] == kind)
+        return heapq.nsmallest(limit, candidates, key=lambda row: (-rows[row][2], row))
+
+    def suggest(self, query: str, limit: int = SUGGEST_LIMIT) -> list[dict]:
+        """
+        query 로 시작하는 자동완성 후보 (점수 내림차순, 대소문자만 다른 문자열은 한 번만).
+        "@" 로 시작하면 @태그만 돌려줍니다 ("@요" → 요리, "@" 만 있으면 전체 태그).
+
+        Returns:
+            [{"text", "kind", "score"}, ...]
+        """
+        kind = "tag" if query.lstrip().startswith("@") else None
+        prefix = suggest_key(query)
+        if (not prefix and kind is None) or limit <= 0:
+            return []
+        limit = min(limit, SUGGEST_MAX_LIMIT)
+
+        # 같은 문자열이 종류만 달리 여러 번 나올 수 있으므로 넉넉히 뽑은 뒤 중복 제거
+        ranked = self._top.get(prefix) if kind is None else None
+        if ranked is None:
+            ranked = self._rank(prefix, limit * 2, kind)
+        suggestions: list[dict] = []
+        seen: set[str] = set()
+        for row in ranked:
+            display, row_kind, score = self.rows[row]
+            if display.lower() in seen:
+                continue
+            seen.add(display.lower())
+            suggestions.append({"text": display, "kind": row_kind, "score": score})
+            if len(suggestions) == limit:
+                break
+        return suggestions
@@ -0,0 +1,202 @@
+"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[RAG Vector] 오프라인 벡터 검색 (NumPy 해싱 TF-IDF)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+외부 임베딩 API 없이 빌드 머신에서도 돌아가는 로컬 벡터 모드입니다.
+
+임베딩 방식:
+  - 특징: 토큰 + 토큰 내부 문자 bigram ("화산파의" → 화산파의, 화산, 산파, 파의)
+    → 조사가 붙거나 어순이 바뀐 표현도 겹치는 특징이 많아 비슷한 벡터가 됩니다.
+  - 특징 해싱(crc32)으로 VECTOR_DIM 차원에 투영 → 용어 사전 불필요
+  - 가중치: (1 + log tf) × idf, 행 단위 L2 정규화 → 내적 = 코사인 유사도
+  - 전체 청크를 float32 행렬 하나로 저장
+
+검색:
+  쿼리 벡터와 행렬의 행렬-벡터 곱 1번 + argpartition 으로 top-k
+
+저장:
+  cache_dir 가 있으면 <이름>.<지문>.vec.npy / .idf.npy 로 저장하고
+  다음 부팅 때 np.load(mmap_mode="r") 로 재계산 없이 붙여 씁니다.
+  지문 = 청크 헤딩·본문 + 차원/특징 버전의 sha256 → 원본이 바뀌면 자동으로 새로 계산
+  임시 파일에 쓴 뒤 교체하므로 다른 프로세스가 반쯤 쓴 행렬을 mmap 하는 일은 없습니다.
+  (운영 모드의 워커처럼 save=False 로 부르면 읽기만 하고 저장하지 않음)
+
+NumPy 는 선택 의존성입니다 (pip install numpy). 없으면 vector 모드만 사용할 수 없습니다.
+"""
+
+import hashlib
+import math
+import os
+import zlib
+from pathlib import Path
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from rag_index import tokenize
+
+# ── 벡터 파라미터 ──
+VECTOR_DIM = 4096
+FEATURE_VERSION = 1   # 특징 추출 규칙이 바뀌면 올림 (저장된 .npy 무효화)
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("벡터 검색에는 numpy가 필요합니다. 설치: pip install numpy")
+
+
+def _features(text_lower: str) -> dict[int, int]:
+    """텍스트 → 해싱된 특징 버킷별 등장 횟수"""
+    buckets: dict[int, int] = {}
+    for token in tokenize(text_lower):
+        features = [token]
+        if len(token) > 2:
+            features.extend(token[i:i + 2] for i in range(len(token) - 1))
+        for feature in features:
+            bucket = zlib.crc32(feature.encode("utf-8")) % VECTOR_DIM
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+    return buckets
+
+
+def _chunk_text(chunk) -> str:
+    """임베딩 대상 텍스트 (헤딩 + 본문)"""
+    return f"{chunk.heading}\n{chunk.text}".lower()
+
+
+def corpus_fingerprint(chunks: list) -> str:
+    """청크 내용 + 벡터 파라미터 지문 (저장된 행렬 재사용 여부 판단)"""
+    digest = hashlib.sha256(f"v{FEATURE_VERSION}:{VECTOR_DIM}".encode("utf-8"))
+    for chunk in chunks:
+        digest.update(chunk.heading.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(chunk.text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class VectorIndex:
+    """청크 임베딩 행렬 (N × VECTOR_DIM, float32, 행 L2 정규화)"""
+
+    def __init__(self, matrix, idf):
+        self.matrix = matrix
+        self.idf = idf
+
+    @classmethod
+    def build(cls, chunks: list) -> "VectorIndex":
+        """청크 리스트(청크 id 순서)로부터 임베딩 행렬을 계산합니다"""
+        _require_numpy()
+        n = len(chunks)
+        matrix = np.zeros((n, VECTOR_DIM), dtype=np.float32)
+        df = np.zeros(VECTOR_DIM, dtype=np.float32)
+
+        for row, chunk in enumerate(chunks):
+            buckets = _features(_chunk_text(chunk))
+            if not buckets:
+                continue
+            cols = np.fromiter(buckets.keys(), dtype=np.int64, count=len(buckets))
+            tf = np.fromiter(buckets.values(), dtype=np.float32, count=len(buckets))
+            matrix[row, cols] = 1.0 + np.log(tf)
+            df[cols] += 1.0
+
+        idf = (np.log((1.0 + n) / (1.0 + df)) + 1.0).astype(np.float32)
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        return cls(matrix, idf)
+
+    @classmethod
+    def load_or_build(cls, chunks: list, cache_dir: Optional[Path] = None,
+                      name: str = "world_db", save: bool = True) -> "VectorIndex":
+        """
+        저장된 행렬이 있으면 mmap 으로 열고, 없으면 계산해서 저장합니다.
+        (cache_dir 가 None 이거나 save=False 면 저장하지 않음)
+        """
+        _require_numpy()
+        if cache_dir is None:
+            return cls.build(chunks)
+
+        cache_dir = Path(cache_dir)
+        fingerprint = corpus_fingerprint(chunks)
+        matrix_path = cache_dir / f"{name}.{fingerprint}.vec.npy"
+        idf_path = cache_dir / f"{name}.{fingerprint}.idf.npy"
+
+        if matrix_path.exists() and idf_path.exists():
+            try:
+                matrix = np.load(matrix_path, mmap_mode="r")
+                if matrix.shape == (len(chunks), VECTOR_DIM):
+                    return cls(matrix, np.load(idf_path))
+            except (OSError, ValueError) as e:
+                print(f"  ⚠️ 벡터 캐시 읽기 실패 (재계산): {e}")
+
+        vectors = cls.build(chunks)
+        if not save:
+            return vectors
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            # idf 를 먼저 → 행렬 파일이 보이면 짝이 되는 idf 도 이미 있음
+            for path, values in ((idf_path, vectors.idf), (matrix_path, vectors.matrix)):
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                with open(tmp_path, "wb") as f:
+                    np.save(f, values)
+                os.replace(tmp_path, path)
+            # 이전 지문의 파일 정리 (이미 mmap 으로 연 프로세스는 지워져도 계속 읽음)
+            for pattern in (f"{name}.*.vec.npy", f"{name}.*.idf.npy"):
+                for stale in cache_dir.glob(pattern):
+                    if stale not in (matrix_path, idf_path):
+                        stale.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"  ⚠️ 벡터 캐시 저장 실패: {e}")
+        return vectors
+
+    def embed(self, text: str):
+        """검색어 → 정규화된 쿼리 벡터 (특징이 없으면 None)"""
+        buckets = _features(text.lower())
+        if not buckets:
+            return None
+        vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+        for bucket, count in buckets.items():
+            vector[bucket] = 1.0 + math.log(count)
+        vector *= self.idf
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return None
+        return vector / norm
+
+    def top(self, query: str, k: int, ranges=None) -> dict[int, float]:
+        """
+        코사인 유사도 상위 k개 청크.
+
+        Args:
+            ranges: 후보 청크 id 구간 [시작, 끝) 들 (필터용, None 이면 전체)
+                    → 해당 행만 잘라서 곱하므로 작은 필터일수록 빠름
+
+        Returns:
+            청크 id → 유사도 (0 초과만)
+        """
+        vector = self.embed(query)
+        if vector is None or k <= 0 or len(self.matrix) == 0:
+            return {}
+
+        if ranges is None:
+            scores = self.matrix @ vector
+        else:
+            scores = np.full(len(self.matrix), -1.0, dtype=np.float32)
+            for lo, hi in ranges:
+                scores[lo:hi] = self.matrix[lo:hi] @ vector
+
+        k = min(k, len(scores))
+        top_ids = np.argpartition(-scores, k - 1)[:k]
+        return {
+            int(cid): float(scores[cid])
+            for cid in top_ids
+            if scores[cid] > 0
+        }
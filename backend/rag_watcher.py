@@ -0,0 +1,57 @@
+"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+[RAG Watcher] world_db 변경 감시 → 자동 재색인
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+백그라운드 스레드가 일정 간격으로 RAGEngine.reload() 를 호출합니다.
+reload() 는 파일 크기·mtime 만 비교하므로 바뀐 파일이 없으면 비용이 거의 없고,
+바뀐 .md 파일이 있으면 그 문서만 재분할·재색인한 뒤 세대를 교체합니다.
+
+ShardedRAGEngine 을 넘기면 로드된 소설 샤드만 갱신하고, 오래 안 쓴 샤드를 해제합니다.
+refresh 를 주면 reload() 대신 그 함수를 부릅니다 (운영 모드 감독 프로세스의 스냅샷 갱신 등).
+
+외부 패키지(inotify/watchdog) 없이 폴링으로 동작하므로
+Windows / WSL / 네트워크 드라이브에서도 똑같이 동작합니다.
+
+사용 예시:
+  watcher = WorldDbWatcher(engine, interval=2.0)
+  watcher.start()
+  ...
+  watcher.stop()
+"""
+
+import threading
+from typing import Callable
+
+
+class WorldDbWatcher:
+    """world_db 폴더를 폴링하며 변경된 문서를 자동으로 재색인합니다"""
+
+    def __init__(self, engine, interval: float = 2.0, refresh: Callable[[], object] | None = None):
+        self.engine = engine
+        self.interval = interval
+        self.refresh = refresh or engine.reload
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="world-db-watcher", daemon=True)
+        self._thread.start()
+        print(f"👀 world_db 변경 감시 시작 ({self.interval:g}초 간격)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # 감시 스레드는 죽지 않고 다음 주기에 다시 시도
+                print(f"  ⚠️ world_db 자동 갱신 실패: {e}")